@@ -13,6 +13,7 @@ with open('src/glk_comm.c') as f:
     ffibuilder.cdef(r"""
         struct sock_names {
             char* sock_name;
+            char* buffer;
             ...;
         };
         """)
@@ -20,7 +21,11 @@ with open('src/glk_comm.c') as f:
     ffibuilder.cdef(r"""
         int init_glulx(struct sock_names* names);
         const char* communicate(struct sock_names* names, const char* msg);
+        int communicate_many(struct sock_names* names, const char** msgs, int nb_msgs, char** outputs);
         const char* get_output_nosend(struct sock_names* names);
+        int wait_for_connection(struct sock_names* names, int timeout_ms);
+        int receive_buffered(struct sock_names* names);
+        int communicate_buffered(struct sock_names* names, const char* msg);
         void cleanup_glulx(struct sock_names* names);
         void free(void* ptr);
         """)
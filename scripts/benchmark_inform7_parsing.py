@@ -0,0 +1,86 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT license.
+
+import re
+import time
+import argparse
+
+import numpy as np
+
+from textworld.envs.wrappers.tw_inform7 import AVAILABLE_INFORM7_EXTRA_INFOS, _parse_output
+
+
+WORDS = ("a an the kitchen table fridge apple knife counter closed open door north south east west"
+         " you see here there is are on in of wooden shiny dusty old large small").split()
+
+
+def legacy_parse(text, tracked_infos):
+    """ Extract the extra infos, then the events, one tag at a time (as TextWorld used to). """
+    def _detect_events(text):
+        matches = []
+        for match in re.findall(r"\[[^]]+\]\n?", text):
+            text = text.replace(match, "")
+            tag_name = match.strip()[1:-1]
+            if " - succeeded" in tag_name:
+                matches.append(tag_name[:tag_name.index(" - succeeded")])
+
+        return [m for m in matches if "(" not in m and ")" not in m], text
+
+    infos = {}
+    for tag in tracked_infos:
+        regex = re.compile(r"<{tag}>\n(.*)</{tag}>".format(tag=tag), re.DOTALL)
+        match = re.search(regex, text)
+        infos[tag] = None
+        if match:
+            infos[tag] = _detect_events(match.group(1))[1].strip()
+            text = re.sub(regex, "", text)
+
+    events, text = _detect_events(text)
+    return text, infos, events
+
+
+def make_output(nb_sentences, rng):
+    """ Output of a 'look' command, as printed by a game tracking all extra infos and events. """
+    sentences = [" ".join(rng.choice(WORDS, size=12)).capitalize() + "." for _ in range(nb_sentences)]
+    description = "-= Kitchen =-\n" + " ".join(sentences) + "\n\n"
+    return ("[looking]\n" + description + "[looking - succeeded]\n\n"
+            "<description>\n[looking]\n" + description + "[looking - succeeded]\n\n</description>"
+            "<inventory>\n[taking inventory]\nYou are carrying: a glass and a mouse.\n\n"
+            "[taking inventory - succeeded]\n\n</inventory>"
+            "<score>\n0\n</score><moves>\n1\n</moves>\n>")
+
+
+def benchmark(nb_sentences, args):
+    rng = np.random.RandomState(args.seed)
+    text = make_output(nb_sentences, rng)
+    assert legacy_parse(text, AVAILABLE_INFORM7_EXTRA_INFOS) == _parse_output(text, AVAILABLE_INFORM7_EXTRA_INFOS, True)
+
+    durations = {}
+    for name, parse in [("legacy", legacy_parse),
+                        ("single pass", lambda text, tags: _parse_output(text, tags, events=True))]:
+        durations[name] = []
+        for _ in range(args.repeat):
+            start_time = time.time()
+            parse(text, AVAILABLE_INFORM7_EXTRA_INFOS)
+            durations[name].append(time.time() - start_time)
+
+    msg = "{:5d} sentences | {:7d} chars | legacy {:8.1f} us | single pass {:8.1f} us | {:5.1f}x"
+    legacy, single_pass = np.median(durations["legacy"]), np.median(durations["single pass"])
+    print(msg.format(nb_sentences, len(text), legacy * 1e6, single_pass * 1e6, legacy / single_pass))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the cost of extracting the extra infos and Inform7 events"
+                                                 " from the output of TextWorld games as room descriptions get longer.")
+    parser.add_argument("--nb-sentences", type=int, nargs="+", default=[5, 20, 100, 500, 2000],
+                        help="Nb. of sentences in the room description. Default: %(default)s")
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="Nb. of times to parse each output. Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for nb_sentences in args.nb_sentences:
+        benchmark(nb_sentences, args)
@@ -0,0 +1,67 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT license.
+
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+import textworld
+from textworld.generator.game import GameOptions
+
+
+def benchmark(nb_rooms, nb_objects, args):
+    options = GameOptions()
+    options.nb_rooms = nb_rooms
+    options.nb_objects = nb_objects
+    options.quest_length = args.quest_length
+    options.quest_breadth = args.quest_breadth
+    # Large worlds would otherwise run out of distinct object names.
+    options.grammar.allowed_variables_numbering = True
+
+    durations = []
+    peaks = []
+    for i in range(args.repeat):
+        options.seeds = args.seed + i
+
+        start_time = time.time()
+        game = textworld.generator.make_game(options)
+        durations.append(time.time() - start_time)
+
+        # Tracing allocations slows things down, so memory is measured separately.
+        tracemalloc.start()
+        textworld.generator.make_game(options)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+
+    nb_facts = len(list(game.world.state.facts))
+    msg = "{:6d} rooms {:6d} objects {:7d} facts | {:8.2f} secs | {:8.1f} MB peak"
+    print(msg.format(nb_rooms, nb_objects, nb_facts, np.mean(durations), np.mean(peaks) / 1024**2))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the time and memory needed by `make_game` on large worlds.")
+    parser.add_argument("--nb-rooms", type=int, nargs="+", default=[10, 20, 40, 80],
+                        help="Nb. of rooms in the world. Default: %(default)s")
+    parser.add_argument("--objects-per-room", type=int, default=5,
+                        help="Nb. of objects per room. Default: %(default)s")
+    parser.add_argument("--quest-length", type=int, default=10,
+                        help="Minimum nb. of actions the quest requires to be completed. Default: %(default)s")
+    parser.add_argument("--quest-breadth", type=int, default=1,
+                        help="Control how non-linear a quest can be. Default: %(default)s")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Nb. of games to generate for each world size. Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Make sure the knowledge base is loaded before timing anything.
+    textworld.generator.KnowledgeBase.default()
+
+    for nb_rooms in args.nb_rooms:
+        benchmark(nb_rooms, nb_rooms * args.objects_per_room, args)
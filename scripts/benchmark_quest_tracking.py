@@ -0,0 +1,78 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT license.
+
+import time
+import argparse
+
+import numpy as np
+
+import textworld
+from textworld.generator.game import GameOptions, GameProgression
+
+
+def benchmark(quest_length, args):
+    options = GameOptions()
+    options.nb_rooms = args.nb_rooms
+    options.nb_objects = args.nb_objects
+    options.quest_length = quest_length
+    options.quest_breadth = args.quest_breadth
+    options.grammar.allowed_variables_numbering = True
+
+    durations = []
+    policy_lengths = []
+    for i in range(args.repeat):
+        options.seeds = args.seed + i
+        game = textworld.generator.make_game(options)
+        rng = np.random.RandomState(args.seed + i)
+
+        game_progression = GameProgression(game)
+        policy_lengths.append(len(game_progression.winning_policy))
+        for _ in range(args.max_steps):
+            if game_progression.done:
+                break
+
+            # Mostly follow the winning policy, with some detours.
+            if rng.rand() < args.detour_prob:
+                action = game_progression.valid_actions[rng.randint(len(game_progression.valid_actions))]
+            else:
+                action = game_progression.winning_policy[0]
+
+            start_time = time.time()
+            game_progression.update(action)
+            durations.append(time.time() - start_time)
+
+    msg = "quest length {:3d} (policy {:5.1f}) | {:6d} steps | {:8.2f} ms/step | {:8.2f} ms max"
+    print(msg.format(quest_length, np.mean(policy_lengths), len(durations),
+                     np.mean(durations) * 1000, np.max(durations) * 1000))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the cost of tracking quests (GameProgression.update)"
+                                                 " as the quests get longer.")
+    parser.add_argument("--quest-length", type=int, nargs="+", default=[5, 10, 20, 30, 50],
+                        help="Minimum nb. of actions the quest requires to be completed. Default: %(default)s")
+    parser.add_argument("--quest-breadth", type=int, default=1,
+                        help="Control how non-linear a quest can be. Default: %(default)s")
+    parser.add_argument("--nb-rooms", type=int, default=20,
+                        help="Nb. of rooms in the world. Default: %(default)s")
+    parser.add_argument("--nb-objects", type=int, default=60,
+                        help="Nb. of objects in the world. Default: %(default)s")
+    parser.add_argument("--detour-prob", type=float, default=0.2,
+                        help="Probability of taking a random action instead of following the winning policy."
+                             " Default: %(default)s")
+    parser.add_argument("--max-steps", type=int, default=200,
+                        help="Maximum nb. of steps per game. Default: %(default)s")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Nb. of games to generate for each quest length. Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=1234)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Make sure the knowledge base is loaded before timing anything.
+    textworld.generator.KnowledgeBase.default()
+
+    for quest_length in args.quest_length:
+        benchmark(quest_length, args)
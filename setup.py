@@ -55,6 +55,7 @@ setup(
         "scripts/tw-stats",
         "scripts/tw-extract",
         "scripts/tw-view",
+        "scripts/tw-serve",
     ],
     zip_safe=False,
     long_description=open("README.md").read(),
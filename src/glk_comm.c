@@ -16,6 +16,7 @@
 #include <errno.h>
 #include <fcntl.h>
 #include <libgen.h>
+#include <poll.h>
 #include <signal.h>
 #include <sys/stat.h>
 #include <sys/wait.h>
@@ -32,6 +33,8 @@ struct sock_names {
     char* sock_name;
     int serv_sock_fd;
     int sock_fd;
+    char* buffer; /* Last message received, see receive_buffered(). */
+    uint32_t buffer_size;
 };
 
 void cleanup_glulx(struct sock_names* names) {
@@ -67,12 +70,18 @@ void cleanup_glulx(struct sock_names* names) {
         free(names->sock_name);
         names->sock_name = NULL;
     }
+
+    free(names->buffer);
+    names->buffer = NULL;
+    names->buffer_size = 0;
 }
 
 static int init_mq(struct sock_names* names) {
     names->sock_name = NULL;
     names->sock_fd = -1;
     names->serv_sock_fd = -1;
+    names->buffer = NULL;
+    names->buffer_size = 0;
 
     char temp[25] = "/tmp/mlglk_XXXXXX";
     if (mkdtemp(temp) == NULL) {
@@ -126,6 +135,27 @@ static int robust_accept(int socket, struct sockaddr* address, socklen_t* addres
     }
 }
 
+/**
+ * send() wrapper that handles EINTR and partial sends.
+ */
+static int robust_send(int socket, const void* buffer, size_t length) {
+    const char* data = buffer;
+    while (length > 0) {
+        ssize_t ret = send(socket, data, length, 0);
+        if (ret == -1 && errno == EINTR) {
+            continue;
+        }
+        if (ret == -1) {
+            return -1;
+        }
+
+        data += ret;
+        length -= ret;
+    }
+
+    return 0;
+}
+
 /**
  * recv() wrapper that handles EINTR.
  */
@@ -152,39 +182,99 @@ static int glk_connect(struct sock_names* names) { /* arg mutable for connection
     return 0;
 }
 
-const char* get_output_nosend(struct sock_names* names) {
+/**
+ * Wait for the interpreter to connect, giving up after timeout_ms milliseconds
+ * (e.g. when a forked interpreter couldn't connect and exited).
+ *
+ * @return 0 once connected, -1 on error or timeout.
+ */
+int wait_for_connection(struct sock_names* names, int timeout_ms) {
+    if (names->sock_fd != -1) {
+        return 0;
+    }
+
+    struct pollfd serv_sock = { .fd = names->serv_sock_fd, .events = POLLIN };
+    int ready;
+    do {
+        ready = poll(&serv_sock, 1, timeout_ms);
+    } while (ready == -1 && errno == EINTR);
+
+    if (ready == -1) {
+        perror("glk_comm.c: Could not wait for the interpreter to connect");
+        return -1;
+    }
+    if (ready == 0) {
+        fprintf(stderr, "glk_comm.c: Timed out waiting for the interpreter to connect\n");
+        return -1;
+    }
+
+    return glk_connect(names);
+}
+
+/**
+ * Wait for the next message and store it, null-terminated, in names->buffer.
+ *
+ * The buffer is reused from one message to the next, only growing when
+ * a message doesn't fit. Its content is thus only valid until the next call.
+ *
+ * @return The length of the message, or -1 on error.
+ */
+int receive_buffered(struct sock_names* names) {
     if (glk_connect(names) != 0) {
-        return NULL;
+        return -1;
     }
 
     uint32_t net_buf_size = 0;
     ssize_t amt = robust_recv(names->sock_fd, &net_buf_size, sizeof(net_buf_size), MSG_WAITALL);
     if (amt <= 0) {
         perror("glk_comm.c: Could not read msg size");
-        return NULL;
+        return -1;
     }
 
     uint32_t buf_size = ntohl(net_buf_size);
-    char* msg_buf = calloc(buf_size + 1, 1);
-    if (!msg_buf) {
-        return NULL;
+    if (names->buffer == NULL || buf_size + 1 > names->buffer_size) {
+        char* buffer = realloc(names->buffer, buf_size + 1);
+        if (!buffer) {
+            return -1;
+        }
+        names->buffer = buffer;
+        names->buffer_size = buf_size + 1;
     }
-    amt = robust_recv(names->sock_fd, msg_buf, buf_size, MSG_WAITALL);
+
+    amt = robust_recv(names->sock_fd, names->buffer, buf_size, MSG_WAITALL);
     if (amt < 0) {
         perror("glk_comm.c: Could not read msg");
-        free(msg_buf);
-        return NULL;
+        return -1;
     }
     if (amt == 0 && buf_size != 0) {
         fprintf(stderr, "glk_comm.c: Expected %d but only got %zd!\n", buf_size, amt);
     }
 
+    names->buffer[amt] = '\0';
+    return amt;
+}
+
+/**
+ * Same as receive_buffered(), but returns a copy of the message to be freed by the caller.
+ */
+const char* get_output_nosend(struct sock_names* names) {
+    int length = receive_buffered(names);
+    if (length < 0) {
+        return NULL;
+    }
+
+    char* msg_buf = malloc(length + 1);
+    if (!msg_buf) {
+        return NULL;
+    }
+
+    memcpy(msg_buf, names->buffer, length + 1);
     return msg_buf;
 }
 
-const char* communicate(struct sock_names* names, const char* message) {
+static int send_message(struct sock_names* names, const char* message) {
     if (glk_connect(names) != 0) {
-        return NULL;
+        return -1;
     }
 
     int msg_len = strlen(message);
@@ -193,18 +283,104 @@ const char* communicate(struct sock_names* names, const char* message) {
     int result = send(names->sock_fd, &net_msg_len, sizeof(net_msg_len), 0);
     if (result == -1) {
         perror("glk_comm.c: Could not send msg size");
-        return NULL;
+        return -1;
     }
 
     result = send(names->sock_fd, message, msg_len, 0);
     if (result == -1) {
         perror("glk_comm.c: Could not send msg");
+        return -1;
+    }
+
+    return 0;
+}
+
+const char* communicate(struct sock_names* names, const char* message) {
+    if (send_message(names, message) != 0) {
         return NULL;
     }
 
     return get_output_nosend(names);
 }
 
+/**
+ * Send a message and wait for the output, stored in names->buffer (see receive_buffered()).
+ *
+ * @return The length of the output, or -1 on error.
+ */
+int communicate_buffered(struct sock_names* names, const char* message) {
+    if (send_message(names, message) != 0) {
+        return -1;
+    }
+
+    return receive_buffered(names);
+}
+
+/*
+ * Commands are streamed in chunks of at most that many bytes (unless a
+ * single command is longer). Each chunk fits in the socket's buffer,
+ * so sending it never blocks while the interpreter is itself blocked
+ * sending outputs we are not reading yet.
+ */
+#define MAX_CHUNK_SIZE (32 * 1024)
+
+/**
+ * Send several messages at once and wait for all the outputs.
+ *
+ * The messages are processed in order by the interpreter, as if sent one
+ * at a time with communicate(), but with far fewer round trips.
+ * Each outputs[i] must be freed by the caller.
+ *
+ * @return The number of outputs received, less than nb_messages on error.
+ */
+int communicate_many(struct sock_names* names, const char** messages, int nb_messages, char** outputs) {
+    if (glk_connect(names) != 0) {
+        return 0;
+    }
+
+    int nb_received = 0;
+    while (nb_received < nb_messages) {
+        /* Pack as many length-prefixed messages as fit in a chunk, at least one. */
+        size_t chunk_size = 0;
+        int chunk_end = nb_received;
+        do {
+            chunk_size += sizeof(uint32_t) + strlen(messages[chunk_end]);
+            chunk_end += 1;
+        } while (chunk_end < nb_messages
+                 && chunk_size + sizeof(uint32_t) + strlen(messages[chunk_end]) <= MAX_CHUNK_SIZE);
+
+        char* chunk = malloc(chunk_size);
+        if (!chunk) {
+            return nb_received;
+        }
+
+        char* pos = chunk;
+        for (int i = nb_received; i < chunk_end; i++) {
+            uint32_t msg_len = strlen(messages[i]);
+            uint32_t net_msg_len = htonl(msg_len);
+            memcpy(pos, &net_msg_len, sizeof(net_msg_len));
+            memcpy(pos + sizeof(net_msg_len), messages[i], msg_len);
+            pos += sizeof(net_msg_len) + msg_len;
+        }
+
+        int result = robust_send(names->sock_fd, chunk, chunk_size);
+        free(chunk);
+        if (result == -1) {
+            perror("glk_comm.c: Could not send msgs");
+            return nb_received;
+        }
+
+        for (; nb_received < chunk_end; nb_received++) {
+            outputs[nb_received] = (char*) get_output_nosend(names);
+            if (outputs[nb_received] == NULL) {
+                return nb_received;
+            }
+        }
+    }
+
+    return nb_received;
+}
+
 /* ensure we're allowed as many open files as we want */
 static void check_rlimit(void) {
     struct rlimit limits;
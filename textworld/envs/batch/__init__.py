@@ -7,6 +7,9 @@ except ImportError:
 
 from textworld.envs.batch.batch_env import AsyncBatchEnv
 from textworld.envs.batch.batch_env import SyncBatchEnv
+from textworld.envs.batch.batch_env import RaggedList
+from textworld.envs.batch.asyncio_batch_env import AsyncioBatchEnv
+from textworld.envs.batch.remote import RemoteBatchEnv
 
 
 __all__ = ['make']
@@ -0,0 +1,25 @@
+"""
+Module preloaded by the process that starts the child processes of the
+batch environments (i.e. the fork server, or the parent process itself
+when forking). Importing it loads textworld, then parses the default
+knowledge base and text grammars, which every child process inherits.
+"""
+
+import numpy as np
+
+from textworld.logic import GameLogic
+from textworld.generator.data import KnowledgeBase
+from textworld.generator.text_grammar import Grammar
+
+
+def warm_up() -> None:
+    kb = KnowledgeBase.default()
+    # Games embed their logic, which is parsed again when they are loaded.
+    # Parsing is cached, so games made with the default logic will be loaded fast.
+    GameLogic.deserialize(kb.logic.serialize())
+    # Fill the grammar cache. Use a dedicated rng to leave the global one untouched.
+    Grammar(rng=np.random.RandomState(1234))
+
+
+# On module load.
+warm_up()
@@ -0,0 +1,347 @@
+import os
+import struct
+import asyncio
+from collections import defaultdict, deque
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Tuple, List, Dict, Optional
+
+from textworld.envs.batch.batch_env import _ChildProcessesBatchEnv, _Worker, _collate_infos, _get_seeds
+
+
+_READ_SIZE = 2 ** 16  # Bytes read from a pipe at once.
+
+
+def _frame(message: Any) -> bytes:
+    """ Pickle a message the way `multiprocessing.connection.Connection.send` does. """
+    data = ForkingPickler.dumps(message)
+    if len(data) > 0x7fffffff:
+        return struct.pack("!i", -1) + struct.pack("!Q", len(data)) + data
+
+    return struct.pack("!i", len(data)) + data
+
+
+def _unframe(buffer: bytearray) -> List[Any]:
+    """ Remove the complete messages from `buffer`, see `multiprocessing.connection.Connection.recv`. """
+    messages = []
+    while len(buffer) >= 4:
+        size, = struct.unpack("!i", buffer[:4])
+        start = 4
+        if size == -1:
+            if len(buffer) < 12:
+                break
+
+            size, = struct.unpack("!Q", buffer[4:12])
+            start = 12
+
+        if len(buffer) < start + size:
+            break
+
+        messages.append(ForkingPickler.loads(buffer[start:start + size]))
+        del buffer[:start + size]
+
+    return messages
+
+
+class AsyncioBatchEnv(_ChildProcessesBatchEnv):
+    """ Environment to run multiple games in parallel from an asyncio event loop.
+
+    The games run in child processes, like with `AsyncBatchEnv`, but the
+    replies are read by the event loop as soon as they arrive. No thread
+    is needed and many games can be interleaved with other coroutines
+    (e.g. calls to an agent). All methods are coroutines.
+
+    The pipes are read and written without blocking, so large observations
+    or commands never stall the event loop while a child process is busy.
+    """
+
+    def __init__(self, env_fns: List[callable], auto_reset: bool = False, slim: bool = False,
+                 nb_workers: Optional[int] = None, start_method: Optional[str] = None,
+                 columnar: bool = False):
+        """
+        Parameters
+        ----------
+        env_fns : iterable of callable
+            Functions that create the environments.
+        auto_reset : bool
+            If `True`, each environment resets once it is done, see `AsyncBatchEnv`.
+        slim : bool
+            If `True`, the child processes only send back the requested
+            information, see `AsyncBatchEnv`.
+        nb_workers : int, optional
+            Number of child processes among which the environments are
+            split evenly. By default, each environment gets its own child process.
+        start_method : str, optional
+            How to start the child processes, see `AsyncBatchEnv`.
+        columnar : bool
+            If `True`, information is returned as columns, see `AsyncBatchEnv`.
+
+        Notes
+        -----
+        Commands sent to environments hosted by the same child process during
+        the same iteration of the event loop are sent together in one message.
+        Calling `step_env` for every game, from as many coroutines, is thus
+        about as efficient as calling `step` for the whole batch.
+        """
+        self.env_fns = env_fns
+        self.auto_reset = auto_reset
+        self.slim = slim
+        self.batch_size = len(self.env_fns)
+        self.start_method = start_method
+        self.columnar = columnar
+        self._start_workers(nb_workers)
+
+        self.last = [None] * self.batch_size
+        self._resets = {}  # Env index -> (obs, infos) of a game the child process already reset.
+        self._loop = None  # Event loop watching the child processes' pipes.
+        self._outbox = defaultdict(list)  # Worker -> (env index, command, future) not sent yet.
+        self._flush_scheduled = False
+        self._pending = defaultdict(deque)  # Worker -> messages (lists of (env index, future)) awaiting a reply.
+        self._busy = set()  # Indices of the environments waiting on a command.
+        self._inputs = defaultdict(bytearray)  # Worker -> bytes received, but not making up a whole message yet.
+        self._outputs = defaultdict(bytearray)  # Worker -> bytes not sent yet.
+
+    def _detach(self) -> None:
+        if self._loop is not None and not self._loop.is_closed():
+            for worker in self.workers:
+                self._loop.remove_reader(worker._pipe.fileno())
+                self._loop.remove_writer(worker._pipe.fileno())
+
+        self._loop = None
+        for worker in self.workers:
+            if worker._pipe.closed:
+                continue
+
+            # Without an event loop, `_Worker` goes back to blocking calls: finish sending what was started.
+            os.set_blocking(worker._pipe.fileno(), True)
+            output = memoryview(self._outputs.pop(worker, b""))
+            try:
+                while len(output) > 0:
+                    output = output[os.write(worker._pipe.fileno(), output):]
+            except OSError:
+                pass  # Child process is already gone.
+
+    def _attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._detach()
+        self._loop = loop
+        for worker in self.workers:
+            os.set_blocking(worker._pipe.fileno(), False)
+            loop.add_reader(worker._pipe.fileno(), self._on_readable, worker)
+
+    def _fail(self, worker: _Worker, exc: Exception) -> None:
+        """ The child process is gone, fail everything it had left to do. """
+        self._loop.remove_reader(worker._pipe.fileno())
+        self._loop.remove_writer(worker._pipe.fileno())
+        self._inputs.pop(worker, None)
+        self._outputs.pop(worker, None)
+        for message in self._pending.pop(worker, []):
+            for i, future in message:
+                self._busy.discard(i)
+                if not future.done():
+                    future.set_exception(exc)
+
+    def _on_readable(self, worker: _Worker) -> None:
+        try:
+            data = os.read(worker._pipe.fileno(), _READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(worker, e)
+            return
+
+        if not data:
+            self._fail(worker, EOFError())
+            return
+
+        buffer = self._inputs[worker]
+        buffer += data
+        for results in _unframe(buffer):
+            self._on_results(worker, results)
+
+    def _on_results(self, worker: _Worker, results: List[Any]) -> None:
+        message = self._pending[worker].popleft()
+        if len(self._pending[worker]) == 0:
+            del self._pending[worker]
+
+        for (i, future), result in zip(message, results):
+            self._busy.discard(i)
+            if not future.done():  # The awaiting coroutine might have been cancelled.
+                future.set_result(self.envs[i]._decode(result))
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        outbox, self._outbox = self._outbox, defaultdict(list)
+        for worker, message in outbox.items():
+            self._pending[worker].append([(i, future) for i, _, future in message])
+            writing = len(self._outputs[worker]) > 0
+            self._outputs[worker] += _frame([command for _, command, _ in message])
+            if not writing:
+                self._on_writable(worker)
+
+    def _on_writable(self, worker: _Worker) -> None:
+        output = self._outputs[worker]
+        try:
+            sent = os.write(worker._pipe.fileno(), output)
+        except BlockingIOError:
+            sent = 0
+        except OSError as e:
+            self._fail(worker, e)
+            return
+
+        del output[:sent]
+        if len(output) == 0:
+            del self._outputs[worker]
+            self._loop.remove_writer(worker._pipe.fileno())
+        else:
+            self._loop.add_writer(worker._pipe.fileno(), self._on_writable, worker)
+
+    async def _run(self, commands: Dict[int, Tuple]) -> Dict[int, Any]:
+        """
+        Run commands in the environments.
+
+        Parameters
+        ----------
+        commands :
+            Mapping from environment indices to commands, e.g. `("call", "step", (action,))`.
+
+        Returns
+        -------
+        Mapping from environment indices to results.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._attach(loop)
+
+        for i in commands:
+            assert i not in self._busy, "Environment {} is still waiting on a previous command.".format(i)
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)  # Once the other coroutines had the chance to queue up commands.
+
+        futures = {}
+        for i, command in commands.items():
+            self._busy.add(i)
+            env = self.envs[i]
+            futures[i] = loop.create_future()
+            self._outbox[env._worker].append((i, env._command(*command), futures[i]))
+
+        results = await asyncio.gather(*futures.values())
+        return dict(zip(futures, results))
+
+    async def _run_all(self, *command) -> List[Any]:
+        results = await self._run({i: command for i in range(self.batch_size)})
+        return [results[i] for i in range(self.batch_size)]
+
+    async def load(self, game_files: List[str]) -> None:
+        assert len(game_files) == len(self.envs)
+        self._resets.clear()
+        await self._run({i: ("call", "load", (game_file,)) for i, game_file in enumerate(game_files)})
+
+    async def prefetch(self, game_files: List[str]) -> None:
+        """ Prepare the games to be loaded next, see `AsyncBatchEnv.prefetch`. """
+        assert len(game_files) == len(self.envs)
+        await self._run({i: ("call", "prefetch", (game_file,)) for i, game_file in enumerate(game_files)})
+
+    async def seed(self, seed=None):
+        seeds = _get_seeds(seed, self.batch_size)
+        await self._run({i: ("call", "seed", (seed,)) for i, seed in enumerate(seeds)})
+        return seeds
+
+    async def reset(self, env_ids: Optional[List[int]] = None) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Reset environments of the batch.
+
+        Parameters
+        ----------
+        env_ids : optional
+            Indices of the environments to reset. By default, all environments of the batch.
+
+        Returns:
+            obs: Text observations, i.e. command's feedback.
+            infos: Information requested when creating the environments.
+        """
+        env_ids = range(self.batch_size) if env_ids is None else env_ids
+        if len(env_ids) == 0:
+            return (), _collate_infos([], self.columnar)
+
+        results = await self._run({i: ("call", "reset", ()) for i in env_ids})
+        for i in env_ids:
+            self.last[i] = None
+            self._resets.pop(i, None)
+
+        obs, infos = zip(*[results[i] for i in env_ids])
+        infos = _collate_infos(infos, self.columnar)
+        return obs, infos
+
+    async def step(self, actions: List[str], env_ids: Optional[List[int]] = None
+                   ) -> Tuple[List[str], List[float], List[bool], Dict[str, List[Any]]]:
+        """
+        Perform one action per environment of the batch.
+
+        Parameters
+        ----------
+        actions :
+            Actions to perform.
+        env_ids : optional
+            Indices of the environments to send the actions to. By default,
+            all environments of the batch.
+
+        Returns:
+            obs: Text observations, i.e. command's feedback.
+            reward: Current game score.
+            done: Whether the game is over or not.
+            infos: Information requested when creating the environments.
+        """
+        assert isinstance(actions, (list, tuple)), "Expected a list of actions."
+        env_ids = range(self.batch_size) if env_ids is None else env_ids
+        assert len(actions) == len(env_ids), "Expected one action per environment."
+        if len(env_ids) == 0:
+            return (), (), (), _collate_infos([], self.columnar)
+
+        results = {}
+        commands = {}
+        for i, action in zip(env_ids, actions):
+            if self.last[i] is not None and self.last[i][2]:  # Game has ended on the last step.
+                if self.auto_reset:
+                    # The child process reset the game as soon as it ended.
+                    obs, infos = self._resets.pop(i)
+                    self.last[i] = (obs, 0., False, infos)
+
+                results[i] = self.last[i]  # Copy last state over.
+            elif self.auto_reset:
+                commands[i] = ("step_reset", "step", (action,))
+            else:
+                commands[i] = ("call", "step", (action,))
+
+        for i, result in (await self._run(commands)).items():
+            if self.auto_reset:
+                result, reset_result = result
+                if reset_result is not None:
+                    self._resets[i] = reset_result  # Returned on the next step.
+
+            results[i] = self.last[i] = result
+
+        obs, rewards, dones, infos = zip(*[results[i] for i in env_ids])
+        infos = _collate_infos(infos, self.columnar)
+        return obs, rewards, dones, infos
+
+    async def reset_env(self, env_id: int) -> Tuple[str, Dict[str, Any]]:
+        """ Reset a single environment of the batch, see `reset`. """
+        obs, infos = await self.reset(env_ids=[env_id])
+        return obs[0], {key: values[0] for key, values in infos.items()}
+
+    async def step_env(self, env_id: int, action: str) -> Tuple[str, float, bool, Dict[str, Any]]:
+        """ Perform an action in a single environment of the batch, see `step`. """
+        obs, rewards, dones, infos = await self.step([action], env_ids=[env_id])
+        return obs[0], rewards[0], dones[0], {key: values[0] for key, values in infos.items()}
+
+    async def fetch(self, key: str) -> List:
+        """ Retrieve information from the last game state of each environment, see `AsyncBatchEnv.fetch`. """
+        return await self._run_all("fetch", "state", key)
+
+    async def render(self, mode='human'):
+        return await self._run_all("call", "render", (mode,))
+
+    async def close(self):
+        await self._run_all("call", "close", ())
+        self._detach()
@@ -1,75 +1,421 @@
 
+import time
 import multiprocessing as mp
-from typing import Tuple, List, Dict
+from multiprocessing.connection import wait
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, deque
+from typing import Any, Tuple, List, Dict, Iterable, Optional
 
 import numpy as np
 
-from textworld.core import Environment
+from textworld.core import Environment, GameState
+
+
+# Methods whose results are slimmed down before being sent back by the child processes.
+_SLIM_METHODS = ("reset", "step")
+
+
+# Information returned as NumPy arrays in columnar mode, along with their dtype.
+_NUMERIC_INFOS = {
+    "score": np.float64,
+    "max_score": np.float64,
+    "moves": np.float64,
+    "intermediate_reward": np.float64,
+    "won": np.bool_,
+    "lost": np.bool_,
+}
+# Information returned as `RaggedList` in columnar mode.
+_STRING_LIST_INFOS = ("admissible_commands", "possible_admissible_commands", "policy_commands",
+                      "command_templates", "verbs", "entities")
+
+
+class RaggedList:
+    """
+    Lists of strings of different lengths, stored one after the other.
+
+    The strings of the i-th list are `flat[offsets[i]:offsets[i + 1]]`.
+    Indexing returns that list, as with a list of lists.
+    """
+    __slots__ = ("flat", "offsets")
+
+    def __init__(self, flat: List[str], offsets: np.ndarray):
+        self.flat = flat
+        self.offsets = offsets
+
+    @classmethod
+    def from_lists(cls, lists: List[Optional[List[str]]]) -> "RaggedList":
+        """ Missing lists (i.e. `None`) are stored as empty lists. """
+        flat = []
+        offsets = np.empty(len(lists) + 1, dtype=np.int64)
+        offsets[0] = 0
+        for i, list_ in enumerate(lists):
+            if list_:
+                flat += list_
+
+            offsets[i + 1] = len(flat)
+
+        return cls(flat, offsets)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> List[str]:
+        if i < 0:
+            i += len(self)
+
+        if not 0 <= i < len(self):
+            raise IndexError("RaggedList index out of range")
+
+        return self.flat[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, RaggedList)
+                and self.flat == other.flat
+                and np.array_equal(self.offsets, other.offsets))
+
+    def __repr__(self) -> str:
+        return "RaggedList({!r})".format(list(self))
+
+
+def _infos_keys(list_: List[Dict]) -> Iterable[str]:
+    keys = list_[0].keys() if list_ else ()
+    if any(dict_.keys() != keys for dict_ in list_):
+        keys = set(key for dict_ in list_ for key in dict_)
+
+    return keys
 
 
 def _list_of_dicts_to_dict_of_lists(list_: List[Dict]) -> Dict[str, List]:
     # Convert List[Dict] to Dict[List]
-    keys = set(key for dict_ in list_ for key in dict_)
-    return {key: [dict_.get(key) for dict_ in list_] for key in keys}
+    return {key: [dict_.get(key) for dict_ in list_] for key in _infos_keys(list_)}
+
+
+def _list_of_dicts_to_columns(list_: List[Dict]) -> Dict[str, Any]:
+    """
+    Convert List[Dict] to Dict[column], where numerical information are
+    NumPy arrays and lists of strings are `RaggedList`. Missing values
+    are NaN, `False` or an empty list, respectively.
+    """
+    columns = {}
+    for key in _infos_keys(list_):
+        values = [dict_.get(key) for dict_ in list_]
+        if key in _NUMERIC_INFOS:
+            columns[key] = np.array(values, dtype=_NUMERIC_INFOS[key])  # None becomes NaN or False.
+        elif key in _STRING_LIST_INFOS:
+            columns[key] = RaggedList.from_lists(values)
+        else:
+            columns[key] = values
+
+    return columns
+
+
+def _collate_infos(list_: List[Dict], columnar: bool = False) -> Dict[str, Any]:
+    if columnar:
+        return _list_of_dicts_to_columns(list_)
+
+    return _list_of_dicts_to_dict_of_lists(list_)
+
+
+def _get_requested_infos(env, game_state: GameState) -> Dict:
+    # Same as `textworld.envs.wrappers.Filter`.
+    infos = {attr: getattr(game_state, attr) for attr in env.request_infos.basics}
+    for attr in env.request_infos.extras:
+        key = "extra.{}".format(attr)
+        infos[key] = game_state.get(key)
+
+    return infos
+
+
+def _slim_result(env, result, last_keys):
+    """
+    Keep only the requested information from the result of `reset` or `step`.
+
+    The infos dictionary is encoded as `(keys, values)` where `keys` is
+    `None` when identical to the ones sent previously (i.e. `last_keys`).
+    """
+    if isinstance(result, GameState):  # Output of `reset` without a `Filter` wrapper.
+        result = (result.feedback, _get_requested_infos(env, result))
+    elif isinstance(result[0], GameState):  # Output of `step` without a `Filter` wrapper.
+        game_state, score, done = result
+        result = (game_state.feedback, score, done, _get_requested_infos(env, game_state))
+
+    infos = result[-1]
+    keys = tuple(infos)
+    values = tuple(infos.values())
+    return result[:-1] + ((None if keys == last_keys else keys, values),), keys
+
+
+def _get_context(start_method: Optional[str] = None):
+    """
+    Get a multiprocessing context whose child processes start with textworld
+    already imported and its default knowledge base and grammars parsed.
+    """
+    context = mp.get_context(start_method)
+    if context.get_start_method() == "fork":
+        import textworld.envs.batch._preload  # noqa: F401  Child processes inherit the parent's memory.
+    elif context.get_start_method() == "forkserver":
+        # Has no effect if the fork server is already running.
+        context.set_forkserver_preload(["textworld.envs.batch._preload"])
+
+    return context
+
+
+def _get_seeds(seed, batch_size: int) -> List[int]:
+    """ One seed per environment of the batch, derived from `seed` unless it is already a list. """
+    seeds = seed
+    if seeds is None or isinstance(seeds, int):
+        # Use a different seed for each env to decorrelate batch examples.
+        rng = np.random.RandomState(seeds)
+        seeds = list(rng.randint(65635, size=batch_size))
+
+    return seeds
+
 
+def _close_prefetched(future):
+    if future.exception() is None:
+        env, _ = future.result()
+        env.close()
+
+
+class _Prefetcher:
+    """
+    Prepare the next games of an environment in a background thread.
 
-def _child(env_fn, parent_pipe, pipe):
+    Each upcoming game is loaded and reset in a new environment of its own.
+    Loading that game later on only requires swapping environments, and
+    the reset that follows returns the result obtained in the background.
     """
-    Event loop run by the child processes
+    def __init__(self, env_fn):
+        self.env_fn = env_fn
+        self._seed = None  # Last seed given to the environment.
+        self._executor = None
+        self._queue = deque()  # (game_file, future) in the order the games were prefetched.
+        self._reset_result = None  # Result of `reset` for the last game swapped in.
+
+    def _warm_up(self, game_file, seed):
+        env = self.env_fn()
+        if seed is not None:
+            env.seed(seed)
+
+        env.load(game_file)
+        return env, env.reset()
+
+    def prefetch(self, game_file: str) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._queue.append((game_file, self._executor.submit(self._warm_up, game_file, self._seed)))
+
+    def clear(self) -> None:
+        while self._queue:
+            _, future = self._queue.popleft()
+            future.add_done_callback(_close_prefetched)
+
+    def seed(self, env, seed):
+        self._seed = seed
+        self.clear()  # Prefetched games used the previous seed.
+        return env.seed(seed)
+
+    def load(self, env, game_file: str):
+        """ Load a game, then return the environment to use from now on. """
+        self._reset_result = None
+        if game_file not in (prefetched for prefetched, _ in self._queue):
+            self.clear()  # Games were not loaded in the order they were prefetched.
+
+        while self._queue:
+            prefetched, future = self._queue.popleft()
+            if prefetched != game_file:
+                future.add_done_callback(_close_prefetched)  # Skipped.
+                continue
+
+            if future.exception() is not None:
+                break  # Let `env.load` report the error.
+
+            env.close()
+            env, self._reset_result = future.result()
+            return env
+
+        env.load(game_file)
+        return env
+
+    def reset(self, env):
+        result, self._reset_result = self._reset_result, None
+        if result is None:
+            result = env.reset()
+
+        return result
+
+    def close(self, env):
+        self._reset_result = None
+        self.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        return env.close()
+
+
+def _child(env_fns, parent_pipe, pipe, slim=False):
+    """
+    Event loop run by the child processes.
+
+    Each child process hosts one or more environments.
     """
+    envs = []
+    prefetchers = []
     try:
-        parent_pipe.close()
+        if parent_pipe is not None:
+            parent_pipe.close()
+
+        envs = [env_fn() for env_fn in env_fns]
+        prefetchers = [_Prefetcher(env_fn) for env_fn in env_fns]
+        last_keys = [None] * len(envs)
+
+        def _call(env_id, method, args):
+            if method == "load":
+                envs[env_id] = prefetchers[env_id].load(envs[env_id], *args)
+                result = None
+            elif method in ("reset", "seed", "close"):
+                result = getattr(prefetchers[env_id], method)(envs[env_id], *args)
+            elif method == "prefetch":
+                result = prefetchers[env_id].prefetch(*args)
+            else:
+                result = getattr(envs[env_id], method)(*args)
+
+            if slim and method in _SLIM_METHODS:
+                result, last_keys[env_id] = _slim_result(envs[env_id], result, last_keys[env_id])
 
-        env = env_fn()
+            return result
 
         while True:
-            command = pipe.recv()
-            # command is a tuple like ("call" | "get", "name.of.attr", extra args...)
-
-            obj = env
-            attrs = command[1].split(".")
-            for attr in attrs[:-1]:
-                obj = getattr(obj, attr)
-
-            if command[0] == "call":
-                fct = getattr(obj, attrs[-1])
-                result = fct(*command[2])
-            elif command[0] == "get":
-                result = getattr(obj, attrs[-1])
-            elif command[0] == "hasattr":
-                result = hasattr(obj, attrs[-1])
-            elif command[0] == "close":
-                break
-
-            pipe.send(result)
+            commands = pipe.recv()
+            # commands is a list of tuples like
+            # (env_id, "call" | "get" | "hasattr" | "fetch" | "step_reset" | "close", "name.of.attr", extra args...)
+
+            results = []
+            for command in commands:
+                env_id = command[0]
+                command = command[1:]
+                if command[0] == "close":
+                    return
+
+                obj = envs[env_id]
+                attrs = command[1].split(".")
+                for attr in attrs[:-1]:
+                    obj = getattr(obj, attr)
+
+                if command[0] == "call" and len(attrs) == 1:
+                    result = _call(env_id, command[1], command[2])
+                elif command[0] == "call":
+                    fct = getattr(obj, attrs[-1])
+                    result = fct(*command[2])
+                elif command[0] == "step_reset":
+                    # Step, then reset right away if the game has ended.
+                    result = _call(env_id, "step", command[2])
+                    result = (result, _call(env_id, "reset", ()) if result[2] else None)
+                elif command[0] == "get":
+                    result = getattr(obj, attrs[-1])
+                elif command[0] == "hasattr":
+                    result = hasattr(obj, attrs[-1])
+                elif command[0] == "fetch":
+                    result = getattr(obj, attrs[-1]).get(command[2])
+
+                results.append(result)
+
+            pipe.send(results)
 
     finally:
-        env.close()
+        for prefetcher, env in zip(prefetchers, envs):
+            prefetcher.close(env)
+
         pipe.close()
 
 
-class _ChildEnv:
+class _Worker:
     """
-    Wrapper for an env in a child process.
+    Child process hosting one or more environments.
     """
-    def __init__(self, env_fn):
-        self._pipe, child_pipe = mp.Pipe()
-        self._process = mp.Process(target=_child, args=(env_fn, self._pipe, child_pipe))
+    def __init__(self, env_fns, slim=False, context=mp):
+        self._pipe, child_pipe = context.Pipe()
+        self._process = context.Process(target=_child, args=(env_fns, self._pipe, child_pipe, slim))
         self._process.daemon = True
         self._process.start()
         child_pipe.close()
 
+    def send(self, commands):
+        self._pipe.send(commands)
+
+    def recv(self):
+        return self._pipe.recv()
+
+    def __del__(self):
+        try:
+            self.send([(0, "close")])
+            self._process.join(timeout=1)
+        except (BrokenPipeError, OSError):
+            pass  # Child process is already gone.
+
+        self._pipe.close()
+        self._process.terminate()
+        self._process.join()
+
+
+class _ChildEnv:
+    """
+    Wrapper for an env in a child process.
+    """
+    def __init__(self, worker, env_id, slim=False):
+        self._worker = worker
+        self._env_id = env_id
+        self._slim = slim
+        self._infos_keys = None  # Keys of the infos last received, in slim mode.
+        self._pending = None  # Last command sent.
+
+    def _command(self, *command):
+        self._pending = command
+        return (self._env_id,) + command
+
+    def _unslim(self, result):
+        keys, values = result[-1]
+        if keys is not None:
+            self._infos_keys = keys
+
+        return result[:-1] + (dict(zip(self._infos_keys, values)),)
+
+    def _decode(self, result):
+        if not self._slim:
+            return result
+
+        if self._pending[0] == "call" and self._pending[1] in _SLIM_METHODS:
+            return self._unslim(result)
+
+        if self._pending[0] == "step_reset":
+            step_result, reset_result = result
+            return self._unslim(step_result), reset_result and self._unslim(reset_result)
+
+        return result
+
     def call(self, method, *args):
-        self._pipe.send(("call", method, args))
+        self._worker.send([self._command("call", method, args)])
 
     def get(self, attr):
-        self._pipe.send(("get", attr))
+        self._worker.send([self._command("get", attr)])
 
     def hasattr(self, attr):
-        self._pipe.send(("hasattr", attr))
+        self._worker.send([self._command("hasattr", attr)])
+
+    def fetch(self, key):
+        self._worker.send([self._command("fetch", "state", key)])
 
     def result(self):
-        return self._pipe.recv()
+        return self._decode(self._worker.recv()[0])
 
     def call_sync(self, *args):
         self.call(*args)
@@ -83,50 +429,155 @@ class _ChildEnv:
         self.hasattr(*args)
         return self.result()
 
-    def __del__(self):
-        self.call_sync("close")
-        self._pipe.close()
-        self._process.terminate()
-        self._process.join()
 
+class _ChildProcessesBatchEnv:
+    """ Batch of environments hosted by child processes, see `AsyncBatchEnv`. """
+
+    def _start_workers(self, nb_workers: Optional[int] = None) -> None:
+        """ Split the environments evenly among `nb_workers` child processes (by default, one each). """
+        self.nb_workers = min(nb_workers or self.batch_size, self.batch_size)
+        self.workers = []
+        self.envs = []
+        for worker_id, env_ids in enumerate(np.array_split(np.arange(self.batch_size), self.nb_workers)):
+            worker = self._make_worker(worker_id, [self.env_fns[i] for i in env_ids])
+            self.workers.append(worker)
+            self.envs += [_ChildEnv(worker, env_id, self.slim) for env_id in range(len(env_ids))]
+
+    def _make_worker(self, worker_id: int, env_fns: List[callable]) -> _Worker:
+        return _Worker(env_fns, self.slim, _get_context(self.start_method))
 
-class AsyncBatchEnv(Environment):
+
+class AsyncBatchEnv(_ChildProcessesBatchEnv, Environment):
     """ Environment to run multiple games in parallel asynchronously. """
 
-    def __init__(self, env_fns: List[callable], auto_reset: bool = False):
+    def __init__(self, env_fns: List[callable], auto_reset: bool = False, slim: bool = False,
+                 nb_workers: Optional[int] = None, start_method: Optional[str] = None,
+                 columnar: bool = False):
         """
         Parameters
         ----------
         env_fns : iterable of callable
             Functions that create the environments.
+        auto_reset : bool
+            If `True`, each environment resets once it is done. The child
+            process resets a game right after its final step and sends
+            both results at once. The reset is returned by the next `step`.
+        slim : bool
+            If `True`, the child processes only send back the information
+            requested by their environment's `request_infos`, in a compact
+            form. The full game states (e.g. `game` or `_game_progression`)
+            stay in the child processes and can be retrieved with `fetch`.
+            This also allows using environments without a `Filter` wrapper.
+        nb_workers : int, optional
+            Number of child processes among which the environments are
+            split evenly. Each child process hosts several environments
+            and receives all of their commands at once. By default, each
+            environment gets its own child process.
+        start_method : str, optional
+            How to start the child processes: "fork", "spawn" or "forkserver"
+            (see `multiprocessing`). With "forkserver", a server process that has
+            already imported textworld and parsed its default knowledge base
+            and grammars forks the child processes on demand. This makes
+            them start much faster than with "spawn", and is safer than "fork"
+            when the parent process uses threads. By default, use the
+            platform's default start method.
+        columnar : bool
+            If `True`, information is returned as columns: NumPy arrays for
+            numerical information (e.g. score, won) and `RaggedList` for lists
+            of strings (e.g. admissible_commands). Otherwise, as lists.
         """
         self.env_fns = env_fns
         self.auto_reset = auto_reset
+        self.slim = slim
         self.batch_size = len(self.env_fns)
+        self.start_method = start_method
+        self.columnar = columnar
+        self._start_workers(nb_workers)
 
-        self.envs = []
-        for env_fn in self.env_fns:
-            self.envs.append(_ChildEnv(env_fn))
+        self.last = [None] * self.batch_size
+        # Used by `step_async` and `step_wait`.
+        self._pending = defaultdict(deque)  # Worker -> messages (lists of (env index, command)) awaiting a reply.
+        self._ready = {}  # Env index -> step result not yet returned by `step_wait`.
+        self._resets = {}  # Env index -> (obs, infos) of a game the child process already reset.
+
+    def _send(self, commands: Dict[int, Tuple]) -> None:
+        messages = defaultdict(list)
+        for i, command in commands.items():
+            env = self.envs[i]
+            messages[env._worker].append((i, env._command(*command)))
+
+        for worker, message in messages.items():
+            worker.send([command for _, command in message])
+            self._pending[worker].append(message)
+
+    def _recv(self, worker: _Worker) -> List[Tuple[int, Tuple, Any]]:
+        message = self._pending[worker].popleft()
+        if len(self._pending[worker]) == 0:
+            del self._pending[worker]
+
+        return [(i, command, self.envs[i]._decode(result)) for (i, command), result in zip(message, worker.recv())]
+
+    def _discard_pending(self) -> None:
+        """ Wait for the actions sent by `step_async` and discard their results. """
+        while self._pending:
+            self._recv(next(iter(self._pending)))
+
+        self._ready.clear()
+
+    def _run(self, commands: Dict[int, Tuple]) -> Dict[int, Any]:
+        """
+        Run commands in the environments, sending a single message to each child process.
+
+        Parameters
+        ----------
+        commands :
+            Mapping from environment indices to commands, e.g. `("call", "step", (action,))`.
+
+        Returns
+        -------
+        Mapping from environment indices to results.
+        """
+        assert len(self._pending) == 0 and len(self._ready) == 0, "Call `step_wait` first."
+
+        self._send(commands)
+        results = {}
+        while self._pending:
+            for i, _, result in self._recv(next(iter(self._pending))):
+                results[i] = result
+
+        return results
+
+    def _run_all(self, *command) -> List[Any]:
+        results = self._run({i: command for i in range(self.batch_size)})
+        return [results[i] for i in range(self.batch_size)]
 
     def load(self, game_files: List[str]) -> None:
         assert len(game_files) == len(self.envs)
-        for env, game_file in zip(self.envs, game_files):
-            env.call("load", game_file)
+        self._discard_pending()
+        self._resets.clear()
+        self._run({i: ("call", "load", (game_file,)) for i, game_file in enumerate(game_files)})
 
-        # Join
-        for env in self.envs:
-            env.result()
+    def prefetch(self, game_files: List[str]) -> None:
+        """
+        Prepare the games to be loaded next, in the background.
 
-    def seed(self, seed=None):
-        seeds = seed
-        if seeds is None or isinstance(seeds, int):
-            # Use a different seed for each env to decorrelate batch examples.
-            rng = np.random.RandomState(seeds)
-            seeds = list(rng.randint(65635, size=self.batch_size))
+        The child processes load and reset each game in a new environment
+        while the current games are being played. A subsequent `load` of
+        the same games is then a swap of environments and the following
+        `reset` returns right away. Calling `prefetch` several times queues
+        up several batches of games, which must be loaded in that order.
 
-        for env, seed in zip(self.envs, seeds):
-            env.call_sync("seed", seed)
+        Parameters
+        ----------
+        game_files :
+            One game per environment of the batch.
+        """
+        assert len(game_files) == len(self.envs)
+        self._run({i: ("call", "prefetch", (game_file,)) for i, game_file in enumerate(game_files)})
 
+    def seed(self, seed=None):
+        seeds = _get_seeds(seed, self.batch_size)
+        self._run({i: ("call", "seed", (seed,)) for i, seed in enumerate(seeds)})
         return seeds
 
     def reset(self) -> Tuple[List[str], Dict[str, List[str]]]:
@@ -137,13 +588,12 @@ class AsyncBatchEnv(Environment):
             obs: Text observations, i.e. command's feedback.
             infos: Information requested when creating the environments.
         """
+        self._discard_pending()
         self.last = [None] * self.batch_size
-        for env in self.envs:
-            env.call("reset")
-
-        results = [env.result() for env in self.envs]
+        self._resets.clear()
+        results = self._run_all("call", "reset", ())
         obs, infos = zip(*results)
-        infos = _list_of_dicts_to_dict_of_lists(infos)
+        infos = _collate_infos(infos, self.columnar)
         return obs, infos
 
     def step(self, actions: List[str]) -> Tuple[List[str], int, bool, Dict[str, List[str]]]:
@@ -159,40 +609,133 @@ class AsyncBatchEnv(Environment):
         assert isinstance(actions, (list, tuple)), "Expected a list of actions."
         assert len(actions) == len(self.envs), "Expected one action per environment."
 
-        results = []
-        for i, (env, action) in enumerate(zip(self.envs, actions)):
-            if self.last[i] is not None and self.last[i][2]:  # Game has ended on the last step.
-                obs, reward, done, infos = self.last[i]  # Copy last state over.
+        self.step_async(actions)
+        _, obs, rewards, dones, infos = self.step_wait()
+        return obs, rewards, dones, infos
 
-                if self.auto_reset:
-                    reward, done = 0., False
-                    obs, infos = env.call_sync("reset")
+    def step_async(self, actions: List[str], env_ids: Optional[List[int]] = None) -> None:
+        """
+        Send one action per environment without waiting for the results.
 
-                results.append((obs, reward, done, infos))
+        Parameters
+        ----------
+        actions :
+            Actions to perform.
+        env_ids : optional
+            Indices of the environments to send the actions to. By default,
+            all environments of the batch. Environments still waiting on
+            a previous action cannot be given a new one.
+
+        Notes
+        -----
+        Use `step_wait` to retrieve the results.
+        """
+        assert isinstance(actions, (list, tuple)), "Expected a list of actions."
+        env_ids = range(self.batch_size) if env_ids is None else env_ids
+        assert len(actions) == len(env_ids), "Expected one action per environment."
 
+        busy = set(self._ready)
+        for message in self._pending.values():
+            busy.update(i for m in message for i, _ in m)
+
+        commands = {}
+        for i, action in zip(env_ids, actions):
+            assert i not in busy, "Environment {} is still waiting on a previous action.".format(i)
+            if self.last[i] is not None and self.last[i][2]:  # Game has ended on the last step.
+                if self.auto_reset:
+                    # The child process reset the game as soon as it ended.
+                    obs, infos = self._resets.pop(i)
+                    self._ready[i] = self.last[i] = (obs, 0., False, infos)
+                else:
+                    self._ready[i] = self.last[i]  # Copy last state over.
+
+            elif self.auto_reset:
+                commands[i] = ("step_reset", "step", (action,))
             else:
-                env.call("step", action)
-                results.append(None)
+                commands[i] = ("call", "step", (action,))
+
+        self._send(commands)
+
+    def step_wait(self, timeout: Optional[float] = None, min_ready: Optional[int] = None
+                  ) -> Tuple[List[int], List[str], List[float], List[bool], Dict[str, List[Any]]]:
+        """
+        Retrieve the results of the actions sent by `step_async`.
+
+        Results are returned as soon as they are available, i.e. the
+        environments that are done first don't have to wait after the
+        slowest ones. Results that are not returned can be retrieved by
+        a subsequent call.
+
+        Parameters
+        ----------
+        timeout : optional
+            Maximum number of seconds to wait. By default, wait until
+            `min_ready` environments are ready.
+        min_ready : optional
+            Minimum number of environments that need to be ready before
+            returning. By default, wait for all of them.
+
+        Returns:
+            env_ids: Indices of the environments that are ready.
+            obs: Text observations, i.e. command's feedback.
+            reward: Current game score.
+            done: Whether the game is over or not.
+            infos: Information requested when creating the environments.
+        """
+        nb_pending = sum(len(m) for messages in self._pending.values() for m in messages)
+        min_ready = nb_pending + len(self._ready) if min_ready is None else min_ready
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while self._pending and len(self._ready) < min_ready:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            workers = {worker._pipe: worker for worker in self._pending}
+            pipes = wait(list(workers), remaining)
+            if not pipes:
+                break  # Timeout.
+
+            for pipe in pipes:
+                for i, command, result in self._recv(workers[pipe]):
+                    if command[1] == "step_reset":
+                        result, reset_result = result
+                        if reset_result is not None:
+                            self._resets[i] = reset_result  # Returned on the next step.
+
+                    self._ready[i] = self.last[i] = result
+
+        env_ids = sorted(self._ready)
+        results = [self._ready.pop(i) for i in env_ids]
+        if len(results) == 0:
+            return [], [], [], [], {}
 
-        results = [result or env.result() for env, result in zip(self.envs, results)]
         obs, rewards, dones, infos = zip(*results)
-        self.last = results
-        infos = _list_of_dicts_to_dict_of_lists(infos)
-        return obs, rewards, dones, infos
+        infos = _collate_infos(infos, self.columnar)
+        return env_ids, obs, rewards, dones, infos
 
-    def render(self, mode='human'):
-        for env in self.envs:
-            env.call("render", mode)
+    def fetch(self, key: str) -> List:
+        """
+        Retrieve information from the last game state of each environment.
 
-        return [env.result() for env in self.envs]
+        This is mostly useful in slim mode, to get information that
+        is not sent back after each `reset` and `step`. With `auto_reset`,
+        games that have ended are already reset in the child processes.
 
-    def close(self):
-        for env in self.envs:
-            env.call("close")
+        Parameters
+        ----------
+        key : str
+            Name of the information to retrieve, e.g. "_game_progression".
 
-        # Join
-        for env in self.envs:
-            env.result()
+        Returns
+        -------
+        The requested information for each environment of the batch.
+        """
+        return self._run_all("fetch", "state", key)
+
+    def render(self, mode='human'):
+        return self._run_all("call", "render", (mode,))
+
+    def close(self):
+        self._discard_pending()
+        self._run_all("call", "close", ())
 
     def __del__(self):
         self.close()
@@ -201,32 +744,46 @@ class AsyncBatchEnv(Environment):
 class SyncBatchEnv(Environment):
     """ Environment to run multiple games independently synchronously. """
 
-    def __init__(self, env_fns: List[callable], auto_reset: bool = False):
+    def __init__(self, env_fns: List[callable], auto_reset: bool = False, columnar: bool = False):
         """
         Parameters
         ----------
         env_fns : iterable of callable
             Functions that create the environments
+        columnar : bool
+            If `True`, information is returned as columns: NumPy arrays for
+            numerical information (e.g. score, won) and `RaggedList` for lists
+            of strings (e.g. admissible_commands). Otherwise, as lists.
         """
         self.env_fns = env_fns
         self.batch_size = len(self.env_fns)
         self.auto_reset = auto_reset
+        self.columnar = columnar
         self.envs = [env_fn() for env_fn in self.env_fns]
+        self.last = [None] * self.batch_size
+        self._ready = {}  # Env index -> step result not yet returned by `step_wait`.
+        self._prefetchers = [_Prefetcher(env_fn) for env_fn in self.env_fns]
 
     def load(self, game_files: List[str]) -> None:
         assert len(game_files) == len(self.envs)
-        for env, game_file in zip(self.envs, game_files):
-            env.load(game_file)
+        self._ready.clear()
+        for i, game_file in enumerate(game_files):
+            self.envs[i] = self._prefetchers[i].load(self.envs[i], game_file)
 
-    def seed(self, seed=None):
-        seeds = seed
-        if seeds is None or isinstance(seeds, int):
-            # Use a different seed for each env to decorrelate batch examples.
-            rng = np.random.RandomState(seeds)
-            seeds = list(rng.randint(65635, size=self.batch_size))
+    def prefetch(self, game_files: List[str]) -> None:
+        """
+        Prepare the games to be loaded next, see `AsyncBatchEnv.prefetch`.
 
-        for env, seed in zip(self.envs, seeds):
-            env.seed(seed)
+        The games are prepared in background threads.
+        """
+        assert len(game_files) == len(self.envs)
+        for prefetcher, game_file in zip(self._prefetchers, game_files):
+            prefetcher.prefetch(game_file)
+
+    def seed(self, seed=None):
+        seeds = _get_seeds(seed, self.batch_size)
+        for prefetcher, env, seed in zip(self._prefetchers, self.envs, seeds):
+            prefetcher.seed(env, seed)
 
         return seeds
 
@@ -239,9 +796,10 @@ class SyncBatchEnv(Environment):
             infos: Information requested when creating the environments.
         """
         self.last = [None] * self.batch_size
-        results = [env.reset() for env in self.envs]
+        self._ready.clear()
+        results = [prefetcher.reset(env) for prefetcher, env in zip(self._prefetchers, self.envs)]
         obs, infos = zip(*results)
-        infos = _list_of_dicts_to_dict_of_lists(infos)
+        infos = _collate_infos(infos, self.columnar)
         return obs, infos
 
     def step(self, actions):
@@ -257,28 +815,57 @@ class SyncBatchEnv(Environment):
         assert isinstance(actions, (list, tuple)), "Expected a list of actions."
         assert len(actions) == len(self.envs), "Expected one action per environment."
 
-        results = []
-        for i, (env, action) in enumerate(zip(self.envs, actions)):
+        self.step_async(actions)
+        _, obs, rewards, dones, infos = self.step_wait()
+        return obs, rewards, dones, infos
+
+    def step_async(self, actions: List[str], env_ids: Optional[List[int]] = None) -> None:
+        """
+        Perform one action per environment, see `AsyncBatchEnv.step_async`.
+
+        The actions are performed right away, one environment after the other.
+        """
+        assert isinstance(actions, (list, tuple)), "Expected a list of actions."
+        env_ids = range(self.batch_size) if env_ids is None else env_ids
+        assert len(actions) == len(env_ids), "Expected one action per environment."
+
+        for i, action in zip(env_ids, actions):
+            assert i not in self._ready, "Environment {} is still waiting on a previous action.".format(i)
+            env = self.envs[i]
             if self.last[i] is not None and self.last[i][2]:  # Game has ended on the last step.
                 obs, reward, done, infos = self.last[i]  # Copy last state over.
 
                 if self.auto_reset:
                     reward, done = 0., False
-                    obs, infos = env.reset()
+                    obs, infos = self._prefetchers[i].reset(env)
 
-                results.append((obs, reward, done, infos))
+                self.last[i] = (obs, reward, done, infos)
             else:
-                results.append(env.step(action))
+                self.last[i] = env.step(action)
 
-        self.last = results
+            self._ready[i] = self.last[i]
+
+    def step_wait(self, timeout: Optional[float] = None, min_ready: Optional[int] = None
+                  ) -> Tuple[List[int], List[str], List[float], List[bool], Dict[str, List[Any]]]:
+        """
+        Retrieve the results of the actions sent by `step_async`.
+
+        Since actions are performed synchronously, all results are ready,
+        `timeout` and `min_ready` are only there for compatibility with
+        `AsyncBatchEnv.step_wait`.
+        """
+        env_ids = sorted(self._ready)
+        results = [self._ready.pop(i) for i in env_ids]
+        if len(results) == 0:
+            return [], [], [], [], {}
 
         obs, rewards, dones, infos = zip(*results)
-        infos = _list_of_dicts_to_dict_of_lists(infos)
-        return obs, rewards, dones, infos
+        infos = _collate_infos(infos, self.columnar)
+        return env_ids, obs, rewards, dones, infos
 
     def render(self, mode='human'):
         return [env.render(mode=mode) for env in self.envs]
 
     def close(self):
-        for env in self.envs:
-            env.close()
+        for prefetcher, env in zip(self._prefetchers, self.envs):
+            prefetcher.close(env)
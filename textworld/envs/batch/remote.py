@@ -0,0 +1,124 @@
+import logging
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import List, Optional, Tuple, Union
+
+from textworld.envs.batch.batch_env import AsyncBatchEnv, _Worker, _child, _get_context
+
+
+Address = Union[str, Tuple[str, int]]
+
+log = logging.getLogger(__name__)
+
+
+def serve(address: Address, authkey: Optional[bytes] = None, start_method: Optional[str] = None,
+          nb_connections: Optional[int] = None) -> None:
+    """
+    Host environments for `RemoteBatchEnv` clients.
+
+    Each connection gets its own child process, hosting the environments
+    sent by the client, and speaking the same protocol as the child
+    processes of `AsyncBatchEnv`. Clients failing to connect are logged
+    and skipped, but errors of the listening socket itself are raised.
+
+    Parameters
+    ----------
+    address :
+        Either a `(host, port)` tuple for a TCP socket or the path of a Unix socket.
+    authkey : optional
+        Secret shared with the clients. Since clients send the functions
+        that create the environments, anyone able to connect can run code
+        on this machine. Using an `authkey` is strongly recommended.
+    start_method : optional
+        How to start the child processes, see `AsyncBatchEnv`.
+    nb_connections : optional
+        Stop accepting connections after that many, then return once their
+        child processes have ended. By default, serve forever.
+    """
+    context = _get_context(start_method)
+    processes = []
+    with Listener(address, authkey=authkey) as listener:
+        while nb_connections is None or nb_connections > 0:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError) as e:
+                # Clients with the wrong authkey, or gone before the handshake.
+                log.warning("Rejected a connection: %r", e)
+                continue
+
+            try:
+                env_fns, slim = conn.recv()
+            except (EOFError, ConnectionError) as e:
+                # The client left without sending its environments (e.g. a health check).
+                log.info("A client left before sending its environments: %r", e)
+                conn.close()
+                continue
+
+            process = context.Process(target=_child, args=(env_fns, None, conn, slim))
+            process.daemon = True
+            process.start()
+            conn.close()  # The child process has its own copy.
+
+            processes = [process for process in processes if process.is_alive()] + [process]
+            if nb_connections is not None:
+                nb_connections -= 1
+
+    for process in processes:
+        process.join()
+
+
+class _RemoteWorker(_Worker):
+    """
+    Process hosting one or more environments on a server (see `serve`).
+    """
+    def __init__(self, address: Address, env_fns: List[callable], slim: bool = False,
+                 authkey: Optional[bytes] = None):
+        self._pipe = Client(address, authkey=authkey)
+        self._pipe.send((env_fns, slim))
+
+    def __del__(self):
+        try:
+            self.send([(0, "close")])
+        except (BrokenPipeError, OSError):
+            pass  # Server is already gone.
+
+        self._pipe.close()
+
+
+class RemoteBatchEnv(AsyncBatchEnv):
+    """ Environment to run multiple games in parallel on remote servers. """
+
+    def __init__(self, env_fns: List[callable], addresses: List[Address], auto_reset: bool = False,
+                 slim: bool = False, authkey: Optional[bytes] = None, columnar: bool = False):
+        """
+        Parameters
+        ----------
+        env_fns : iterable of callable
+            Functions that create the environments. They are sent to the servers.
+        addresses :
+            Addresses of the servers started with `serve` (e.g. with `tw-serve`).
+            Environments are split evenly among them, and each address gets
+            its own process on the server. Repeat an address to use more
+            processes on the same server.
+        auto_reset : bool
+            If `True`, each environment resets once it is done, see `AsyncBatchEnv`.
+        slim : bool
+            If `True`, the servers only send back the requested information,
+            see `AsyncBatchEnv`. Recommended when the network is slow.
+        authkey : optional
+            Secret shared with the servers.
+        columnar : bool
+            If `True`, information is returned as columns, see `AsyncBatchEnv`.
+
+        Notes
+        -----
+        Commands to different servers are sent without waiting on each other,
+        and `step_async` can send a new action to the environments that are
+        ready while others are still waiting on theirs.
+        """
+        self.addresses = addresses
+        self.authkey = authkey
+        super().__init__(env_fns, auto_reset=auto_reset, slim=slim, nb_workers=len(addresses), columnar=columnar)
+
+    def _make_worker(self, worker_id: int, env_fns: List[callable]) -> _RemoteWorker:
+        return _RemoteWorker(self.addresses[worker_id], env_fns, self.slim, self.authkey)
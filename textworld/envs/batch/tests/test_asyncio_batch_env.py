@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+from functools import partial
+
+import pytest
+
+import textworld
+from textworld import EnvInfos
+from textworld.utils import make_temp_directory
+from textworld.envs.wrappers import Filter
+from textworld.envs.batch import AsyncioBatchEnv, SyncBatchEnv
+
+
+class _EchoEnv(textworld.core.Wrapper):
+    """ Repeat the commands back, taking a while to process the "slow" one. """
+
+    def step(self, command):
+        if command == "slow":
+            time.sleep(1)
+
+        obs, score, done, infos = super().step("look")
+        return command, score, done, infos
+
+
+def test_asyncio_batch_env():
+    batch_size = 4
+    with make_temp_directory() as tmpdir:
+        game_files = []
+        for seed in range(batch_size):
+            options = textworld.GameOptions()
+            options.seeds = seed
+            options.quest_length = 1 + seed % 3
+            game = textworld.generator.make_game(options)
+            game_files.append(os.path.join(tmpdir, "game{}.json".format(seed)))
+            game.save(game_files[-1])
+
+        request_infos = EnvInfos(admissible_commands=True, score=True, won=True, policy_commands=True)
+        env_fns = [partial(textworld.start, game_file, request_infos, [Filter]) for game_file in game_files]
+
+        async def play(env, expected_env):
+            assert await env.seed(1234) == expected_env.seed(1234)
+            obs, infos = await env.reset()
+            assert (obs, infos) == expected_env.reset()
+
+            # Games end at different steps, some of them get reset automatically.
+            for _ in range(6):
+                commands = [(policy or ["look"])[0] for policy in infos["policy_commands"]]
+                results = await env.step(commands)
+                assert results == expected_env.step(commands)
+                obs, scores, dones, infos = results
+
+            # Play each game from its own coroutine.
+            async def play_game(env_id):
+                obs, infos = await env.reset_env(env_id)
+                for command in infos["policy_commands"]:
+                    obs, score, done, infos = await env.step_env(env_id, command)
+
+                return done, infos["won"]
+
+            assert await asyncio.gather(*map(play_game, range(batch_size))) == [(True, True)] * batch_size
+
+            # One command at a time per environment.
+            await env.reset()
+            step = asyncio.ensure_future(env.step_env(0, "look"))
+            await asyncio.sleep(0)  # Let the step be sent.
+            with pytest.raises(AssertionError):
+                await env.step_env(0, "look")
+
+            await step
+
+            # Nothing to do for no environment at all.
+            assert await env.reset(env_ids=[]) == ((), {})
+            assert await env.step([], env_ids=[]) == ((), (), (), {})
+
+            await env.close()
+
+        for env in [AsyncioBatchEnv(env_fns, auto_reset=True),
+                    AsyncioBatchEnv(env_fns, auto_reset=True, slim=True, nb_workers=2)]:
+            asyncio.run(play(env, SyncBatchEnv(env_fns, auto_reset=True)))
+
+
+def test_asyncio_batch_env_large_messages():
+    with make_temp_directory() as tmpdir:
+        options = textworld.GameOptions()
+        options.seeds = 1234
+        game_file = os.path.join(tmpdir, "game.json")
+        textworld.generator.make_game(options).save(game_file)
+        env_fns = [partial(textworld.start, game_file, EnvInfos(), [Filter, _EchoEnv]) for _ in range(2)]
+
+        async def play(env):
+            await env.reset()
+
+            gaps = []
+
+            async def tick():
+                while True:
+                    start = time.time()
+                    await asyncio.sleep(0.01)
+                    gaps.append(time.time() - start)
+
+            ticker = asyncio.ensure_future(tick())
+
+            # Both environments share the child process, which is busy with the
+            # slow command while the large one is sent, then sends back a large reply.
+            slow = asyncio.ensure_future(env.step_env(0, "slow"))
+            await asyncio.sleep(0.1)
+            large = "x" * 10**7
+            obs, _, _, _ = await env.step_env(1, large)
+            assert obs == large
+            assert (await slow)[0] == "slow"
+
+            ticker.cancel()
+            # The event loop was never blocked while waiting on the child process.
+            assert max(gaps) < 0.5
+
+            await env.close()
+
+        asyncio.run(play(AsyncioBatchEnv(env_fns, nb_workers=1)))
@@ -1,11 +1,20 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
 from functools import partial
 
+import pytest
+import numpy as np
+
 import textworld
 import textworld.gym
 from textworld import EnvInfos
 from textworld.utils import make_temp_directory
 from textworld.envs import JerichoEnv
-from textworld.envs.batch.batch_env import AsyncBatchEnv, SyncBatchEnv
+from textworld.envs.wrappers import Filter
+from textworld.envs.batch.batch_env import AsyncBatchEnv, SyncBatchEnv, RaggedList
 
 
 def test_batch_env():
@@ -62,3 +71,206 @@ def test_seed():
         assert seed == env_.get_sync("_seed")
 
     env.close()
+
+
+class _SlowEnv(textworld.core.Wrapper):
+    """ Take a while to process the "slow" command. """
+
+    def step(self, command):
+        if command == "slow":
+            time.sleep(1)
+            command = "look"
+
+        return super().step(command)
+
+
+class TestAsyncBatchEnv(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        options = textworld.GameOptions()
+        options.seeds = 1234
+        cls.game = textworld.generator.make_game(options)
+        cls.game_file = os.path.join(cls.tmpdir, "game.json")
+        cls.game.save(cls.game_file)
+
+        # Games of different lengths.
+        cls.game_files = []
+        for seed in range(5):
+            options = textworld.GameOptions()
+            options.seeds = seed
+            options.quest_length = 1 + seed % 3
+            game = textworld.generator.make_game(options)
+            cls.game_files.append(os.path.join(cls.tmpdir, "game{}.json".format(seed)))
+            game.save(cls.game_files[-1])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir)
+
+    def test_slim(self):
+        batch_size = 2
+        request_infos = EnvInfos(admissible_commands=True, score=True, won=True, extras=["walkthrough"])
+        env_fns = [partial(textworld.start, self.game_file, request_infos) for _ in range(batch_size)]
+        filtered_env_fns = [partial(textworld.start, self.game_file, request_infos, [Filter])
+                            for _ in range(batch_size)]
+
+        expected_env = SyncBatchEnv(filtered_env_fns)
+        for env in [AsyncBatchEnv(env_fns, slim=True), AsyncBatchEnv(filtered_env_fns, slim=True),
+                    AsyncBatchEnv(env_fns, slim=True, nb_workers=1)]:
+            obs, infos = env.reset()
+            expected_obs, expected_infos = expected_env.reset()
+            assert obs == expected_obs
+            assert infos == expected_infos
+            assert sorted(infos) == sorted(request_infos.basics + ["extra.walkthrough"])
+
+            for command in self.game.metadata["walkthrough"]:
+                results = env.step([command] * batch_size)
+                assert results == expected_env.step([command] * batch_size)
+
+            assert all(results[3]["won"])
+
+            # Private information stays in the child processes until fetched.
+            for game_progression in env.fetch("_game_progression"):
+                assert game_progression.completed
+
+            assert env.fetch("extra.walkthrough") == infos["extra.walkthrough"]
+            env.close()
+
+    def test_nb_workers(self):
+        request_infos = EnvInfos(admissible_commands=True, score=True, won=True, policy_commands=True)
+        env_fns = [partial(textworld.start, game_file, request_infos, [Filter]) for game_file in self.game_files]
+
+        for env in [AsyncBatchEnv(env_fns, auto_reset=True, nb_workers=2),
+                    AsyncBatchEnv(env_fns, auto_reset=True, slim=True, nb_workers=2)]:
+            assert len(env.workers) == 2
+            expected_env = SyncBatchEnv(env_fns, auto_reset=True)
+            assert env.seed(1234) == expected_env.seed(1234)
+
+            obs, infos = env.reset()
+            assert (obs, infos) == expected_env.reset()
+
+            # Games end at different steps, some of them get reset automatically.
+            for _ in range(8):
+                commands = [(policy or ["look"])[0] for policy in infos["policy_commands"]]
+                results = env.step(commands)
+                assert results == expected_env.step(commands)
+                obs, scores, dones, infos = results
+
+            assert env.render(mode="text") == expected_env.render(mode="text")
+            env.close()
+
+    def test_step_async(self):
+        batch_size = 3
+        request_infos = EnvInfos(score=True)
+        env_fns = [partial(textworld.start, self.game_file, request_infos, [_SlowEnv, Filter])
+                   for _ in range(batch_size)]
+
+        env = AsyncBatchEnv(env_fns)
+        obs, _ = env.reset()
+
+        env.step_async(["slow", "look", "look"])
+        env_ids, obs, scores, dones, infos = env.step_wait(min_ready=1)
+        assert 0 not in env_ids and len(env_ids) >= 1
+        assert len(obs) == len(scores) == len(dones) == len(infos["score"]) == len(env_ids)
+
+        # Ready environments can be given a new action right away.
+        env.step_async(["look"], env_ids=[env_ids[0]])
+        with pytest.raises(AssertionError):
+            env.step_async(["look"], env_ids=[0])
+
+        env_ids, *_ = env.step_wait()
+        assert 0 in env_ids
+
+        env.step_async(["slow"], env_ids=[0])
+        env_ids, *_ = env.step_wait(timeout=0.1)
+        assert env_ids == []
+        env_ids, *_ = env.step_wait()
+        assert env_ids == [0]
+
+        # Sync and async batch environments return the same results.
+        expected_env = SyncBatchEnv(env_fns)
+        expected_env.reset()
+        env.reset()
+        env.step_async(["slow", "look", "go north"])
+        expected_env.step_async(["slow", "look", "go north"])
+        assert env.step_wait() == expected_env.step_wait()
+        env.close()
+
+    def test_prefetch(self):
+        batch_size = 2
+        game_files = self.game_files[:4]
+        request_infos = EnvInfos(admissible_commands=True, score=True, objective=True)
+        env_fns = [partial(textworld.start, game_files[0], request_infos, [Filter]) for _ in range(batch_size)]
+
+        expected_env = SyncBatchEnv(env_fns)
+        for env in [SyncBatchEnv(env_fns), AsyncBatchEnv(env_fns), AsyncBatchEnv(env_fns, slim=True, nb_workers=1)]:
+            env.prefetch(game_files[0:2])
+            env.prefetch(game_files[2:4])
+            for batch in [game_files[0:2], game_files[2:4], game_files[1:3]]:  # Last batch wasn't prefetched.
+                env.load(batch)
+                expected_env.load(batch)
+                assert env.reset() == expected_env.reset()
+                assert env.step(["look"] * batch_size) == expected_env.step(["look"] * batch_size)
+
+            # Prefetched games that are skipped are discarded.
+            env.prefetch(game_files[0:2])
+            env.prefetch(game_files[2:4])
+            env.load(game_files[2:4])
+            expected_env.load(game_files[2:4])
+            assert env.reset() == expected_env.reset()
+            env.close()
+
+    def test_start_method(self):
+        batch_size = 2
+        request_infos = EnvInfos(admissible_commands=True, score=True)
+        env_fns = [partial(textworld.start, self.game_file, request_infos, [Filter]) for _ in range(batch_size)]
+
+        expected_env = SyncBatchEnv(env_fns)
+        env = AsyncBatchEnv(env_fns, start_method="forkserver")
+        assert env.reset() == expected_env.reset()
+        for command in self.game.metadata["walkthrough"]:
+            assert env.step([command] * batch_size) == expected_env.step([command] * batch_size)
+
+        env.close()
+
+    def test_columnar(self):
+        request_infos = EnvInfos(admissible_commands=True, policy_commands=True, score=True, won=True,
+                                 moves=True, intermediate_reward=True, objective=True)
+        env_fns = [partial(textworld.start, game_file, request_infos, [Filter]) for game_file in self.game_files[:3]]
+
+        expected_env = SyncBatchEnv(env_fns)
+        for env in [SyncBatchEnv(env_fns, columnar=True), AsyncBatchEnv(env_fns, columnar=True)]:
+            results = [env.reset()[1]]
+            expected_results = [expected_env.reset()[1]]
+            for _ in range(3):
+                commands = [(policy or ["look"])[0] for policy in expected_results[-1]["policy_commands"]]
+                results.append(env.step(commands)[3])
+                expected_results.append(expected_env.step(commands)[3])
+
+            for infos, expected_infos in zip(results, expected_results):
+                assert sorted(infos) == sorted(expected_infos)
+                assert infos["objective"] == expected_infos["objective"]
+                for key in ["score", "won", "moves", "intermediate_reward"]:
+                    assert isinstance(infos[key], np.ndarray)
+                    # Missing values (i.e. None) are NaN.
+                    np.testing.assert_array_equal(infos[key], np.array(expected_infos[key], dtype=infos[key].dtype))
+
+                for key in ["admissible_commands", "policy_commands"]:
+                    assert isinstance(infos[key], RaggedList)
+                    assert list(infos[key]) == expected_infos[key]
+                    assert infos[key][-1] == expected_infos[key][-1]
+                    assert infos[key].lengths.tolist() == [len(commands) for commands in expected_infos[key]]
+
+            env.close()
+
+
+def test_ragged_list():
+    ragged = RaggedList.from_lists([["a", "b"], None, ["c"]])
+    assert ragged.flat == ["a", "b", "c"]
+    assert ragged.offsets.tolist() == [0, 2, 2, 3]
+    assert list(ragged) == [["a", "b"], [], ["c"]]
+    assert ragged[-1] == ["c"]
+    with pytest.raises(IndexError):
+        ragged[3]
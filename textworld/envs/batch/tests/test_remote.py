@@ -0,0 +1,131 @@
+import os
+import time
+import errno
+import socket
+import logging
+import multiprocessing as mp
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+
+import textworld
+from textworld import EnvInfos
+from textworld.utils import make_temp_directory
+from textworld.envs.wrappers import Filter
+from textworld.envs.batch import RemoteBatchEnv, SyncBatchEnv
+from textworld.envs.batch.remote import serve
+
+
+def _get_free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(address, authkey):
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            time.sleep(0.1)
+
+    conn.send(([], False))  # No environments.
+    conn.send([(0, "close")])
+    conn.close()
+
+
+def test_remote_batch_env():
+    batch_size = 4
+    authkey = b"secret"
+    with make_temp_directory() as tmpdir:
+        game_files = []
+        for seed in range(batch_size):
+            options = textworld.GameOptions()
+            options.seeds = seed
+            options.quest_length = 1 + seed % 3
+            game = textworld.generator.make_game(options)
+            game_files.append(os.path.join(tmpdir, "game{}.json".format(seed)))
+            game.save(game_files[-1])
+
+        request_infos = EnvInfos(admissible_commands=True, score=True, won=True, policy_commands=True)
+        env_fns = [partial(textworld.start, game_file, request_infos, [Filter]) for game_file in game_files]
+
+        # One TCP server and one Unix socket server, each accepting two connections.
+        addresses = [("localhost", _get_free_port()), os.path.join(tmpdir, "tw.sock")]
+        servers = [mp.Process(target=serve, args=(address, authkey), kwargs={"nb_connections": 2})
+                   for address in addresses]
+        for server, address in zip(servers, addresses):
+            server.start()
+            _wait_for_server(address, authkey)  # First connection.
+
+        env = RemoteBatchEnv(env_fns, addresses, auto_reset=True, slim=True, authkey=authkey)
+        expected_env = SyncBatchEnv(env_fns, auto_reset=True)
+        assert env.seed(1234) == expected_env.seed(1234)
+
+        obs, infos = env.reset()
+        assert (obs, infos) == expected_env.reset()
+
+        # Games end at different steps, some of them get reset automatically.
+        for _ in range(6):
+            commands = [(policy or ["look"])[0] for policy in infos["policy_commands"]]
+            results = env.step(commands)
+            assert results == expected_env.step(commands)
+            obs, scores, dones, infos = results
+
+        env.close()
+        del env
+        for server in servers:
+            server.join()
+
+
+def _connect_and_leave(address):
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    while True:
+        try:
+            with socket.socket(family) as sock:
+                sock.connect(address)
+                return
+        except (ConnectionRefusedError, FileNotFoundError):
+            time.sleep(0.1)
+
+
+def test_serve_ignores_dropped_connections():
+    with make_temp_directory() as tmpdir:
+        options = textworld.GameOptions()
+        options.seeds = 1234
+        game_file = os.path.join(tmpdir, "game.json")
+        textworld.generator.make_game(options).save(game_file)
+        env_fns = [partial(textworld.start, game_file, EnvInfos(score=True), [Filter])]
+        expected_obs, _ = SyncBatchEnv(env_fns).reset()
+
+        # With an authkey, the handshake fails. Without one, nothing is received.
+        for address, authkey in [(("localhost", _get_free_port()), b"secret"), (os.path.join(tmpdir, "tw.sock"), None)]:
+            server = mp.Process(target=serve, args=(address, authkey), kwargs={"nb_connections": 1})
+            server.start()
+            _connect_and_leave(address)  # E.g. a health check.
+            _connect_and_leave(address)
+
+            env = RemoteBatchEnv(env_fns, [address], authkey=authkey)
+            assert env.reset()[0] == expected_obs
+            env.close()
+            del env
+            server.join()
+            assert server.exitcode == 0
+
+
+def test_serve_raises_listener_errors(caplog):
+    with make_temp_directory() as tmpdir:
+        address = os.path.join(tmpdir, "tw.sock")
+        # A client with the wrong authkey, then the server runs out of file descriptors.
+        errors = [AuthenticationError("digest received was wrong"), OSError(errno.EMFILE, "Too many open files")]
+        with patch.object(Listener, "accept", side_effect=errors) as accept:
+            with caplog.at_level(logging.WARNING), pytest.raises(OSError) as excinfo:
+                serve(address, b"secret")
+
+        assert excinfo.value.errno == errno.EMFILE
+        assert accept.call_count == 2
+        assert "digest received was wrong" in caplog.text
@@ -3,12 +3,15 @@
 
 
 # -*- coding: utf-8 -*-
+import os
 import sys
 import textwrap
+import threading
 import subprocess
+import multiprocessing.util
 
 import importlib.resources
-from typing import Union
+from typing import List, Optional, Union
 from os.path import join as pjoin
 
 
@@ -21,6 +24,16 @@ from textworld.core import GameNotRunningError
 
 GLULX_PATH = pjoin(importlib.resources.files("textworld"), "thirdparty", "glulx", "Git-Glulx")
 
+#: int: Number of idle interpreters kept ready to play a new game (see `GitGlulxEnv.reset`).
+#: Disabled by default, since each one is an extra process for as long as Python runs.
+INTERPRETER_POOL_SIZE = 0
+
+# Commands handled by the interpreter itself (see cheapglk/agent.c), instead of the game.
+_META_COMMAND = "\x10+++{}\x10"
+
+# Seconds to wait for a forked interpreter to connect (see `_Interpreter.fork`).
+_FORK_TIMEOUT = 10
+
 
 def _strip_input_prompt_symbol(text: str) -> str:
     if text.endswith("\n>"):
@@ -29,6 +42,179 @@ def _strip_input_prompt_symbol(text: str) -> str:
     return text
 
 
+class _Interpreter:
+    """ Running git-glulx-ml process and the socket used to talk to it. """
+
+    def __init__(self) -> None:
+        self.process = None  # Only set for processes started by us, not forked ones.
+        self.pid = None
+        self.closed = False
+        self.shared = False  # Whether other environments rely on this interpreter.
+        self._owner_pid = os.getpid()
+        self._names_struct = ffi.new('struct sock_names*')
+        lib.init_glulx(self._names_struct)
+        self.sock_name = ffi.string(self._names_struct.sock_name).decode('utf-8')
+
+    @classmethod
+    def start(cls) -> "_Interpreter":
+        """ Start a new interpreter, waiting for a game to play (see `load`). """
+        interpreter = cls()
+        interpreter.process = subprocess.Popen(["%s/git-glulx-ml" % (GLULX_PATH,), '-g', interpreter.sock_name, '-q'])
+        interpreter.pid = interpreter.process.pid
+        return interpreter
+
+    @property
+    def running(self) -> bool:
+        return not self.closed and (self.process is None or self.process.poll() is None)
+
+    def _decode(self, c_output) -> Union[str, None]:
+        if c_output == ffi.NULL:
+            self.close()
+            return None
+
+        c_output = ffi.gc(c_output, lib.free)
+        return ffi.string(c_output).decode('utf-8')
+
+    def _view(self, length: int) -> Optional[memoryview]:
+        if length < 0:
+            self.close()
+            return None
+
+        return memoryview(ffi.buffer(self._names_struct.buffer, length))
+
+    def receive_view(self) -> Optional[memoryview]:
+        """ Wait for the interpreter's output (e.g. the game's intro).
+
+        Returns:
+            The output, as UTF-8 bytes, or `None` if the interpreter stopped.
+            It points to a buffer reused for every output, so it is only
+            valid until the next command sent to this interpreter.
+        """
+        return self._view(lib.receive_buffered(self._names_struct))
+
+    def communicate_view(self, command: str) -> Optional[memoryview]:
+        """ Send a command and wait for the interpreter's output, see `receive_view`. """
+        c_command = ffi.new('char[]', command.encode('utf-8'))
+        return self._view(lib.communicate_buffered(self._names_struct, c_command))
+
+    def receive(self) -> Union[str, None]:
+        """ Wait for the interpreter's output (e.g. the game's intro). """
+        view = self.receive_view()
+        return None if view is None else str(view, 'utf-8')
+
+    def communicate(self, command: str) -> Union[str, None]:
+        """ Send a command and wait for the interpreter's output. """
+        view = self.communicate_view(command)
+        return None if view is None else str(view, 'utf-8')
+
+    def communicate_many(self, commands: List[str]) -> List[Union[str, None]]:
+        """ Send several commands at once and wait for all the interpreter's outputs. """
+        c_commands = [ffi.new('char[]', command.encode('utf-8')) for command in commands]
+        c_outputs = ffi.new('char*[]', len(commands))
+        nb_outputs = lib.communicate_many(self._names_struct, ffi.new('char*[]', c_commands), len(commands), c_outputs)
+        outputs = [self._decode(c_outputs[i]) for i in range(nb_outputs)]
+        if nb_outputs < len(commands):
+            self.close()  # Something went wrong.
+            outputs += [None] * (len(commands) - nb_outputs)
+
+        return outputs
+
+    def load(self, gamefile: str) -> Union[str, None]:
+        """ Start playing a game, replacing the current one if any.
+
+        The interpreter is restarted in the same process (i.e. `exec`),
+        and keeps using the same socket.
+
+        Returns:
+            The game's intro or `None` if the game couldn't be started.
+        """
+        return self.communicate(_META_COMMAND.format("LOAD " + os.path.abspath(gamefile)))
+
+    def fork(self) -> Optional["_Interpreter"]:
+        """ Start a copy of this interpreter, at the same point in the game.
+
+        The copy is a fork of the interpreter's process, thus it shares
+        its memory until either of them changes it (i.e. copy-on-write).
+
+        Returns:
+            The new interpreter or `None` if this one is not running anymore,
+            or if the new one failed to start.
+        """
+        interpreter = _Interpreter()
+        pid = self.communicate(_META_COMMAND.format("FORK " + interpreter.sock_name))
+        if pid is None or not pid.isdigit():  # The fork failed.
+            interpreter.close()
+            return None
+
+        # Wait for the new process to connect, it exits if it can't.
+        if lib.wait_for_connection(interpreter._names_struct, int(_FORK_TIMEOUT * 1000)) != 0:
+            interpreter.close()
+            return None
+
+        interpreter.receive()
+        interpreter.pid = int(pid)
+        return interpreter
+
+    def close(self) -> None:
+        if self._owner_pid != os.getpid():
+            return  # Inherited from a forked process, leave it to its owner.
+
+        if self.closed:
+            return
+
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+        # Forked processes exit by themselves once their socket is closed. They are reaped automatically,
+        # so their pid may already belong to another process: never kill them by pid.
+        lib.cleanup_glulx(self._names_struct)
+        self.closed = True
+
+    def __del__(self):
+        if hasattr(self, "_names_struct"):
+            self.close()
+
+
+_POOL = []  # Idle interpreters, see `_take_interpreter`.
+_POOL_LOCK = threading.Lock()  # Games can be reset from background threads.
+_POOL_OWNER_PID = None  # Process the idle interpreters belong to.
+
+
+def _take_interpreter() -> _Interpreter:
+    """ Take an idle interpreter from the pool, then start new ones to refill it.
+
+    Interpreters are started ahead of time, in the background, so that
+    playing a new game doesn't have to wait on one to start.
+    """
+    global _POOL_OWNER_PID
+    with _POOL_LOCK:
+        if _POOL_OWNER_PID != os.getpid():
+            _POOL.clear()  # Inherited from a forked process, they belong to it.
+            _POOL_OWNER_PID = os.getpid()
+            # Unlike `atexit`, also called when child processes of `multiprocessing` exit.
+            multiprocessing.util.Finalize(None, _close_pool, exitpriority=0)
+
+        interpreter = None
+        while len(_POOL) > 0 and interpreter is None:
+            interpreter = _POOL.pop(0)
+            if not interpreter.running:
+                interpreter = None
+
+        while len(_POOL) < INTERPRETER_POOL_SIZE:
+            _POOL.append(_Interpreter.start())
+
+    return interpreter or _Interpreter.start()
+
+
+def _close_pool() -> None:
+    with _POOL_LOCK:
+        for interpreter in _POOL:
+            interpreter.close()
+
+        _POOL.clear()
+
+
 class GitGlulxEnv(textworld.Environment):
     """ Environment to support playing Glulx games.
 
@@ -43,35 +229,56 @@ class GitGlulxEnv(textworld.Environment):
     as the glulx interpreter. That way we don't rely on stdin/stdout to
     communicate with the interpreter but instead use UNIX sockets.
 
+    The first time a game is reset, its interpreter is kept aside right
+    after the intro, as a snapshot. Resetting the game afterwards, or
+    copying the environment, forks an interpreter instead of starting
+    the game over in a new process. When another game is loaded, the
+    same interpreter process is told to play it. Interpreters can also
+    be started ahead of time for the very first game of each environment
+    (see `INTERPRETER_POOL_SIZE`).
+
     """
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self._process = None
+        self._gamefile = None
+        self._interpreter = None  # Interpreter playing the game.
+        self._snapshot = None  # Interpreter paused after the intro, shared with copies of this env.
+        self._snapshot_key = None  # (path, mtime) of the game the snapshot is for.
+        self._intro = None
 
     def close(self) -> None:
-        if self.game_running:
-            self._process.kill()
-            self._process.wait()
-            self._process = None
+        if self._interpreter is not None:
+            self._interpreter.close()
+            self._interpreter = None
 
-        try:
-            lib.cleanup_glulx(self._names_struct)
-        except AttributeError:
-            pass  # Attempted to kill before reset
+        # The snapshot is closed once no copy of this env refers to it anymore.
+        self._snapshot = None
+        self._snapshot_key = None
+        self._intro = None
 
     def __del__(self):
         self.close()
 
     def load(self, ulx_file: str) -> None:
         # TODO check file format.
-        self.close()  # Terminate existing process if needed.
+        if self._interpreter is not None:
+            self._interpreter.close()  # Terminate existing process if needed.
+            self._interpreter = None
+
         self._gamefile = ulx_file
+        key = (os.path.abspath(ulx_file), os.path.getmtime(ulx_file)) if os.path.isfile(ulx_file) else None
+        if key is None or key != self._snapshot_key:
+            # The snapshot, if any, will play the new game on the next reset.
+            self._snapshot_key = key
+            self._intro = None
+            if self._snapshot is not None and self._snapshot.shared:
+                self._snapshot = None  # Copies of this env still need it.
 
     @property
     def game_running(self) -> bool:
         """ Determines if the game is still running. """
-        return self._process is not None and self._process.poll() is None
+        return self._interpreter is not None and self._interpreter.running
 
     def step(self, command: str) -> str:
         if not self.game_running:
@@ -99,34 +306,66 @@ class GitGlulxEnv(textworld.Environment):
         if len(command) == 0:
             command = " "
 
-        c_command = ffi.new('char[]', command.encode('utf-8'))
-        result = lib.communicate(self._names_struct, c_command)
-        if result == ffi.NULL:
-            self.close()
-            return None
+        return self._interpreter.communicate(command)
 
-        result = ffi.gc(result, lib.free)
-        return ffi.string(result).decode('utf-8')
+    def _send_many(self, commands: List[str]) -> List[Union[str, None]]:
+        """ Send commands directly to the interpreter, all at once.
+
+        Same as calling `_send` on each command, in order, but commands
+        are streamed to the interpreter instead of waiting for each output.
+        This method will not affect the internal state variable.
+        """
+        if not self.game_running:
+            return [None] * len(commands)
+
+        commands = [command or " " for command in commands]
+        return self._interpreter.communicate_many(commands)
 
     def reset(self) -> str:
-        self.close()  # Terminate existing process if needed.
+        if self._interpreter is not None:
+            self._interpreter.close()  # Terminate existing process if needed.
+            self._interpreter = None
 
-        self._names_struct = ffi.new('struct sock_names*')
+        if self._snapshot is not None and self._intro is None:
+            self._intro = self._snapshot.load(self._gamefile)  # Was playing another game.
 
-        lib.init_glulx(self._names_struct)
-        sock_name = ffi.string(self._names_struct.sock_name).decode('utf-8')
-        self._process = subprocess.Popen(["%s/git-glulx-ml" % (GLULX_PATH,), self._gamefile, '-g', sock_name, '-q'])
-        c_feedback = lib.get_output_nosend(self._names_struct)
-        if c_feedback == ffi.NULL:
-            self.close()
-            raise ValueError("Game failed to start properly: {}.".format(self._gamefile))
-        c_feedback = ffi.gc(c_feedback, lib.free)
+        if self._intro is not None:
+            self._interpreter = self._snapshot.fork()
+
+        if self._interpreter is None:  # No snapshot yet, or it stopped working.
+            self._snapshot = _take_interpreter()
+            self._intro = self._snapshot.load(self._gamefile)
+            if self._intro is not None:
+                self._interpreter = self._snapshot.fork()
 
-        feedback = ffi.string(c_feedback).decode('utf-8')
-        feedback = _strip_input_prompt_symbol(feedback)
+            if self._interpreter is None:
+                self.close()
+                raise ValueError("Game failed to start properly: {}.".format(self._gamefile))
+
+        feedback = _strip_input_prompt_symbol(self._intro)
         self.state = GameState(feedback=feedback, raw=feedback)
         return self.state
 
+    def copy(self) -> "GitGlulxEnv":
+        """ Return a copy of this environment at the same state.
+
+        The copy plays the game in its own interpreter, forked from this one.
+        """
+        env = GitGlulxEnv(self.request_infos.copy())
+        env._gamefile = self._gamefile
+        env._snapshot = self._snapshot
+        env._snapshot_key = self._snapshot_key
+        env._intro = self._intro
+        if self._snapshot is not None:
+            self._snapshot.shared = True
+        if self.game_running:
+            env._interpreter = self._interpreter.fork()
+
+        # Copy core Environment's attributes.
+        env.state = self.state.copy()
+        env.display_command_during_render = self.display_command_during_render
+        return env
+
     def render(self, mode: str = "human") -> None:
         outfile = StringIO() if mode in ['ansi', "text"] else sys.stdout
 
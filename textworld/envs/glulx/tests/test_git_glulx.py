@@ -2,6 +2,8 @@
 # Licensed under the MIT license.
 
 
+import os
+import time
 import shutil
 import tempfile
 import unittest
@@ -14,7 +16,9 @@ from textworld import testing
 
 from textworld.core import GameNotRunningError
 
+from textworld.envs.glulx import git_glulx
 from textworld.envs.glulx.git_glulx import GitGlulxEnv
+from textworld.generator.inform7 import compile_inform7_game, generate_inform7_source
 
 
 class TestGitGlulxEnv(unittest.TestCase):
@@ -82,3 +86,169 @@ class TestGitGlulxEnv(unittest.TestCase):
         self.env.step("quit")
         self.env.step("no")
         self.env.step("look")
+
+    def test_reset(self):
+        intro = self.env.state.feedback
+        snapshot = self.env._snapshot
+        self.env.step("inventory")
+        game_state, _, _ = self.env.step("look")
+
+        # Resetting goes back to the intro, using the same snapshot.
+        assert self.env.reset().feedback == intro
+        assert self.env._snapshot is snapshot
+        assert self.env.step("look")[0].feedback == game_state.feedback
+
+        # Reset also works once the game has ended.
+        self.env.step("quit")
+        self.env.step("yes")
+        assert self.env.reset().feedback == intro
+        assert self.env.step("look")[0].feedback == game_state.feedback
+
+        # Loading the same game again keeps the snapshot.
+        self.env.load(self.game_file)
+        assert self.env.reset().feedback == intro
+        assert self.env._snapshot is snapshot
+
+        # Another game (here, a modified one) is played by the same interpreter process.
+        pid = snapshot.pid
+        os.utime(self.game_file, (0, 0))
+        self.env.load(self.game_file)
+        assert self.env._intro is None
+        assert self.env.reset().feedback == intro
+        assert self.env._snapshot is snapshot
+        assert self.env._snapshot.pid == pid
+        assert self.env.step("look")[0].feedback == game_state.feedback
+
+    def test_reset_random(self):
+        code = ('Rolling is an action applying to nothing. Understand "roll" as rolling.\n'
+                'Carry out rolling: say "[a random number between 1 and 1000000]".\n')
+
+        def _rolls(seed):
+            game_file = os.path.join(self.tmpdir, "random_{}.ulx".format(seed))
+            compile_inform7_game(generate_inform7_source(self.game, code, seed=seed), game_file)
+            env = GitGlulxEnv()
+            env.load(game_file)
+            rolls = []
+            for _ in range(3):
+                env.reset()
+                rolls.append(env._send("roll"))
+
+            env.close()
+            return rolls
+
+        # Forked interpreters draw fresh random numbers, unless the game chose its seed.
+        assert len(set(_rolls(seed=0))) > 1
+        assert len(set(_rolls(seed=1234))) == 1
+
+    def test_interpreter_pool(self):
+        pool_size = git_glulx.INTERPRETER_POOL_SIZE
+        try:
+            git_glulx.INTERPRETER_POOL_SIZE = 2
+
+            # Idle interpreters are started ahead of time.
+            env = GitGlulxEnv()
+            env.load(self.game_file)
+            env.reset()
+            assert len(git_glulx._POOL) == 2
+            idle = git_glulx._POOL[0]
+            assert idle.running
+
+            env2 = GitGlulxEnv()
+            env2.load(self.game_file)
+            assert env2.reset().feedback == env.state.feedback
+            assert env2._snapshot is idle
+            assert len(git_glulx._POOL) == 2
+            assert idle not in git_glulx._POOL
+
+            env.close()
+            env2.close()
+        finally:
+            git_glulx.INTERPRETER_POOL_SIZE = pool_size
+            git_glulx._close_pool()
+
+    def test_copy(self):
+        env = GitGlulxEnv()
+        env.load(self.game_file)
+        copy = env.copy()  # Copy before env.reset.
+        npt.assert_raises(GameNotRunningError, copy.step, "look")
+
+        intro = self.env.state.feedback
+        game_state, _, _ = self.env.step("look")
+        env = self.env.copy()
+        assert env.state == game_state
+        assert env.step("look")[0].feedback == game_state.feedback
+
+        # Copies play the game independently.
+        self.env.step("quit")
+        self.env.step("yes")
+        npt.assert_raises(GameNotRunningError, self.env.step, "look")
+        assert env.step("look")[0].feedback == game_state.feedback
+
+        # The copy can still be reset after the original env is closed.
+        self.env.close()
+        assert env.reset().feedback == intro
+        assert env.step("look")[0].feedback == game_state.feedback
+        env.close()
+
+    def test_close(self):
+        # The forked interpreter of a closed copy exits, once it notices its socket was closed.
+        env = self.env.copy()
+        pid = env._interpreter.pid
+        env.close()
+        for _ in range(500):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+
+            time.sleep(0.01)
+        else:
+            assert False, "Forked interpreter {} is still running.".format(pid)
+
+        assert self.env.step("look")[0].feedback
+
+    def test_fork_failure(self):
+        fork_timeout = git_glulx._FORK_TIMEOUT
+        init = git_glulx._Interpreter.__init__
+
+        def _init_without_socket(interpreter):
+            init(interpreter)
+            os.unlink(interpreter.sock_name)  # Forked interpreters won't be able to connect.
+
+        try:
+            git_glulx._FORK_TIMEOUT = 1
+            git_glulx._Interpreter.__init__ = _init_without_socket
+            # Forking gives up instead of waiting for the new interpreter forever.
+            assert self.env._interpreter.fork() is None
+            assert self.env.copy()._interpreter is None
+        finally:
+            git_glulx._FORK_TIMEOUT = fork_timeout
+            git_glulx._Interpreter.__init__ = init
+
+        # The original interpreter keeps working.
+        assert self.env.step("look")[0].feedback
+        assert self.env.copy().step("look")[0].feedback
+
+    def test_send_many(self):
+        commands = ["look", "", "inventory", "open chest", "inventory"]
+        env = self.env.copy()
+        outputs = [env._send(command) for command in commands]
+        assert self.env._send_many(commands) == outputs
+
+        # Commands that can't be sent once the game has ended.
+        assert self.env._send_many(["quit", "yes", "look", "look"])[2:] == [None, None]
+        assert not self.env.game_running
+        assert self.env._send_many(["look"]) == [None]
+
+    def test_communicate_view(self):
+        env = self.env.copy()
+        interpreter = env._interpreter
+        view = interpreter.communicate_view("inventory")
+        assert str(view, 'utf-8') == self.env._send("inventory")
+        assert interpreter.communicate_view("look").tobytes().decode('utf-8') == self.env._send("look")
+
+        # The buffer is reused, it only grows when an output doesn't fit.
+        buffer = interpreter._names_struct.buffer
+        interpreter.communicate_view("inventory")
+        assert interpreter._names_struct.buffer == buffer
+        env.close()
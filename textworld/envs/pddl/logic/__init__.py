@@ -2,15 +2,13 @@
 import json
 import textwrap
 
-from collections import Counter, defaultdict
-
 from tatsu.model import NodeWalker
 
 import fast_downward
 
 import textworld.logic.model
 from textworld.utils import check_flag
-from textworld.logic import Proposition, Variable, Placeholder
+from textworld.logic import AtomTable, Proposition, Variable, Placeholder
 
 from textworld.envs.pddl.textgen import ContextSensitiveGrammar
 from textworld.envs.pddl.logic.model import PddlLogicModelBuilderSemantics
@@ -93,12 +91,16 @@ class GameLogic:
         self.grammar = ContextSensitiveGrammar()
         self.actions = {}
         self.types = textworld.logic.TypeHierarchy()
+        self._join_plans = {}
 
         # Load grammar's content
         actions, grammar = _parse_and_convert(grammar, rule_name="pddlStart")
         self.actions.update(actions)
         self.grammar.update(grammar)
 
+    # Matching rules against a `textworld.logic.State` goes through the logic's join plans.
+    _get_join_plan = textworld.logic.GameLogic._get_join_plan
+
 
 class Atom(fast_downward.Atom):
     """
@@ -155,12 +157,8 @@ class PddlState(textworld.logic.State):
         logic :
             The logic for this state's game.
         """
-        self._facts = defaultdict(set)
-        self._vars_by_name = {}
-        self._vars_by_type = defaultdict(set)
-        self._var_counts = Counter()
-
         self._logic = logic
+        self._init_facts(AtomTable())
         self.downward_lib = downward_lib
 
         # problem
@@ -70,6 +70,19 @@ class TestInterface(unittest.TestCase):
         game_state, _, _ = self.env.step("dummy")
         assert game_state.feedback == "Nothing happens."
 
+    def test_applying_pddl_actions(self):
+        game_state = self.env.reset()
+        pddl_state = self.env._pddl_state
+
+        # Applicable operators are converted into actions, which keep track of their operator.
+        actions = game_state["_valid_actions"]
+        assert len(actions) > 0
+        assert all(action.id in pddl_state._operators for action in actions)
+
+        changes = pddl_state.apply(actions[0])
+        assert len(changes) > 0
+        assert all(pddl_state.is_fact(change) for change in changes)
+
     def test_loading_from_data(self):
         env = PddlEnv(self.request_infos)
         env.load(self.gamedata)
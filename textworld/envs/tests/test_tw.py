@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 
+import os
 import shutil
 import tempfile
 import unittest
@@ -176,3 +177,20 @@ class TestTextWorldEnv(unittest.TestCase):
         assert tuple(env._current_winning_policy) == tuple(current_winning_policy)
         assert tuple(env._current_winning_policy) != tuple(self.env._current_winning_policy)
         assert env._game_progression.state == game_progression.state
+
+    def test_load_cached_game(self):
+        env = TextWorldEnv(self.request_infos)
+        env.load(self.gamefile)
+        assert id(env._game) == id(self.env._game)  # Loaded from the cache.
+        assert id(env._inform7) == id(self.env._inform7)
+
+        # Modifying the game file invalidates the cached game.
+        gamefile = pjoin(self.tmpdir, "tw-game-modified.json")
+        self.game.save(gamefile)
+        env.load(gamefile)
+        game = env._game
+
+        os.utime(gamefile, (0, 0))
+        env.load(gamefile)
+        assert id(env._game) != id(game)
+        assert env._game == game
@@ -8,7 +8,7 @@ from typing import Optional
 import textworld
 from textworld.core import EnvInfos, GameState
 from textworld.generator.game import GameProgression
-from textworld.generator.inform7 import Inform7Game
+from textworld.envs.utils import load_game
 
 
 DEFAULT_OBSERVATION = """
@@ -40,9 +40,8 @@ class TextWorldEnv(textworld.Environment):
 
     def load(self, path: str) -> None:
         self._gamefile = path
-        self._game = textworld.Game.load(self._gamefile)
+        self._game, self._inform7 = load_game(self._gamefile)
         self._game_progression = None
-        self._inform7 = Inform7Game(self._game)
 
     def _gather_infos(self):
         self.state["game"] = self._game
@@ -99,7 +98,7 @@ class TextWorldEnv(textworld.Environment):
         self.state["_valid_commands"] = self._inform7.gen_commands_from_actions(self._game_progression.valid_actions)
         # To guarantee the order from one execution to another, we sort the commands.
         # Remove any potential duplicate commands (they would lead to the same result anyway).
-        self.state["admissible_commands"] = sorted(set(self.state["_valid_commands"]))
+        self.state["admissible_commands"] = self._inform7.gen_admissible_commands(self._game_progression.valid_actions)
 
         if self.request_infos.moves:
             self.state["moves"] = self._moves
@@ -0,0 +1,48 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT license.
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from textworld.generator.game import Game
+from textworld.generator.inform7 import Inform7Game
+
+
+#: int: Maximum number of games kept in memory by `load_game`.
+GAME_CACHE_SIZE = 32
+
+_GAME_CACHE = OrderedDict()  # (path, mtime) -> (Game, Inform7Game), in least recently used order.
+_GAME_CACHE_LOCK = threading.Lock()  # Games can be loaded from background threads.
+
+
+def load_game(path: str) -> Tuple[Game, Inform7Game]:
+    """ Load a game generated by TextWorld along with its Inform7 helper.
+
+    Loaded games are kept in a cache (one per process), so that switching
+    back to a game seen recently doesn't require deserializing it again.
+    Modifying the game file invalidates its cache entry.
+
+    Arguments:
+        path: Path to the game's .json file.
+
+    Returns:
+        The game and its Inform7Game. Both are shared with all environments
+        of the current process that loaded the same game, hence they should
+        not be modified.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path))
+    with _GAME_CACHE_LOCK:
+        if key in _GAME_CACHE:
+            _GAME_CACHE.move_to_end(key)
+            return _GAME_CACHE[key]
+
+    game = Game.load(path)  # Outside the lock, deserializing can take a while.
+    with _GAME_CACHE_LOCK:
+        entry = _GAME_CACHE.setdefault(key, (game, Inform7Game(game)))
+        while len(_GAME_CACHE) > GAME_CACHE_SIZE:
+            _GAME_CACHE.popitem(last=False)  # Evict the least recently used.
+
+        return entry
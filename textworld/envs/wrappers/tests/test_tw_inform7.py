@@ -19,6 +19,7 @@ from textworld.envs.wrappers.tw_inform7 import TWInform7
 from textworld.envs.wrappers.tw_inform7 import GameData, Inform7Data
 from textworld.envs.wrappers.tw_inform7 import StateTracking
 from textworld.envs.wrappers.tw_inform7 import MissingGameInfosError
+from textworld.envs.wrappers.tw_inform7 import _parse_output
 
 from textworld.utils import make_temp_directory
 
@@ -155,34 +156,33 @@ class TestInform7Data(unittest.TestCase):
             assert game_state.lost
 
     def test_copy(self):
-        npt.assert_raises(NotImplementedError, self.env_ulx.copy)
-
-        # Copy before env.reset.
-        env = self.env_z8.copy()
-        assert env.state == self.env_z8.state
-        assert env.request_infos == self.env_z8.request_infos
-        assert env._tracked_infos == self.env_z8._tracked_infos
-        assert env._prev_state == self.env_z8._prev_state
-
-        # Copy after env.reset.
-        self.env_z8.reset()
-        env = self.env_z8.copy()
-        assert sorted(env.state.items()) == sorted(self.env_z8.state.items())
-        assert env.request_infos == self.env_z8.request_infos
-        assert env._tracked_infos == self.env_z8._tracked_infos
-        assert env._prev_state == self.env_z8._prev_state
-
-        # Check copy after a few env.step.
-        game_state, _, _ = self.env_z8.step("go east")
-        assert env.state == self.env_z8._prev_state
-
-        env = self.env_z8.copy()
-        assert env._prev_state is not None
-        prev_state = env._prev_state.copy()
-
-        # Check the copied env didn't change after calling env.step.
-        game_state, _, done = self.env_z8.step("eat carrot")
-        assert env._prev_state == prev_state
+        for orig_env in [self.env_ulx, self.env_z8]:
+            # Copy before env.reset.
+            env = orig_env.copy()
+            assert env.state == orig_env.state
+            assert env.request_infos == orig_env.request_infos
+            assert env._tracked_infos == orig_env._tracked_infos
+            assert env._prev_state == orig_env._prev_state
+
+            # Copy after env.reset.
+            orig_env.reset()
+            env = orig_env.copy()
+            assert sorted(env.state.items()) == sorted(orig_env.state.items())
+            assert env.request_infos == orig_env.request_infos
+            assert env._tracked_infos == orig_env._tracked_infos
+            assert env._prev_state == orig_env._prev_state
+
+            # Check copy after a few env.step.
+            game_state, _, _ = orig_env.step("go east")
+            assert env.state == orig_env._prev_state
+
+            env = orig_env.copy()
+            assert env._prev_state is not None
+            prev_state = env._prev_state.copy()
+
+            # Check the copied env didn't change after calling env.step.
+            game_state, _, done = orig_env.step("eat carrot")
+            assert env._prev_state == prev_state
 
 
 class TestTWInform7(unittest.TestCase):
@@ -232,34 +232,33 @@ class TestTWInform7(unittest.TestCase):
         shutil.move(gamefile_json + ".bkp", gamefile_json)
 
     def test_copy(self):
-        npt.assert_raises(NotImplementedError, self.env_ulx.copy)
-
-        # Copy before env.reset.
-        env = self.env_z8.copy()
-        assert env.state == self.env_z8.state
-        assert env.request_infos == self.env_z8.request_infos
-        assert env._tracked_infos == self.env_z8._tracked_infos
-        assert env._prev_state == self.env_z8._prev_state
-
-        # Copy after env.reset.
-        self.env_z8.reset()
-        env = self.env_z8.copy()
-        assert sorted(env.state.items()) == sorted(self.env_z8.state.items())
-        assert env.request_infos == self.env_z8.request_infos
-        assert env._tracked_infos == self.env_z8._tracked_infos
-        assert env._prev_state == self.env_z8._prev_state
-
-        # Check copy after a few env.step.
-        game_state, _, _ = self.env_z8.step("go east")
-        assert env.state == self.env_z8._prev_state
-
-        env = self.env_z8.copy()
-        assert env._prev_state is not None
-        prev_state = env._prev_state.copy()
-
-        # Check the copied env didn't change after calling env.step.
-        game_state, _, done = self.env_z8.step("eat carrot")
-        assert env._prev_state == prev_state
+        for orig_env in [self.env_ulx, self.env_z8]:
+            # Copy before env.reset.
+            env = orig_env.copy()
+            assert env.state == orig_env.state
+            assert env.request_infos == orig_env.request_infos
+            assert env._tracked_infos == orig_env._tracked_infos
+            assert env._prev_state == orig_env._prev_state
+
+            # Copy after env.reset.
+            orig_env.reset()
+            env = orig_env.copy()
+            assert sorted(env.state.items()) == sorted(orig_env.state.items())
+            assert env.request_infos == orig_env.request_infos
+            assert env._tracked_infos == orig_env._tracked_infos
+            assert env._prev_state == orig_env._prev_state
+
+            # Check copy after a few env.step.
+            game_state, _, _ = orig_env.step("go east")
+            assert env.state == orig_env._prev_state
+
+            env = orig_env.copy()
+            assert env._prev_state is not None
+            prev_state = env._prev_state.copy()
+
+            # Check the copied env didn't change after calling env.step.
+            game_state, _, done = orig_env.step("eat carrot")
+            assert env._prev_state == prev_state
 
     def test_no_quest_game(self):
         game_name = "tw-no_quest_game"
@@ -360,18 +359,17 @@ class TestGameData(unittest.TestCase):
                 npt.assert_raises(MissingGameInfosError, env.load, gamefile)
 
     def test_copy(self):
-        npt.assert_raises(NotImplementedError, self.env_ulx.copy)
-
-        # Copy before env.reset.
-        env = self.env_z8.copy()
-        assert env._gamefile == self.env_z8._gamefile
-        assert env._game == self.env_z8._game
+        for orig_env in [self.env_ulx, self.env_z8]:
+            # Copy before env.reset.
+            env = orig_env.copy()
+            assert env._gamefile == orig_env._gamefile
+            assert env._game == orig_env._game
 
-        # Copy after env.reset.
-        self.env_z8.reset()
-        env = self.env_z8.copy()
-        assert env._gamefile == self.env_z8._gamefile
-        assert id(env._game) == id(self.env_z8._game)  # Reference
+            # Copy after env.reset.
+            orig_env.reset()
+            env = orig_env.copy()
+            assert env._gamefile == orig_env._gamefile
+            assert id(env._game) == id(orig_env._game)  # Reference
 
 
 class TestStateTracking(unittest.TestCase):
@@ -502,43 +500,73 @@ class TestStateTracking(unittest.TestCase):
                 npt.assert_raises(MissingGameInfosError, env.load, gamefile)
 
     def test_copy(self):
-        npt.assert_raises(NotImplementedError, self.env_ulx.copy)
-
-        # Copy before env.reset.
-        env = self.env_z8.copy()
-        assert env._gamefile == self.env_z8._gamefile
-        assert env._game == self.env_z8._game
-        assert env._inform7 == self.env_z8._inform7
-        assert env._last_action == self.env_z8._last_action
-        assert env._previous_winning_policy == self.env_z8._previous_winning_policy
-        assert env._current_winning_policy == self.env_z8._current_winning_policy
-        assert env._moves == self.env_z8._moves
-        assert env._game_progression == self.env_z8._game_progression
-
-        # Copy after env.reset.
-        self.env_z8.reset()
-        env = self.env_z8.copy()
-        assert env._gamefile == self.env_z8._gamefile
-        assert id(env._game) == id(self.env_z8._game)  # Reference
-        assert id(env._inform7) == id(self.env_z8._inform7)  # Reference
-        assert env._last_action == self.env_z8._last_action
-        assert env._previous_winning_policy == self.env_z8._previous_winning_policy
-        assert tuple(env._current_winning_policy) == tuple(self.env_z8._current_winning_policy)
-        assert env._moves == self.env_z8._moves
-        assert id(env._game_progression) != id(self.env_z8._game_progression)
-        assert env._game_progression.state == self.env_z8._game_progression.state
-
-        # Keep a copy of some information for later use.
-        current_winning_policy = list(env._current_winning_policy)
-        game_progression = env._game_progression.copy()
-
-        # Check copy after a few env.step.
-        game_state, _, _ = self.env_z8.step("go east")
-        assert env._game_progression.state != self.env_z8._game_progression.state
-        game_state, _, done = self.env_z8.step("drop carrot")
-        assert env._game_progression.state != self.env_z8._game_progression.state
-
-        # Check the copied env didn't change after calling env.step.
-        assert tuple(env._current_winning_policy) == tuple(current_winning_policy)
-        assert tuple(env._current_winning_policy) != tuple(self.env_z8._current_winning_policy)
-        assert env._game_progression.state == game_progression.state
+        for orig_env in [self.env_ulx, self.env_z8]:
+            # Copy before env.reset.
+            env = orig_env.copy()
+            assert env._gamefile == orig_env._gamefile
+            assert env._game == orig_env._game
+            assert env._inform7 == orig_env._inform7
+            assert env._last_action == orig_env._last_action
+            assert env._previous_winning_policy == orig_env._previous_winning_policy
+            assert env._current_winning_policy == orig_env._current_winning_policy
+            assert env._moves == orig_env._moves
+            assert env._game_progression == orig_env._game_progression
+
+            # Copy after env.reset.
+            orig_env.reset()
+            env = orig_env.copy()
+            assert env._gamefile == orig_env._gamefile
+            assert id(env._game) == id(orig_env._game)  # Reference
+            assert id(env._inform7) == id(orig_env._inform7)  # Reference
+            assert env._last_action == orig_env._last_action
+            assert env._previous_winning_policy == orig_env._previous_winning_policy
+            assert tuple(env._current_winning_policy) == tuple(orig_env._current_winning_policy)
+            assert env._moves == orig_env._moves
+            assert id(env._game_progression) != id(orig_env._game_progression)
+            assert env._game_progression.state == orig_env._game_progression.state
+
+            # Keep a copy of some information for later use.
+            current_winning_policy = list(env._current_winning_policy)
+            game_progression = env._game_progression.copy()
+
+            # Check copy after a few env.step.
+            game_state, _, _ = orig_env.step("go east")
+            assert env._game_progression.state != orig_env._game_progression.state
+            game_state, _, done = orig_env.step("drop carrot")
+            assert env._game_progression.state != orig_env._game_progression.state
+
+            # Check the copied env didn't change after calling env.step.
+            assert tuple(env._current_winning_policy) == tuple(current_winning_policy)
+            assert tuple(env._current_winning_policy) != tuple(orig_env._current_winning_policy)
+            assert env._game_progression.state == game_progression.state
+
+
+def test_parse_output():
+    text = ("[taking the apple]\n[taking the apple - succeeded]\nTaken.\n"
+            "<inventory>\n[printing the inventory]\nYou are carrying an apple.\n</inventory>"
+            "[eating (subrule) - succeeded]\n"
+            "<score>\n1\n</score><moves>\n2\n</moves>")
+
+    feedback, infos, events = _parse_output(text, ["inventory", "score", "description"])
+    assert feedback == ("[taking the apple]\n[taking the apple - succeeded]\nTaken.\n"
+                        "[eating (subrule) - succeeded]\n<moves>\n2\n</moves>")
+    assert infos == {"inventory": "You are carrying an apple.", "score": "1", "description": None}
+    assert events == []
+
+    feedback, infos, events = _parse_output(text, ["inventory", "score", "moves"], events=True)
+    assert feedback == "Taken.\n"
+    assert infos == {"inventory": "You are carrying an apple.", "score": "1", "moves": "2"}
+    assert events == ["taking the apple"]
+
+    assert _parse_output(text) == (text, {}, [])
+
+    # Tags that are never closed are left in the text.
+    text = "<score>\n1 [eating the apple - succeeded]\n<moves>\n2\n</moves>"
+    feedback, infos, events = _parse_output(text, ["score", "moves"], events=True)
+    assert feedback == "<score>\n1 "
+    assert infos == {"score": None, "moves": "2"}
+    assert events == ["eating the apple"]
+
+    # Tags can't be part of an event.
+    text = "You see [a <score>\n1\n</score> glass]."
+    assert _parse_output(text, ["score"], events=True) == ("You see [a  glass].", {"score": "1"}, [])
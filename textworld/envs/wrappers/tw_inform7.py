@@ -5,13 +5,14 @@
 # -*- coding: utf-8 -*-
 import os
 import re
+import functools
 
 from typing import Mapping, Tuple, List, Optional
 
 import textworld
 from textworld.utils import check_flag
-from textworld.generator.game import Game, GameProgression
-from textworld.generator.inform7 import Inform7Game
+from textworld.envs.utils import load_game
+from textworld.generator.game import GameProgression
 
 
 AVAILABLE_INFORM7_EXTRA_INFOS = ["description", "inventory", "score", "moves"]
@@ -30,6 +31,108 @@ class MissingGameInfosError(NameError):
         super().__init__(msg.format(env.__class__.__name__))
 
 
+@functools.lru_cache(maxsize=None)
+def _token_regex(tags: Tuple[str, ...]) -> re.Pattern:
+    """ Regex matching one token of the game's output: an opening or closing tag, or an event. """
+    if not tags:
+        return re.compile(r"\[(?P<event>[^]]+)\]\n?")
+
+    names = "|".join(map(re.escape, tags))
+    return re.compile(r"<(?P<open>{names})>\n|</(?P<close>{names})>"
+                      r"|\[(?P<event>(?:[^]<]|<(?!(?:{names})>\n|/(?:{names})>))+)\]\n?"  # Tags can't be part of events.
+                      .format(names=names))
+
+
+def _parse_output(text: str, tracked_infos: List[str] = (),
+                  events: bool = False) -> Tuple[str, Mapping[str, Optional[str]], List[str]]:
+    """ Split the output of a TextWorld game in a single pass.
+
+    Extra information is displayed between tags, e.g. <inventory> ... </inventory>
+    (see `_detect_extra_infos`), and Inform7 events between brackets, e.g.
+    [taking the apple - succeeded] (see `_detect_i7_events_debug_tags`).
+    The text is scanned once, jumping from one '<' or '[' to the next.
+
+    Args:
+        text: Text outputted by the game.
+        tracked_infos: Extra information to extract. Other tags are left in the text.
+        events: Whether to also extract the Inform7 events debug tags.
+                Those displayed along with extra information are always removed.
+
+    Returns:
+        A tuple containing the text without the extracted parts, a dictionary
+        of the extra information (`None` if missing), and a list of the Inform7
+        events that succeeded (empty if `events` is `False`).
+    """
+    infos = dict.fromkeys(tracked_infos)
+    detected_events = []
+    if not tracked_infos and not events:
+        return text, infos, detected_events
+
+    token_regex = _token_regex(tuple(tracked_infos))
+    chunks = []  # Text kept in the feedback.
+    info = None  # Text of the extra information being read, if any.
+    tag = None
+    pos = 0  # End of the last token.
+    next_tag = text.find("<") if tracked_infos else -1
+    next_event = text.find("[")
+    while next_tag != -1 or next_event != -1:
+        if next_event == -1 or (next_tag != -1 and next_tag < next_event):
+            start, next_tag = next_tag, text.find("<", next_tag + 1)
+        else:
+            start, next_event = next_event, text.find("[", next_event + 1)
+
+        match = token_regex.match(text, start)
+        if match is None:
+            continue  # Not a token.
+
+        (chunks if info is None else info).append(text[pos:start])
+        pos = match.end()
+        if next_tag != -1 and next_tag < pos:
+            next_tag = text.find("<", pos)
+        if next_event != -1 and next_event < pos:
+            next_event = text.find("[", pos)
+
+        kind = match.lastgroup
+        if info is not None:
+            if kind == "close" and match.group("close") == tag:
+                if infos[tag] is None:  # Only keep the first one.
+                    infos[tag] = "".join(info).strip()
+
+                info = None
+            elif kind != "event":
+                info.append(match.group())
+
+        elif kind == "open":
+            tag = match.group("open")
+            tag_start, tag_end = start, pos
+            info = []
+
+        elif kind == "event" and events:
+            event = match.group("event")
+            if " - succeeded" in event:
+                event = event[:event.index(" - succeeded")]
+                # If it's got either a '(' or ')' in it, it's a subrule, so it doesn't count.
+                if "(" not in event and ")" not in event:
+                    detected_events.append(event)
+
+        else:
+            chunks.append(match.group())
+
+    if info is not None:
+        # The tag is never closed, leave it in the text and parse what follows it again.
+        others = [other for other in tracked_infos if other != tag]
+        rest, others_infos, others_events = _parse_output(text[tag_end:], others, events)
+        infos.update({other: value for other, value in others_infos.items() if infos[other] is None})
+        detected_events += others_events
+        return "".join(chunks) + text[tag_start:tag_end] + rest, infos, detected_events
+
+    if pos == 0:
+        return text, infos, detected_events  # Nothing extracted.
+
+    chunks.append(text[pos:])
+    return "".join(chunks), infos, detected_events
+
+
 def _detect_extra_infos(text: str, tracked_infos: Optional[List[str]] = None) -> Mapping[str, str]:
     """ Detect extra information printed out at every turn.
 
@@ -45,20 +148,11 @@ def _detect_extra_infos(text: str, tracked_infos: Optional[List[str]] = None) ->
         values are the extra information displayed between tags.
     """
     tracked_infos = tracked_infos or AVAILABLE_INFORM7_EXTRA_INFOS
-    matches = {}
     for tag in tracked_infos:
         if tag not in AVAILABLE_INFORM7_EXTRA_INFOS:
             raise ValueError("TW game doesn't support tag: {}".format(tag))
 
-        regex = re.compile(r"<{tag}>\n(.*)</{tag}>".format(tag=tag), re.DOTALL)
-        match = re.search(regex, text)
-        if match:
-            _, cleaned_text = _detect_i7_events_debug_tags(match.group(1))
-            matches[tag] = cleaned_text.strip()
-            text = re.sub(regex, "", text)
-        else:
-            matches[tag] = None
-
+    text, matches, _ = _parse_output(text, tracked_infos)
     return matches, text
 
 
@@ -74,19 +168,7 @@ def _detect_i7_events_debug_tags(text: str) -> Tuple[List[str], str]:
         A tuple containing a list of Inform 7 events that were detected
         in the text, and a cleaned text without Inform 7 debug infos.
     """
-    matches = []
-    for match in re.findall(r"\[[^]]+\]\n?", text):
-        text = text.replace(match, "")  # Remove i7 debug tags.
-        tag_name = match.strip()[1:-1]  # Strip starting '[' and trailing ']'.
-
-        if " - succeeded" in tag_name:
-            tag_name = tag_name[:tag_name.index(" - succeeded")]
-            matches.append(tag_name)
-
-    # If it's got either a '(' or ')' in it, it's a subrule,
-    # so it doesn't count.
-    matches = [m for m in matches if "(" not in m and ")" not in m]
-
+    text, _, matches = _parse_output(text, events=True)
     return matches, text
 
 
@@ -125,6 +207,7 @@ class Inform7Data(textworld.core.Wrapper):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._tracked_infos = []
+        self._trace_events = False
         self._prev_state = None
 
     def _gather_infos(self):
@@ -143,8 +226,13 @@ class Inform7Data(textworld.core.Wrapper):
     def step(self, command: str):
         self._prev_state = self.state
         self.state, _, _, = self._wrapped_env.step(command)
-        extra_infos, self.state["feedback"] = _detect_extra_infos(self.state["feedback"], self._tracked_infos)
+        feedback, extra_infos, i7_events = _parse_output(self.state["feedback"], self._tracked_infos,
+                                                         events=self._trace_events)
+        self.state["feedback"] = feedback
         self.state.update(extra_infos)
+        if self._trace_events:
+            self.state["_i7_events"] = i7_events  # For `StateTracking`.
+
         self._gather_infos()
         self.state["done"] = self.state["won"] or self.state["lost"]
         return self.state, self.state["score"], self.state["done"]
@@ -153,26 +241,42 @@ class Inform7Data(textworld.core.Wrapper):
         """ Send a command to the game without affecting the Environment's state. """
         return self.unwrapped._send(command)
 
-    def _track_info(self, info):
-        extra_infos, _ = _detect_extra_infos(self._send('tw-extra-infos {}'.format(info)))
-        self._tracked_infos.append(info)
-        # Update the state with the new information. Avoid overwriting existing information if new value is None.
-        self.state.update({k: v for k, v in extra_infos.items() if k not in self.state or v is not None})
+    def _send_many(self, commands: List[str]) -> List[str]:
+        """ Send commands to the game, in order, without affecting the Environment's state. """
+        if hasattr(self.unwrapped, "_send_many"):
+            return self.unwrapped._send_many(commands)  # All at once.
+
+        return [self._send(command) for command in commands]
+
+    def _trace_actions(self) -> None:
+        """ Turn on print for Inform7 action events, then extracted by `step` along with the extra infos. """
+        self._send('tw-trace-actions')
+        self._trace_events = True
+
+    def _track_infos(self, infos):
+        outputs = self._send_many(['tw-extra-infos {}'.format(info) for info in infos])
+        for info, output in zip(infos, outputs):
+            extra_infos, _ = _detect_extra_infos(output)
+            self._tracked_infos.append(info)
+            # Update the state with the new information. Avoid overwriting existing information if new value is None.
+            self.state.update({k: v for k, v in extra_infos.items() if k not in self.state or v is not None})
 
     def reset(self):
         self._tracked_infos = []
+        self._trace_events = False
         self._prev_state = None
         self.state = self._wrapped_env.reset()
 
+        infos = []
         if self.request_infos.inventory:
-            self._track_info("inventory")
+            infos.append("inventory")
 
         if self.request_infos.description:
-            self._track_info("description")
+            infos.append("description")
 
         # Always track moves and score.
-        self._track_info("moves")
-        self._track_info("score")
+        infos += ["moves", "score"]
+        self._track_infos(infos)
 
         self._gather_infos()
         return self.state
@@ -182,6 +286,7 @@ class Inform7Data(textworld.core.Wrapper):
         env = Inform7Data()
         env._wrapped_env = self._wrapped_env.copy()
         env._tracked_infos = list(self._tracked_infos)
+        env._trace_events = self._trace_events
         env._prev_state = self._prev_state.copy() if self._prev_state is not None else None
         return env
 
@@ -215,14 +320,14 @@ class StateTracking(textworld.core.Wrapper):
         self._gamefile = os.path.splitext(gamefile)[0] + ".json"
         try:
             self._game = self._wrapped_env._game
+            self._inform7 = self._wrapped_env._inform7
         except AttributeError:
             if not os.path.isfile(self._gamefile):
                 raise MissingGameInfosError(self)
 
-            self._game = Game.load(self._gamefile)
+            self._game, self._inform7 = load_game(self._gamefile)
 
         self._game_progression = None
-        self._inform7 = Inform7Game(self._game)
 
     def _gather_infos(self):
         self.state["_game_progression"] = self._game_progression
@@ -263,10 +368,10 @@ class StateTracking(textworld.core.Wrapper):
 
         self.state["_valid_actions"] = self._game_progression.valid_actions
         if self.request_infos.admissible_commands:
-            all_valid_commands = self._inform7.gen_commands_from_actions(self._game_progression.valid_actions)
             # To guarantee the order from one execution to another, we sort the commands.
             # Remove any potential duplicate commands (they would lead to the same result anyway).
-            self.state["admissible_commands"] = sorted(set(all_valid_commands))
+            valid_actions = self._game_progression.valid_actions
+            self.state["admissible_commands"] = self._inform7.gen_admissible_commands(valid_actions)
 
         if self.request_infos.moves:
             self.state["moves"] = self._moves
@@ -280,7 +385,11 @@ class StateTracking(textworld.core.Wrapper):
         if not self.tracking:
             return self.state  # State tracking not needed.
 
-        self._send('tw-trace-actions')  # Turn on print for Inform7 action events.
+        if hasattr(self._wrapped_env, "_trace_actions"):
+            self._wrapped_env._trace_actions()  # Events are then extracted by `Inform7Data`.
+        else:
+            self._send('tw-trace-actions')  # Turn on print for Inform7 action events.
+
         track_quests = (self.request_infos.intermediate_reward or self.request_infos.policy_commands)
         self._game_progression = GameProgression(self._game, track_quests=track_quests)
         self._last_action = None
@@ -297,7 +406,10 @@ class StateTracking(textworld.core.Wrapper):
             return self.state, score, done  # State tracking not needed.
 
         # Detect what events just happened in the game.
-        i7_events, self.state["feedback"] = _detect_i7_events_debug_tags(self.state["feedback"])
+        if "_i7_events" in self.state:
+            i7_events = self.state["_i7_events"]  # Already extracted from the feedback.
+        else:
+            i7_events, self.state["feedback"] = _detect_i7_events_debug_tags(self.state["feedback"])
 
         if check_flag("TEXTWORLD_DEBUG"):
             print("[DEBUG] Detected Inform7 events:\n{}\n".format(i7_events))
@@ -357,9 +469,10 @@ class GameData(textworld.core.Wrapper):
 
         try:
             self._game = self._wrapped_env._game
+            self._inform7 = self._wrapped_env._inform7
         except AttributeError:
-            self._game = Game.load(self._gamefile)
-        self._inform7 = Inform7Game(self._game)
+            self._game, self._inform7 = load_game(self._gamefile)
+
         self._wrapped_env.load(gamefile)
 
     def _gather_infos(self):
@@ -76,11 +76,24 @@ class DependencyTree:
             return False
 
         def __iter__(self) -> Iterable["DependencyTree._Node"]:
+            # Children are visited lazily, but each child's subtree is listed
+            # before being yielded, so it can be modified during iteration.
             for child in self.children:
-                yield from list(child)
+                yield from child._post_order()
 
             yield self
 
+        def _post_order(self) -> List["DependencyTree._Node"]:
+            # Done iteratively since nested generators would cost O(depth) for each node yielded.
+            nodes = []
+            stack = [self]
+            while stack:
+                node = stack.pop()
+                nodes.append(node)
+                stack.extend(node.children)
+
+            return nodes[::-1]
+
         def __str__(self) -> str:
             node_text = str(self.element)
 
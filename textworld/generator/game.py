@@ -727,6 +727,10 @@ class ActionDependencyTree(DependencyTree):
 
         return changed, reverse_action
 
+    def _update(self) -> None:
+        super()._update()
+        self._flattened = None  # The tree changed.
+
     def flatten(self) -> Iterable[Action]:
         """
         Generates a flatten representation of this dependency tree.
@@ -734,6 +738,13 @@ class ActionDependencyTree(DependencyTree):
         Actions are greedily yielded by iteratively popping leaves from
         the dependency tree.
         """
+        # Flattening is costly and the tree rarely changes between two calls.
+        if self._flattened is None:
+            self._flattened = tuple(self._flatten())
+
+        return iter(self._flattened)
+
+    def _flatten(self) -> Iterable[Action]:
         tree = self.copy()  # Make a copy of the tree to work on.
         last_reverse_action = None
         changed = False
@@ -755,6 +766,7 @@ class ActionDependencyTree(DependencyTree):
     def copy(self) -> "ActionDependencyTree":
         tree = super().copy()
         tree._kb = self._kb
+        tree._flattened = self._flattened
         return tree
 
 
@@ -779,6 +791,7 @@ class EventProgression:
         # Build a tree representation of the quest.
         self._tree = ActionDependencyTree(kb=self._kb,
                                           element_type=ActionDependencyTreeElement)
+        self._tree_shared = False  # Whether `_tree` is shared with copies of this event progression.
 
         if len(event.actions) > 0:
             self._tree.push(event.condition)
@@ -790,11 +803,17 @@ class EventProgression:
 
     def copy(self) -> "EventProgression":
         """ Return a soft copy. """
-        ep = EventProgression(self.event, self._kb)
+        # Bypass __init__ to avoid rebuilding a tree that would be thrown away.
+        ep = EventProgression.__new__(EventProgression)
+        ep._kb = self._kb
+        ep.event = self.event
         ep._triggered = self._triggered
         ep._untriggerable = self._untriggerable
         ep._policy = self._policy
-        ep._tree = self._tree.copy()
+
+        # The tree is only copied once one of the event progressions needs to modify it.
+        ep._tree = self._tree
+        ep._tree_shared = self._tree_shared = True
         return ep
 
     @property
@@ -840,6 +859,10 @@ class EventProgression:
                 return  # A shorter winning policy has been found.
 
         if action is not None and not self._tree.empty:
+            if self._tree_shared:
+                self._tree = self._tree.copy()
+                self._tree_shared = False
+
             # Determine if we moved away from the goal or closer to it.
             changed, reverse_action = self._tree.remove(action)
             if changed and reverse_action is None:  # Irreversible action.
@@ -860,16 +883,41 @@ class EventProgression:
         """
 
         def _find_shorter_policy(policy):
+            # Facts each suffix `policy[i:]` needs from the state it starts in,
+            # or `None` if that suffix can never be applied.
+            requirements = [None] * len(policy) + [frozenset()]
+            for i in range(len(policy))[::-1]:
+                action = policy[i]
+                required = requirements[i + 1]
+                if required is None:
+                    break
+
+                required = required - action.added
+                if not required.isdisjoint(action.removed):
+                    break  # Facts needed later on are removed by this action.
+
+                requirements[i] = required | action._pre_set
+
+            # Changes made to `state` by the prefix `policy[:j]`.
+            added, removed = set(), set()
+
+            def _holds(fact):
+                return fact in added or (fact not in removed and state.is_fact(fact))
+
             for j in range(0, len(policy)):
                 for i in range(j + 1, len(policy))[::-1]:
-                    shorter_policy = policy[:j] + policy[i:]
-                    if state.is_sequence_applicable(shorter_policy):
-                        self._tree = ActionDependencyTree(kb=self._kb,
-                                                          element_type=ActionDependencyTreeElement)
-                        for action in shorter_policy[::-1]:
-                            self._tree.push(action)
+                    if requirements[i] is not None and all(_holds(fact) for fact in requirements[i]):
+                        return policy[:j] + policy[i:]
 
-                        return shorter_policy
+                # Extend the prefix with policy[j].
+                action = policy[j]
+                if not all(_holds(fact) for fact in action._pre_set):
+                    break  # No shorter policy can start with this prefix.
+
+                added -= action.removed
+                removed |= action.removed
+                added |= action.added
+                removed -= action.added
 
             return None
 
@@ -880,6 +928,13 @@ class EventProgression:
             self._policy = policy
             policy = _find_shorter_policy(policy)
 
+        if compressed:
+            self._tree = ActionDependencyTree(kb=self._kb,
+                                              element_type=ActionDependencyTreeElement)
+            self._tree_shared = False
+            for action in self._policy[::-1]:
+                self._tree.push(action)
+
         return compressed
 
 
@@ -903,7 +958,9 @@ class QuestProgression:
 
     def copy(self) -> "QuestProgression":
         """ Return a soft copy. """
-        qp = QuestProgression(self.quest, self.kb)
+        qp = QuestProgression.__new__(QuestProgression)
+        qp.quest = self.quest
+        qp.kb = self.kb
         qp.win_events = [event_progression.copy() for event_progression in self.win_events]
         qp.fail_events = [event_progression.copy() for event_progression in self.fail_events]
         qp.nb_completions = self.nb_completions
@@ -1005,11 +1062,12 @@ class GameProgression:
 
     def copy(self) -> "GameProgression":
         """ Return a soft copy. """
-        gp = GameProgression(self.game, track_quests=False)
-        gp.state = self.state.copy()
-        gp._valid_actions = self._valid_actions
-        if self.tracking_quests:
-            gp.quest_progressions = [quest_progression.copy() for quest_progression in self.quest_progressions]
+        # Bypass __init__ since recomputing the initial valid actions would be wasted.
+        gp = GameProgression.__new__(GameProgression)
+        gp.game = self.game
+        gp.state = self.state.copy()  # Copy-on-write.
+        gp._valid_actions = self._valid_actions  # Never modified in place, see `update`.
+        gp.quest_progressions = [quest_progression.copy() for quest_progression in self.quest_progressions]
 
         return gp
 
@@ -1084,11 +1142,12 @@ class GameProgression:
             action: Action affecting the state of the game.
         """
         # Update world facts.
-        self.state.apply(action)
-
-        # Get valid actions.
-        self._valid_actions = list(self.state.all_applicable_actions(self.game.kb.rules.values(),
-                                                                     self.game.kb.types.constants_mapping))
+        if self.state.apply(action):
+            # Update valid actions given the facts that changed.
+            self._valid_actions = self.state.update_applicable_actions(self._valid_actions,
+                                                                       list(self.game.kb.rules.values()),
+                                                                       action.added, action.removed,
+                                                                       self.game.kb.types.constants_mapping)
 
         # Update all quest progressions given the last action and new state.
         for quest_progression in self.quest_progressions:
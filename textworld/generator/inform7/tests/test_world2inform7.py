@@ -16,6 +16,8 @@ from textworld.generator import World, Quest, Event
 from textworld.generator import compile_game
 from textworld.generator import make_small_map, make_grammar, make_game_with
 from textworld.generator.chaining import ChainingOptions, sample_quest
+from textworld.generator.game import GameProgression
+from textworld.generator.inform7 import Inform7Game
 
 
 def _compile_game(game, path):
@@ -610,3 +612,55 @@ def test_game_with_infinite_max_score():
         assert score == 30
 
         assert "a total of 30 points," in state.feedback
+
+
+def test_detect_action():
+    M = textworld.GameMaker()
+    R1 = M.new_room("West room")
+    R2 = M.new_room("East room")
+    M.set_player(R1)
+    path = M.connect(R1.east, R2.west)
+    path.door = M.new(type='d', name='wooden door')
+    path.door.add_property("closed")
+    chest = M.new(type='c', name='chest')
+    chest.add_property("closed")
+    R1.add(chest)
+    M.inventory.add(M.new(type='o', name='coin'))
+    game = M.build()
+
+    inform7 = Inform7Game(game)
+    inform7.EVENTS_CACHE_SIZE = 2  # Force evictions.
+    valid_actions = GameProgression(game).valid_actions
+    assert len(valid_actions) > 2
+    for action in valid_actions:
+        event = game.kb.inform7_events[action.name].format(**inform7._get_name_mapping(action))
+        detected = inform7.detect_action(event.upper(), valid_actions)
+        assert detected is not None
+        assert inform7._get_event_string(detected) == event.lower()
+        assert len(detected.preconditions) >= len(action.preconditions)
+        assert len(inform7._event_strings) <= 2
+
+    assert inform7.detect_action("unknown event", valid_actions) is None
+    assert inform7.detect_action(event, []) is None
+
+
+def test_gen_admissible_commands():
+    options = textworld.GameOptions()
+    options.nb_rooms = 5
+    options.nb_objects = 10
+    options.seeds = 1234
+    game = textworld.generator.make_game(options)
+    inform7 = Inform7Game(game)
+    inform7.COMMANDS_CACHE_SIZE = 10  # Force evictions.
+
+    rng = np.random.RandomState(1234)
+    game_progression = GameProgression(game, track_quests=False)
+    for _ in range(20):
+        valid_actions = game_progression.valid_actions
+        expected = sorted(set(inform7.gen_commands_from_actions(valid_actions)))
+        assert inform7.gen_admissible_commands(valid_actions) == expected
+        assert len(inform7._commands) <= 10
+
+        game_progression.update(valid_actions[rng.randint(len(valid_actions))])
+
+    assert inform7.gen_admissible_commands([]) == []
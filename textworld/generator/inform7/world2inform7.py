@@ -4,14 +4,17 @@
 
 import re
 import os
+import bisect
 import shutil
 import warnings
+import threading
 import subprocess
 import textwrap
 
 import importlib.resources
 from os.path import join as pjoin
-from typing import Iterable, Optional, List
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, Optional, List
 
 import numpy as np
 
@@ -55,6 +58,10 @@ def split_string(string, name, cutoff=200):
 
 class Inform7Game:
     VERSION = 1
+    #: int: Maximum number of action commands kept in cache.
+    COMMANDS_CACHE_SIZE = 10000
+    #: int: Maximum number of action events kept in cache.
+    EVENTS_CACHE_SIZE = 10000
 
     def __init__(self, game: Game, custom_code: str = "") -> None:
         self.game = game
@@ -65,6 +72,19 @@ class Inform7Game:
         # Custom inform7 scripts for in-game mechanics.
         self.custom_code = custom_code
 
+        # The caches below may be shared by environments running in different threads.
+        self._lock = threading.RLock()
+        # Used by `gen_commands_from_actions`.
+        self._commands = OrderedDict()  # Action -> command, in least recently used order.
+        # Used by `gen_admissible_commands`.
+        self._admissible_actions = set()
+        self._admissible_counts = Counter()  # Command -> nb. of actions producing it.
+        self._admissible_commands = []  # Sorted.
+
+        # Used by `detect_action`.
+        self._event_strings = OrderedDict()  # Action -> lowercase Inform7 event, in least recently used order.
+        self._event_index = None  # (actions, {lowercase Inform7 event: action}).
+
     def gen_source_for_map(self, src_room: WorldRoom) -> str:
         source = ""
         src_room_id = src_room.id
@@ -202,25 +222,85 @@ class Inform7Game:
         mapping = self.kb.rules[action.name].match(action)
         return {ph.name: self.entity_infos[var.name].name for ph, var in mapping.items()}
 
+    def _gen_command(self, action: Action) -> str:
+        if getattr(action, "command_template"):
+            mapping = {var.name: self.entity_infos[var.name].name for var in action.variables}
+            return action.format_command(mapping)
+
+        msg = ("Using slower text commands from action generation."
+               " Regenerate your games, to get a faster version.")
+        warnings.warn(msg, TextworldInform7Warning)
+        command = self.kb.inform7_commands[action.name]
+        return command.format(**self._get_name_mapping(action))
+
+    def _get_command(self, action: Action) -> str:
+        with self._lock:
+            command = self._commands.get(action)
+            if command is None:
+                command = self._gen_command(action)
+                self._commands[action] = command
+                if len(self._commands) > self.COMMANDS_CACHE_SIZE:
+                    self._commands.popitem(last=False)  # Evict the least recently used.
+            else:
+                self._commands.move_to_end(action)
+
+            return command
+
     def gen_commands_from_actions(self, actions: Iterable[Action]) -> List[str]:
         commands = []
         for action in actions:
             command = "None"
             if action is not None:
-                if getattr(action, "command_template"):
-                    mapping = {var.name: self.entity_infos[var.name].name for var in action.variables}
-                    command = action.format_command(mapping)
-                else:
-                    msg = ("Using slower text commands from action generation."
-                           " Regenerate your games, to get a faster version.")
-                    warnings.warn(msg, TextworldInform7Warning)
-                    command = self.kb.inform7_commands[action.name]
-                    command = command.format(**self._get_name_mapping(action))
+                command = self._get_command(action)
 
             commands.append(command)
 
         return commands
 
+    def gen_admissible_commands(self, actions: Iterable[Action]) -> List[str]:
+        """ Generate the sorted list of unique commands for some actions.
+
+        This is equivalent to `sorted(set(gen_commands_from_actions(actions)))`
+        but the list is maintained from one call to the next: only the
+        actions that were added or removed since the previous call are
+        processed. Successive calls with similar actions, e.g. the valid
+        actions of consecutive game steps, are thus much cheaper.
+
+        Arguments:
+            actions: Actions to generate commands for.
+
+        Returns:
+            Sorted list of the commands.
+        """
+        actions = set(actions)
+        with self._lock:
+            added = actions - self._admissible_actions
+            removed = self._admissible_actions - actions
+
+            commands = self._admissible_commands
+            if len(added) + len(removed) > len(actions):
+                # Too many changes, rebuild everything.
+                self._admissible_counts = Counter(self._get_command(action) for action in actions)
+                commands = sorted(self._admissible_counts)
+            else:
+                for action in removed:
+                    command = self._get_command(action)
+                    self._admissible_counts[command] -= 1
+                    if self._admissible_counts[command] == 0:
+                        del self._admissible_counts[command]
+                        del commands[bisect.bisect_left(commands, command)]
+
+                for action in added:
+                    command = self._get_command(action)
+                    if self._admissible_counts[command] == 0:
+                        bisect.insort(commands, command)
+
+                    self._admissible_counts[command] += 1
+
+            self._admissible_actions = actions
+            self._admissible_commands = commands
+            return list(commands)
+
     def get_human_readable_fact(self, fact: Proposition) -> Proposition:
         def _get_name(info):
             return info.name if info.name else info.id
@@ -243,15 +323,44 @@ class Inform7Game:
 
         Returns:
             Action corresponding to the provided Inform7 event.
+
+        Notes:
+            Events are looked up in an index built from `actions`. That index
+            is kept for as long as the same `actions` object is provided, so
+            that object must not be modified in place between calls.
         """
-        # Prioritze actions with many precondition terms.
-        actions = sorted(actions, key=lambda a: len(a.preconditions), reverse=True)
-        for action in actions:
-            event = self.kb.inform7_events[action.name]
-            if event.format(**self._get_name_mapping(action)).lower() == i7_event.lower():
-                return action
+        return self._get_event_index(actions).get(i7_event.lower())
+
+    def _get_event_string(self, action: Action) -> str:
+        with self._lock:
+            event = self._event_strings.get(action)
+            if event is None:
+                event = self.kb.inform7_events[action.name]
+                event = event.format(**self._get_name_mapping(action)).lower()
+                self._event_strings[action] = event
+                if len(self._event_strings) > self.EVENTS_CACHE_SIZE:
+                    self._event_strings.popitem(last=False)  # Evict the least recently used.
+            else:
+                self._event_strings.move_to_end(action)
+
+            return event
 
-        return None
+    def _get_event_index(self, actions: Iterable[Action]) -> Dict[str, Action]:
+        # The index is reused for as long as the same list of actions is given,
+        # e.g. `GameProgression.valid_actions` between two updates.
+        if self._event_index is not None and self._event_index[0] is actions:
+            return self._event_index[1]
+
+        index = {}
+        for action in actions:
+            event = self._get_event_string(action)
+            other = index.get(event)
+            # Prioritize actions with many precondition terms.
+            if other is None or len(action.preconditions) > len(other.preconditions):
+                index[event] = action
+
+        self._event_index = (actions, index)
+        return index
 
     def define_inform7_kinds(self) -> str:
         """ Generate Inform 7 kind definitions. """
@@ -43,6 +43,36 @@ class TestDependencyTree(unittest.TestCase):
         assert tree.remove("F")
         assert set(tree.leaves_values) == set("G")
 
+    def test_iter_while_removing(self):
+        tree = DependencyTree(element_type=CustomDependencyTreeElement)
+        for value in "GFEC":
+            tree.push(value)
+
+        # G depends on F and E, F depends on E and C.
+        root = tree.roots[0]
+        assert [node.element.value for node in root] == ["E", "C", "F", "E", "G"]
+
+        # Children of the node being iterated are visited lazily: removed ones are skipped.
+        visited = []
+        for node in tree.copy().roots[0]:
+            visited.append(node.element.value)
+            if node.element.value == "F":
+                node.parent.children.remove(node.parent.children[-1])
+
+        assert visited == ["E", "C", "F", "G"]
+
+        # Their subtrees are listed beforehand: removing nodes from them doesn't skip any.
+        visited = []
+        for node in tree.copy().roots[0]:
+            visited.append(node.element.value)
+            if node.element.value == "E" and node.parent.element.value == "F":
+                node.parent.children.remove(node)
+
+        assert visited == ["E", "C", "F", "E", "G"]
+
+        assert tree.remove("E")
+        assert tree.values == ["C", "F", "G"]
+
     def test_push(self):
         tree = DependencyTree(element_type=CustomDependencyTreeElement)
         assert len(tree.roots) == 0
@@ -755,6 +755,39 @@ class TestGameProgression(unittest.TestCase):
         assert not game_progress.failed
         assert game_progress.winning_policy is None
 
+    def test_copy(self):
+        game = GameProgression(self.game)
+        game.update(self.eventA.actions[0])  # Open the door.
+
+        game_ = game.copy()
+        assert game_.state == game.state
+        assert game_.valid_actions == game.valid_actions
+        assert game_.winning_policy == game.winning_policy
+
+        # Progressing in the copy must not affect the original.
+        policy = game.winning_policy
+        valid_actions = list(game.valid_actions)
+        for action in self.eventA.actions[1:]:
+            game_.update(action)
+
+        assert game.winning_policy == policy
+        assert game.valid_actions == valid_actions
+        assert game_.valid_actions != valid_actions
+        assert game_.quest_progressions[0].completed
+        assert not game.quest_progressions[0].completed
+
+        # And vice-versa.
+        game.update(self.eating_tomato.actions[0])
+        assert not game.state.is_sequence_applicable(self.eating_tomato.actions)
+        assert game_.state.is_sequence_applicable(self.eating_tomato.actions)
+
+        # The copy tracks valid actions the same way a fresh progression would.
+        fresh = GameProgression(self.game, track_quests=False)
+        for action in self.eventA.actions:
+            fresh.update(action)
+
+        assert fresh.valid_actions == game_.valid_actions
+
     def test_cycle_in_winning_policy(self):
         M = GameMaker()
 
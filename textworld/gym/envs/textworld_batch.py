@@ -5,6 +5,7 @@
 import sys
 import textwrap
 from io import StringIO
+from collections import deque
 from typing import List, Optional, Dict, Any, Tuple, Union
 
 import numpy as np
@@ -40,7 +41,8 @@ class TextworldBatchGymEnv:
                  asynchronous: bool = True,
                  auto_reset: bool = False,
                  max_episode_steps: Optional[int] = None,
-                 wrappers: List[textworld.core.Wrapper] = []) -> None:
+                 wrappers: List[textworld.core.Wrapper] = [],
+                 prefetch: int = 0) -> None:
         """ Environment for playing text-based games in batch.
 
         Arguments:
@@ -69,10 +71,17 @@ class TextworldBatchGymEnv:
                 Otherwise, once a game is done, subsequent calls to `env.step` won't have any effects.
             max_episode_steps:
                 Number of steps allocated to play each game. Once exhausted, the game is done.
+            prefetch:
+                Number of upcoming batches of games to prepare in the background (i.e. loaded
+                and reset) while the current games are being played. This makes `env.reset`
+                nearly instantaneous at the cost of running more game interpreters at once.
+                Default: 0.
         """
         self.gamefiles = gamefiles
         self.batch_size = batch_size
         self.request_infos = request_infos or EnvInfos()
+        self.prefetch = prefetch
+        self._upcoming_gamefiles = deque()  # Games drawn from the pool and already prefetched.
         self.seed(1234)
 
         env_fns = [partial(_make_env, self.request_infos, max_episode_steps, wrappers) for _ in range(self.batch_size)]
@@ -98,8 +107,15 @@ class TextworldBatchGymEnv:
 
         # Prepare iterator used for looping through the games.
         self._gamefiles_iterator = shuffled_cycle(gamefiles, rng=rng)
+        self._upcoming_gamefiles.clear()
         return [seed]
 
+    def _next_gamefile(self) -> str:
+        if self._upcoming_gamefiles:
+            return self._upcoming_gamefiles.popleft()
+
+        return next(self._gamefiles_iterator)
+
     def reset(self) -> Tuple[List[str], Dict[str, List[Any]]]:
         """ Resets the text-based environment.
 
@@ -111,14 +127,20 @@ class TextworldBatchGymEnv:
             * observation: text observed in the initial state for each game in the batch;
             * infos: additional information as requested for each game in the batch.
         """
-        if self.batch_env is not None:
-            self.batch_env.close()
-
-        gamefiles = [next(self._gamefiles_iterator) for _ in range(self.batch_size)]
+        # The batch environment (i.e. its worker processes) is reused: loading new games
+        # in the same environments avoids restarting them each time.
+        gamefiles = [self._next_gamefile() for _ in range(self.batch_size)]
         self.batch_env.load(gamefiles)
 
         self.last_commands = [None] * self.batch_size
         self.obs, infos = self.batch_env.reset()
+
+        # The order of the games is known in advance, start preparing the next ones.
+        while len(self._upcoming_gamefiles) < self.prefetch * self.batch_size:
+            gamefiles = [next(self._gamefiles_iterator) for _ in range(self.batch_size)]
+            self._upcoming_gamefiles.extend(gamefiles)
+            self.batch_env.prefetch(gamefiles)
+
         return self.obs, infos
 
     def skip(self, nb_games: int = 1) -> None:
@@ -128,7 +150,7 @@ class TextworldBatchGymEnv:
             nb_games: Number of games to skip.
         """
         for _ in range(nb_games):
-            next(self._gamefiles_iterator)
+            self._next_gamefile()
 
     def step(self, commands) -> Tuple[List[str], List[float], List[bool], Dict[str, List[Any]]]:
         """ Runs a command in each text-based environment of the batch.
@@ -150,6 +172,54 @@ class TextworldBatchGymEnv:
         self.obs, scores, dones, infos = self.batch_env.step(self.last_commands)
         return self.obs, scores, dones, infos
 
+    def step_async(self, commands: List[str], env_ids: Optional[List[int]] = None) -> None:
+        """ Sends commands to some text-based environments of the batch without waiting.
+
+        Use `step_wait` to retrieve the results.
+
+        Arguments:
+            commands: Text command to send to each game interpreter.
+            env_ids: Indices of the games to send the commands to. By default,
+                     all games of the batch.
+        """
+        assert isinstance(commands, (list, tuple)), "Expected a list of commands."
+
+        self.last_commands = list(self.last_commands)
+        for i, command in zip(range(self.batch_size) if env_ids is None else env_ids, commands):
+            self.last_commands[i] = command
+
+        self.batch_env.step_async(commands, env_ids)
+
+    def step_wait(self, timeout: Optional[float] = None, min_ready: Optional[int] = None
+                  ) -> Tuple[List[int], List[str], List[float], List[bool], Dict[str, List[Any]]]:
+        """ Retrieves the results of the commands sent by `step_async`.
+
+        Games that are done processing their command are returned first,
+        without waiting for the slower ones.
+
+        Arguments:
+            timeout: Maximum number of seconds to wait. By default, wait until
+                     `min_ready` games are ready.
+            min_ready: Minimum number of games that need to be ready before
+                       returning. By default, wait for all of them.
+
+        Returns:
+            A tuple (env_ids, observations, scores, dones, infos) where
+
+            * env_ids: indices of the games that are ready;
+            * observations: text observed in the new state for each of those games;
+            * scores: total number of points accumulated so far for each of those games;
+            * dones: whether each of those games is finished or not;
+            * infos: additional information as requested for each of those games.
+        """
+        env_ids, obs, scores, dones, infos = self.batch_env.step_wait(timeout, min_ready)
+
+        self.obs = list(self.obs)
+        for i, ob in zip(env_ids, obs):
+            self.obs[i] = ob
+
+        return env_ids, obs, scores, dones, infos
+
     def close(self) -> None:
         """ Close this environment. """
 
@@ -181,6 +181,12 @@ class TestGymIntegration(unittest.TestCase):
         with pytest.raises(AssertionError):
             obs, scores, dones, infos = env.step(["wait"] * (batch_size - 1))
 
+        # Commands for no game at all are rejected, without being recorded.
+        last_commands = list(env.last_commands)
+        with pytest.raises(AssertionError):
+            env.step_async(["look"], env_ids=[])
+        assert env.last_commands == last_commands
+
         for cmds in zip(*infos.get("extra.walkthrough")):
             obs, scores, dones, infos = env.step(cmds)
 
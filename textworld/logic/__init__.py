@@ -4,9 +4,12 @@
 
 from collections import Counter, defaultdict, deque
 from functools import total_ordering, lru_cache
+from heapq import merge
+from operator import attrgetter
 from tatsu.model import NodeWalker
 import textwrap
-from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Sequence
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Sequence, Tuple
 
 try:
     from typing import Collection
@@ -21,6 +24,11 @@ from textworld.utils import uniquify, unique_product
 from mementos import memento_factory, with_metaclass
 
 
+# Guards the caches filled on first use (atom tables, join plans, atom ids of actions), which can be shared by states
+# used from different threads while games are loaded in background threads (see `AsyncBatchEnv.prefetch`).
+# Only taken when a value is missing, and reentrant since filling some caches fills others.
+_CACHE_LOCK = threading.RLock()
+
 # We use first-order logic to represent the state of the world, and the actions
 # that can be applied to it.  The relevant classes are:
 #
@@ -623,7 +631,7 @@ class Proposition(with_metaclass(PropositionTracker, object)):
     An instantiated Predicate, with concrete variables for each placeholder.
     """
 
-    __slots__ = ("name", "arguments", "signature", "_hash")
+    __slots__ = ("name", "arguments", "signature", "_hash", "_sort_key")
 
     def __init__(self, name: str, arguments: Iterable[Variable] = []):
         """
@@ -641,6 +649,8 @@ class Proposition(with_metaclass(PropositionTracker, object)):
         self.arguments = tuple(arguments)
         self.signature = Signature(name, [var.type for var in self.arguments])
         self._hash = hash((self.name, self.arguments))
+        # Same ordering as comparing (name, arguments), without calling Variable.__lt__().
+        self._sort_key = (self.name,) + tuple([attr for var in self.arguments for attr in (var.name, var.type)])
 
     @property
     def names(self) -> Collection[str]:
@@ -673,7 +683,7 @@ class Proposition(with_metaclass(PropositionTracker, object)):
 
     def __lt__(self, other):
         if isinstance(other, Proposition):
-            return (self.name, self.arguments) < (other.name, other.arguments)
+            return self._sort_key < other._sort_key
         else:
             return NotImplemented
 
@@ -712,6 +722,9 @@ class Proposition(with_metaclass(PropositionTracker, object)):
         return self.name.startswith("not_")
 
 
+_proposition_sort_key = attrgetter("_sort_key")
+
+
 @total_ordering
 class Placeholder:
     """
@@ -955,11 +968,19 @@ class Alias:
             return predicate
 
 
+# Attributes of `Action` computed on demand.
+_ACTION_CACHES = frozenset(["_added", "_removed", "_variables", "_atom_ids", "_atom_masks", "_hash"])
+
+
 class Action:
     """
     An action in the environment.
     """
 
+    __slots__ = ("name", "id", "mapping", "feedback_rule", "command_template", "reverse_name",
+                 "reverse_command_template", "preconditions", "postconditions", "_pre_set", "_post_set", "_added",
+                 "_removed", "_variables", "_atom_ids", "_atom_masks", "_hash")
+
     def __init__(self, name: str, preconditions: Iterable[Proposition], postconditions: Iterable[Proposition]):
         """
         Create an Action.
@@ -975,6 +996,7 @@ class Action:
         """
 
         self.name = name
+        self.id = None  # Set by environments that number their actions (e.g. PDDL operators).
         self.mapping = {}
         self.feedback_rule = None
         self.command_template = None
@@ -985,10 +1007,16 @@ class Action:
 
         self._pre_set = frozenset(self.preconditions)
         self._post_set = frozenset(self.postconditions)
+        self._added = None
+        self._removed = None
+        self._variables = None
+        self._atom_ids = None
+        self._atom_masks = None
+        self._hash = hash((self.name, self._pre_set, self._post_set))
 
     @property
     def variables(self):
-        if not hasattr(self, "_variables"):
+        if self._variables is None:
             self._variables = tuple(uniquify(var for prop in self.all_propositions for var in prop.arguments))
 
         return self._variables
@@ -1005,14 +1033,52 @@ class Action:
         """
         All the new propositions being introduced by this action.
         """
-        return self._post_set - self._pre_set
+        if self._added is None:
+            self._added = self._post_set - self._pre_set
+
+        return self._added
 
     @property
     def removed(self) -> Collection[Proposition]:
         """
         All the old propositions being removed by this action.
         """
-        return self._pre_set - self._post_set
+        if self._removed is None:
+            self._removed = self._pre_set - self._post_set
+
+        return self._removed
+
+    def _get_atom_ids(self, atoms: "AtomTable") -> Tuple[Set[int], Set[int], Set[int]]:
+        """
+        The ids of the propositions this action requires, adds and removes, according to the given atom table.
+        """
+        atom_ids = self._atom_ids
+        if atom_ids is None or atom_ids[0] is not atoms:
+            with _CACHE_LOCK:
+                atom_ids = self._atom_ids
+                if atom_ids is None or atom_ids[0] is not atoms:
+                    atom_ids = self._atom_ids = (atoms,
+                                                 frozenset(atoms.proposition_ids(self._pre_set)),
+                                                 frozenset(atoms.proposition_ids(self.added)),
+                                                 frozenset(atoms.proposition_ids(self.removed)))
+
+        return atom_ids[1:]
+
+    def _get_atom_masks(self, atoms: "AtomTable") -> Tuple[int, int, int]:
+        """
+        Bitmasks of the propositions this action requires, adds and removes, according to the given atom table.
+        """
+        atom_masks = self._atom_masks
+        if atom_masks is None or atom_masks[0] is not atoms:
+            with _CACHE_LOCK:
+                atom_masks = self._atom_masks
+                if atom_masks is None or atom_masks[0] is not atoms:
+                    atom_masks = self._atom_masks = (atoms,
+                                                     _make_mask(atoms.proposition_ids(self._pre_set)),
+                                                     _make_mask(atoms.proposition_ids(self.added)),
+                                                     _make_mask(atoms.proposition_ids(self.removed)))
+
+        return atom_masks[1:]
 
     def __str__(self):
         # Infer carry-over preconditions for pretty-printing
@@ -1032,12 +1098,26 @@ class Action:
 
     def __eq__(self, other):
         if isinstance(other, Action):
-            return (self.name, self._pre_set, self._post_set) == (other.name, other._pre_set, other._post_set)
+            return (self._hash == other._hash
+                    and self.name == other.name
+                    and self._pre_set == other._pre_set
+                    and self._post_set == other._post_set)
         else:
             return NotImplemented
 
     def __hash__(self):
-        return hash((self.name, self._pre_set, self._post_set))
+        return self._hash
+
+    def __getstate__(self):
+        # Leave the caches out: the atom ids would drag their whole atom table along, and hashes of strings differ
+        # from one process to another.
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot not in _ACTION_CACHES}
+
+    def __setstate__(self, state):
+        for slot in self.__slots__:
+            setattr(self, slot, state.get(slot))
+
+        self._hash = hash((self.name, self._pre_set, self._post_set))
 
     @classmethod
     def parse(cls, expr: str) -> "Action":
@@ -1423,6 +1503,141 @@ class Inform7Logic:
             rule.command_template = command.command
 
 
+def _make_mask(ids: Iterable[int]) -> int:
+    mask = 0
+    for id in ids:
+        mask |= 1 << id
+
+    return mask
+
+
+class AtomTable:
+    """
+    Dense integer ids for the variables and ground propositions of a game logic.
+
+    Ids are assigned on first use and are never reused, so sets of ids can stand in for sets of propositions wherever
+    hashing and comparing them is on a hot path.  Each state gets its own table by default, shared with its copies,
+    so a table only grows with the propositions met by the states of a same game and goes away with them.
+    """
+
+    def __init__(self):
+        self._variable_ids = {}
+        self._variables = []
+        self._proposition_ids = {}
+        self._propositions = []
+
+    def variable_id(self, var: Variable) -> int:
+        """
+        Returns the id of the given variable, assigning a new one if needed.
+        """
+        id = self._variable_ids.get(var)
+        if id is None:
+            with _CACHE_LOCK:
+                id = self._variable_ids.get(var)
+                if id is None:
+                    self._variables.append(var)
+                    id = self._variable_ids[var] = len(self._variables) - 1  # Published once complete.
+
+        return id
+
+    def variable(self, id: int) -> Variable:
+        """
+        Returns the variable with the given id.
+        """
+        return self._variables[id]
+
+    def proposition_id(self, prop: Proposition) -> int:
+        """
+        Returns the id of the given proposition, assigning a new one if needed.
+        """
+        id = self._proposition_ids.get(prop)
+        if id is None:
+            with _CACHE_LOCK:
+                id = self._proposition_ids.get(prop)
+                if id is None:
+                    for var in prop.arguments:
+                        self.variable_id(var)
+
+                    self._propositions.append(prop)
+                    id = self._proposition_ids[prop] = len(self._propositions) - 1  # Published once complete.
+
+        return id
+
+    def proposition_ids(self, props: Iterable[Proposition]) -> List[int]:
+        """
+        Returns the ids of the given propositions.
+        """
+        ids = self._proposition_ids
+        return [ids[prop] if prop in ids else self.proposition_id(prop) for prop in props]
+
+    def proposition(self, id: int) -> Proposition:
+        """
+        Returns the proposition with the given id.
+        """
+        return self._propositions[id]
+
+    @property
+    def nb_variables(self) -> int:
+        return len(self._variables)
+
+    @property
+    def nb_propositions(self) -> int:
+        return len(self._propositions)
+
+
+class _JoinPlan:
+    """
+    A precompiled plan for matching a rule's preconditions against a state.
+    """
+
+    __slots__ = ("signatures", "bound_positions", "new_phs_by_depth")
+
+    def __init__(self, logic: "GameLogic", rule: Rule, bound: Collection[Placeholder]):
+        """
+        Compile a join plan.
+
+        Parameters
+        ----------
+        logic :
+            The logic providing the type hierarchy.
+        rule :
+            The rule to compile.
+        bound :
+            The placeholders already assigned by the initial mapping.
+        """
+
+        # The concrete signatures that can match each precondition, in the
+        # same order as `TypeHierarchy.multi_subtypes()` would produce them.
+        self.signatures = []
+        for pred in rule.preconditions:
+            types = [logic.types.get(t) for t in pred.signature.types]
+            subtypes = logic.types.multi_subtypes(types)
+            self.signatures.append(tuple([Signature(pred.name, [t.name for t in ts]) for ts in subtypes]))
+
+        # Argument positions that are already assigned when each precondition
+        # is reached, and the placeholders it newly assigns.
+        seen_phs = set(bound)
+        self.bound_positions = []
+        self.new_phs_by_depth = []
+        for pred in rule.preconditions:
+            bound_positions = []
+            new_phs = []
+            for i, ph in enumerate(pred.parameters):
+                if ph in seen_phs:
+                    if ph not in new_phs:
+                        bound_positions.append((i, ph))
+                else:
+                    new_phs.append(ph)
+                    seen_phs.add(ph)
+
+            self.bound_positions.append(tuple(bound_positions))
+            self.new_phs_by_depth.append(new_phs)
+
+        # Placeholders uniquely found in postcondition are considered as free variables.
+        free_vars = [ph for ph in rule.placeholders if ph not in seen_phs]
+        self.new_phs_by_depth.append(free_vars)
+
+
 class GameLogic:
     """
     The logic for a game (types, rules, etc.).
@@ -1437,6 +1652,7 @@ class GameLogic:
         self.reverse_rules = {}
         self.constraints = {}
         self.inform7 = Inform7Logic()
+        self._join_plans = {}
 
     def _add_predicate(self, signature: Signature):
         if signature in self.predicates:
@@ -1477,6 +1693,7 @@ class GameLogic:
         self._document += document + "\n"
 
     def _initialize(self):
+        self._join_plans = {}
         self.aliases = {sig: self._expand_alias(alias) for sig, alias in self.aliases.items()}
 
         self.rules = {name: self.normalize_rule(rule) for name, rule in self.rules.items()}
@@ -1517,6 +1734,24 @@ class GameLogic:
         post = self._normalize_predicates(rule.postconditions)
         return Rule(rule.name, pre, post)
 
+    def _get_join_plan(self, rule: Rule, mapping: Mapping[Placeholder, Optional[Variable]]) -> _JoinPlan:
+        """
+        Get the (cached) join plan for matching a rule, given an initial mapping.
+        """
+        # Rules compare equal regardless of the order of their preconditions, but
+        # plans depend on it, so they are keyed on the rule's identity instead.
+        bound = frozenset([ph for ph in rule.placeholders if ph in mapping])
+        key = (id(rule), bound)
+        entry = self._join_plans.get(key)
+        if entry is None:
+            with _CACHE_LOCK:
+                entry = self._join_plans.get(key)
+                if entry is None:
+                    # Keep a reference to the rule so its id can't be reused.
+                    entry = self._join_plans[key] = (rule, _JoinPlan(self, rule, bound))
+
+        return entry[1]
+
     def _normalize_predicates(self, predicates):
         result = []
         for pred in predicates:
@@ -1557,7 +1792,7 @@ class State:
     The current state of a world.
     """
 
-    def __init__(self, logic: GameLogic, facts: Iterable[Proposition] = None):
+    def __init__(self, logic: GameLogic, facts: Iterable[Proposition] = None, atoms: Optional["AtomTable"] = None):
         """
         Create a State.
 
@@ -1567,19 +1802,45 @@ class State:
             The logic for this state's game.
         facts : optional
             The facts that will be true in this state.
+        atoms : optional
+            The atom table numbering the propositions.  States sharing the same atom table are compared by their fact
+            ids, others by their facts.  By default, a new one, which the copies of this state will share.
         """
 
         if not isinstance(logic, GameLogic):
             raise ValueError("Expected a GameLogic, found {}".format(type(logic)))
         self._logic = logic
+        self._init_facts(AtomTable() if atoms is None else atoms)
+
+        if facts:
+            self.add_facts(facts)
 
+    def _init_facts(self, atoms: "AtomTable"):
+        """
+        Start without any facts, numbering the propositions with the given atom table.
+        """
+        self._atoms = atoms
         self._facts = defaultdict(set)
+        # Ids (from the logic's atom table) of all the facts, for fast set operations.
+        self._fact_ids = set()
         self._vars_by_name = {}
         self._vars_by_type = defaultdict(set)
         self._var_counts = Counter()
 
-        if facts:
-            self.add_facts(facts)
+        # Lazily-built indices used when matching rules:
+        # signature -> position -> variable -> facts
+        self._arg_index = {}
+        # signature -> facts in sorted order
+        self._sorted_facts = {}
+        # Prefix trie of the action sequences checked so far, see `is_sequence_applicable`.
+        self._sequence_trie = None
+
+        # Copy-on-write bookkeeping: whether the containers above are shared
+        # with copies of this state, and which signature and type buckets
+        # have already been duplicated (i.e. are safe to modify in place).
+        self._shared = False
+        self._owned_sigs = None
+        self._owned_types = None
 
     @property
     def facts(self) -> Iterable[Proposition]:
@@ -1600,7 +1861,16 @@ class State:
         Add a fact to the state.
         """
 
-        self._facts[prop.signature].add(prop)
+        sig = prop.signature
+        self._writable_facts(sig).add(prop)
+        self._fact_ids.add(self._atoms.proposition_id(prop))
+        self._sorted_facts.pop(sig, None)
+        self._sequence_trie = None
+
+        index = self._arg_index.get(sig)
+        if index is not None:
+            for position, var in zip(index, prop.arguments):
+                position[var].add(prop)
 
         for var in prop.arguments:
             self._add_variable(var)
@@ -1618,7 +1888,16 @@ class State:
         Remove a fact from the state.
         """
 
-        self._facts[prop.signature].discard(prop)
+        sig = prop.signature
+        self._writable_facts(sig).discard(prop)
+        self._fact_ids.discard(self._atoms.proposition_id(prop))
+        self._sorted_facts.pop(sig, None)
+        self._sequence_trie = None
+
+        index = self._arg_index.get(sig)
+        if index is not None:
+            for position, var in zip(index, prop.arguments):
+                position[var].discard(prop)
 
         for var in prop.arguments:
             self._remove_variable(var)
@@ -1635,7 +1914,7 @@ class State:
         """
         Returns whether a proposition is true in this state.
         """
-        return prop in self._facts[prop.signature]
+        return prop in self._facts.get(prop.signature, ())
 
     def are_facts(self, props: Iterable[Proposition]) -> bool:
         """
@@ -1673,12 +1952,72 @@ class State:
         """
         return self._vars_by_type.get(type, frozenset())
 
+    def _sorted_facts_with_signature(self, sig: Signature) -> List[Proposition]:
+        """
+        Returns all the known facts with the given signature, in sorted order.
+        """
+        facts = self._sorted_facts.get(sig)
+        if facts is None:
+            facts = sorted(self.facts_with_signature(sig), key=_proposition_sort_key)
+            if self._shared:
+                self._unshare()
+
+            self._sorted_facts[sig] = facts
+
+        return facts
+
+    def _facts_with_argument(self, sig: Signature, position: int, var: Variable) -> Set[Proposition]:
+        """
+        Returns all the known facts with the given signature that have `var` at the given argument position.
+        """
+        index = self._arg_index.get(sig)
+        if index is None:
+            # The index will be updated along with the facts, so they must both be private to this state.
+            facts = self._writable_facts(sig)
+            index = tuple([defaultdict(set) for _ in sig.types])
+            for prop in facts:
+                for i, arg in enumerate(prop.arguments):
+                    index[i][arg].add(prop)
+
+            self._arg_index[sig] = index
+
+        return index[position].get(var, frozenset())
+
+    def _matching_facts(self,
+                        sig: Signature,
+                        bound_positions: Iterable[Tuple[int, Placeholder]],
+                        mapping: Mapping[Placeholder, Optional[Variable]],
+                        ) -> Iterable[Proposition]:
+        """
+        Returns, in sorted order, the facts with the given signature that could agree with the already-assigned
+        placeholders.  The most selective argument index is used to narrow down the candidates.
+        """
+        candidates = None
+        for position, ph in bound_positions:
+            var = mapping.get(ph)
+            if var is None:
+                continue
+
+            facts = self._facts_with_argument(sig, position, var)
+            if not facts:
+                return ()
+
+            if candidates is None or len(facts) < len(candidates):
+                candidates = facts
+
+        if candidates is None:
+            return self._sorted_facts_with_signature(sig)
+
+        return sorted(candidates, key=_proposition_sort_key)
+
     def _add_variable(self, var: Variable):
         name = var.name
         existing = self._vars_by_name.setdefault(name, var)
         _check_type_conflict(name, existing.type, var.type)
 
-        self._vars_by_type[var.type].add(var)
+        if var not in self._vars_by_type.get(var.type, ()):
+            self._writable_variables(var.type).add(var)
+
         self._var_counts[name] += 1
 
     def _remove_variable(self, var: Variable):
@@ -1687,13 +2026,65 @@ class State:
         if self._var_counts[name] == 0:
             del self._var_counts[name]
             del self._vars_by_name[name]
-            self._vars_by_type[var.type].remove(var)
+            self._writable_variables(var.type).remove(var)
+
+    def _unshare(self):
+        """
+        Stop sharing the top-level containers with other copies of this state.  Only the mappings are duplicated, the
+        fact and variable buckets they hold are still shared until modified.
+        """
+        self._facts = self._facts.copy()
+        self._fact_ids = self._fact_ids.copy()
+        self._vars_by_name = self._vars_by_name.copy()
+        self._vars_by_type = self._vars_by_type.copy()
+        self._var_counts = self._var_counts.copy()
+        self._arg_index = self._arg_index.copy()
+        self._sorted_facts = self._sorted_facts.copy()
+        self._owned_sigs = set()
+        self._owned_types = set()
+        self._shared = False
+
+    def _writable_facts(self, sig: Signature) -> Set[Proposition]:
+        """
+        Returns the set of facts with the given signature, duplicating it (and its argument index) first if it is
+        shared with another state.
+        """
+        if self._shared:
+            self._unshare()
+
+        if self._owned_sigs is None or sig in self._owned_sigs:
+            return self._facts[sig]
+
+        self._owned_sigs.add(sig)
+        facts = self._facts[sig] = set(self._facts.get(sig, ()))
+
+        index = self._arg_index.get(sig)
+        if index is not None:
+            self._arg_index[sig] = tuple([defaultdict(set, {var: set(props) for var, props in position.items()})
+                                          for position in index])
+
+        return facts
+
+    def _writable_variables(self, type: str) -> Set[Variable]:
+        """
+        Returns the set of variables of the given type, duplicating it first if it is shared with another state.
+        """
+        if self._shared:
+            self._unshare()
+
+        if self._owned_types is None or type in self._owned_types:
+            return self._vars_by_type[type]
+
+        self._owned_types.add(type)
+        variables = self._vars_by_type[type] = set(self._vars_by_type.get(type, ()))
+        return variables
 
     def is_applicable(self, action: Action) -> bool:
         """
         Check if an action is applicable in this state (i.e. its preconditions are met).
         """
-        return self.are_facts(action.preconditions)
+        pre_ids, _, _ = action._get_atom_ids(self._atoms)
+        return pre_ids <= self._fact_ids
 
     def is_sequence_applicable(self, actions: Iterable[Action]) -> bool:
         """
@@ -1701,16 +2092,32 @@ class State:
         """
 
         # The simplest implementation would copy the state and apply all the actions, but that would waste time both in
-        # the copy and the variable tracking etc.
+        # the copy and the variable tracking etc.  Instead, the facts added and removed by every prefix checked so far
+        # are kept in a trie, so sequences sharing a prefix with a previous one only pay for their new suffix.  The trie
+        # is discarded as soon as the state changes.
+
+        if self._sequence_trie is None:
+            self._sequence_trie = {}
 
-        facts = set(self.facts)
+        facts = self._fact_ids
+        children = self._sequence_trie
+        added = removed = frozenset()
         for action in actions:
-            old_len = len(facts)
-            facts.difference_update(action.preconditions)
-            if len(facts) != old_len - len(action.preconditions):
+            if action not in children:
+                pre_ids, added_ids, removed_ids = action._get_atom_ids(self._atoms)
+                required = pre_ids - added
+                if required <= facts and required.isdisjoint(removed):
+                    node = ((added - removed_ids) | added_ids, (removed - added_ids) | removed_ids, {})
+                else:
+                    node = None  # Not applicable after this prefix.
+
+                children[action] = node
+
+            node = children[action]
+            if node is None:
                 return False
 
-            facts.update(action.postconditions)
+            added, removed, children = node
 
         return True
 
@@ -1776,6 +2183,86 @@ class State:
         for rule in rules:
             yield from self.all_instantiations(rule, mapping)
 
+    def update_applicable_actions(self,
+                                  actions: Iterable[Action],
+                                  rules: Sequence[Rule],
+                                  added: Collection[Proposition],
+                                  removed: Collection[Proposition],
+                                  mapping: Mapping[Placeholder, Variable] = None) -> List[Action]:
+        """
+        Incrementally update the actions that are applicable in this state, after some facts were changed.
+
+        Instead of matching every rule against the whole state, the previously applicable actions relying on a
+        `removed` fact are discarded and new instantiations are only searched for around the `added` facts.
+
+        Parameters
+        ----------
+        actions :
+            The actions that were applicable before the facts changed, as returned by `all_applicable_actions`.
+        rules :
+            The possible rules to instantiate.
+        added :
+            The facts that were added to this state.
+        removed :
+            The facts that were removed from this state.
+        mapping : optional
+            An initial mapping to start from, constraining the possible instantiations.
+
+        Returns
+        -------
+        The same actions, in the same order, as `all_applicable_actions(rules, mapping)` would return.
+        """
+
+        if mapping is None:
+            mapping = {}
+
+        rule_indices = {rule.name: i for i, rule in enumerate(rules)}
+        if len(rule_indices) != len(rules):
+            # Actions can't be traced back to their rule.
+            return list(self.all_applicable_actions(rules, mapping))
+
+        plans = [self._logic._get_join_plan(rule, mapping) for rule in rules]
+
+        def _sort_key(action):
+            # The order in which `_all_applicable_assignments()` would find the action.
+            i = rule_indices[action.name]
+            signatures = plans[i].signatures
+            return (i, tuple([(signatures[d].index(prop.signature), prop) for d, prop in enumerate(action.preconditions)]))
+
+        # Placeholders only found in postconditions range over all the variables
+        # of the state, so those rules are always instantiated from scratch.
+        rescanned = {rule.name for rule, plan in zip(rules, plans) if plan.new_phs_by_depth[-1]}
+
+        kept = [action for action in actions if action.name not in rescanned and action._pre_set.isdisjoint(removed)]
+        known = set(kept)
+
+        found = set()
+        for rule, plan in zip(rules, plans):
+            if rule.name in rescanned:
+                found.update(self.all_instantiations(rule, mapping))
+                continue
+
+            # A newly applicable action must have one of the added facts among its preconditions.
+            for pred, signatures in zip(rule.preconditions, plan.signatures):
+                for prop in added:
+                    if prop.signature not in signatures:
+                        continue
+
+                    seed = dict(mapping)
+                    for ph, var in zip(pred.parameters, prop.arguments):
+                        existing = seed.setdefault(ph, var)
+                        if existing != var:
+                            break
+                    else:
+                        # Distinct placeholders can't be assigned the same variable
+                        if len(set(seed.values())) == len(seed):
+                            for assignment in self.all_assignments(rule, seed):
+                                action = rule.instantiate(assignment)
+                                if action not in known:
+                                    found.add(action)
+
+        return list(merge(kept, sorted(found, key=_sort_key), key=_sort_key))
+
     def all_instantiations(self,
                            rule: Rule,
                            mapping: Mapping[Placeholder, Variable] = None
@@ -1836,28 +2323,15 @@ class State:
             new_phs = [ph for ph in rule.placeholders if ph not in mapping]
             return self._all_assignments(new_phs, mapping, used_vars, True, allow_partial)
         else:
-            # Precompute the new placeholders at every depth to avoid wasted work
-            seen_phs = set(mapping.keys())
-            new_phs_by_depth = []
-            for pred in rule.preconditions:
-                new_phs = []
-                for ph in pred.parameters:
-                    if ph not in seen_phs:
-                        new_phs.append(ph)
-                        seen_phs.add(ph)
-                new_phs_by_depth.append(new_phs)
-
-            # Placeholders uniquely found in postcondition are considered as free variables.
-            free_vars = [ph for ph in rule.placeholders if ph not in seen_phs]
-            new_phs_by_depth.append(free_vars)
-
-            return self._all_applicable_assignments(rule, mapping, used_vars, new_phs_by_depth, 0)
+            # The join plan precomputes the candidate signatures and the new placeholders at every depth
+            plan = self._logic._get_join_plan(rule, mapping)
+            return self._all_applicable_assignments(rule, mapping, used_vars, plan, 0)
 
     def _all_applicable_assignments(self,
                                     rule: Rule,
                                     mapping: Dict[Placeholder, Optional[Variable]],
                                     used_vars: Set[Variable],
-                                    new_phs_by_depth: List[List[Placeholder]],
+                                    plan: _JoinPlan,
                                     depth: int,
                                     ) -> Iterable[Mapping[Placeholder, Optional[Variable]]]:
         """
@@ -1865,7 +2339,7 @@ class State:
         each level determining possible variable assignments from the current facts.
         """
 
-        new_phs = new_phs_by_depth[depth]
+        new_phs = plan.new_phs_by_depth[depth]
 
         if depth >= len(rule.preconditions):
             # There are no applicability constraints on the free variables, so solve them unconstrained
@@ -1873,11 +2347,10 @@ class State:
             return
 
         pred = rule.preconditions[depth]
+        bound_positions = plan.bound_positions[depth]
 
-        types = [self._logic.types.get(t) for t in pred.signature.types]
-        for subtypes in self._logic.types.multi_subtypes(types):
-            signature = Signature(pred.signature.name, [t.name for t in subtypes])
-            for prop in sorted(self.facts_with_signature(signature)):
+        for signature in plan.signatures[depth]:
+            for prop in self._matching_facts(signature, bound_positions, mapping):
                 for ph, var in zip(pred.parameters, prop.arguments):
                     existing = mapping.get(ph)
                     if existing is None:
@@ -1888,7 +2361,7 @@ class State:
                     elif existing != var:
                         break
                 else:
-                    yield from self._all_applicable_assignments(rule, mapping, used_vars, new_phs_by_depth, depth + 1)
+                    yield from self._all_applicable_assignments(rule, mapping, used_vars, plan, depth + 1)
 
                 # Reset the mapping to what it was before the recursive call
                 for ph in new_phs:
@@ -1942,20 +2415,33 @@ class State:
     def copy(self) -> "State":
         """
         Create a copy of this state.
-        """
 
-        copy = State(self._logic)
+        Copying takes constant time: both states share their data until one of them is modified, at which point only
+        the touched signature and type buckets get duplicated.
+        """
 
-        for k, v in self._facts.items():
-            copy._facts[k] = v.copy()
+        copy = self._empty_copy()
+        copy._facts = self._facts
+        copy._fact_ids = self._fact_ids
+        copy._vars_by_name = self._vars_by_name
+        copy._vars_by_type = self._vars_by_type
+        copy._var_counts = self._var_counts
+        copy._arg_index = self._arg_index
+        # The sorted fact lists are never mutated in place, so they can always be shared.
+        copy._sorted_facts = self._sorted_facts
+        # Both states hold the same facts, so the sequences checked so far remain valid for the copy.
+        copy._sequence_trie = self._sequence_trie
 
-        copy._vars_by_name = self._vars_by_name.copy()
-        for k, v in self._vars_by_type.items():
-            copy._vars_by_type[k] = v.copy()
-        copy._var_counts = self._var_counts.copy()
+        # From now on, nothing can be modified in place by either state.
+        self._shared = copy._shared = True
+        self._owned_sigs = copy._owned_sigs = None
+        self._owned_types = copy._owned_types = None
 
         return copy
 
+    def _empty_copy(self) -> "State":
+        return State(self._logic, atoms=self._atoms)
+
     def serialize(self) -> Sequence:
         """
         Serialize this state.
@@ -1971,6 +2457,9 @@ class State:
 
     def __eq__(self, other):
         if isinstance(other, State):
+            if self._atoms is other._atoms:
+                return self._fact_ids == other._fact_ids
+
             return set(self.facts) == set(other.facts)
         else:
             return NotImplemented
@@ -1991,3 +2480,115 @@ class State:
         lines.append("})")
 
         return "\n".join(lines)
+
+
+class BitsetState(State):
+    """
+    A state that also encodes its facts as a bitset.
+
+    Every proposition is numbered by an atom table shared by a state and its copies, so the bitset only grows with the
+    propositions they actually use.  Checking and applying actions, as well as comparing and hashing states, then boil
+    down to a few integer operations, which makes this backend well suited for duplicate detection during search and
+    planning.
+
+    Notes
+    -----
+    Unlike `State`, a `BitsetState` is hashable.  Like any other mutable object, it must not be modified while it is
+    used as a dictionary key or a set element.
+    """
+
+    def __init__(self, logic: GameLogic, facts: Iterable[Proposition] = None, atoms: Optional[AtomTable] = None):
+        """
+        Create a BitsetState.
+
+        Parameters
+        ----------
+        logic :
+            The logic for this state's game.
+        facts : optional
+            The facts that will be true in this state.
+        atoms : optional
+            The atom table numbering the propositions.  States sharing the same atom table are compared by their
+            bitsets, others by their facts.  By default, a new one, which the copies of this state will share.
+        """
+
+        self._bits = 0
+        # Sum of the hashes of the facts, which doesn't depend on the atom table (see `__hash__`).
+        self._facts_hash = 0
+        super().__init__(logic, facts, atoms)
+
+    @classmethod
+    def from_state(cls, state: State, atoms: Optional[AtomTable] = None) -> "BitsetState":
+        """
+        Create a BitsetState holding the same facts as another state, and by default, using the same atom table.
+        """
+        return cls(state._logic, state.facts, state._atoms if atoms is None else atoms)
+
+    @property
+    def atoms(self) -> AtomTable:
+        """
+        The atom table numbering the propositions of this state.
+        """
+        return self._atoms
+
+    @property
+    def bits(self) -> int:
+        """
+        The facts of this state, as a bitset indexed by the atom table ids.
+        """
+        return self._bits
+
+    def add_fact(self, prop: Proposition):
+        super().add_fact(prop)
+        bit = 1 << self._atoms.proposition_id(prop)
+        if not self._bits & bit:
+            self._bits |= bit
+            self._facts_hash += hash(prop)
+
+    def remove_fact(self, prop: Proposition):
+        super().remove_fact(prop)
+        bit = 1 << self._atoms.proposition_id(prop)
+        if self._bits & bit:
+            self._bits &= ~bit
+            self._facts_hash -= hash(prop)
+
+    def is_fact(self, prop: Proposition) -> bool:
+        return (self._bits >> self._atoms.proposition_id(prop)) & 1 == 1
+
+    def are_facts(self, props: Iterable[Proposition]) -> bool:
+        mask = _make_mask(self._atoms.proposition_ids(props))
+        return self._bits & mask == mask
+
+    def is_applicable(self, action: Action) -> bool:
+        pre_mask, _, _ = action._get_atom_masks(self._atoms)
+        return self._bits & pre_mask == pre_mask
+
+    def is_sequence_applicable(self, actions: Iterable[Action]) -> bool:
+        bits = self._bits
+        for action in actions:
+            pre_mask, added_mask, removed_mask = action._get_atom_masks(self._atoms)
+            if bits & pre_mask != pre_mask:
+                return False
+
+            bits = (bits & ~removed_mask) | added_mask
+
+        return True
+
+    def copy(self) -> "BitsetState":
+        copy = super().copy()
+        copy._bits = self._bits
+        copy._facts_hash = self._facts_hash
+        return copy
+
+    def _empty_copy(self) -> "BitsetState":
+        return BitsetState(self._logic, atoms=self._atoms)
+
+    def __eq__(self, other):
+        if isinstance(other, BitsetState) and self._atoms is other._atoms:
+            return self._bits == other._bits
+
+        return super().__eq__(other)
+
+    def __hash__(self):
+        # Equal states must hash the same, even when numbered by different atom tables.
+        return hash(self._facts_hash)
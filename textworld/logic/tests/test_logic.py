@@ -1,6 +1,10 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT license.
 
+import sys
+import pickle
+import threading
+
 import pytest
 from tatsu.exceptions import ParseError
 
@@ -8,6 +12,7 @@ from textworld.logic import Action, Rule
 from textworld.logic import Variable, Placeholder
 from textworld.logic import Proposition, Predicate, Signature
 from textworld.logic import State, GameLogic
+from textworld.logic import AtomTable, BitsetState
 from textworld.generator import KnowledgeBase
 
 
@@ -127,6 +132,31 @@ def test_state():
     assert len(state.variables_of_type("o")) == 0
 
 
+def test_state_copy_on_write():
+    at_kitchen = Proposition.parse("at(P, kitchen: r)")
+    at_study = Proposition.parse("at(P, study: r)")
+    in_kitchen = Proposition.parse("in(stove: o, kitchen: r)")
+    in_study = Proposition.parse("in(lamp: o, study: r)")
+
+    state = State(KnowledgeBase.default().logic, [at_kitchen, in_kitchen])
+    copy = state.copy()
+    copy2 = copy.copy()
+
+    copy.remove_fact(at_kitchen)
+    copy.add_fact(at_study)
+    state.add_fact(in_study)
+
+    assert set(state.facts) == {at_kitchen, in_kitchen, in_study}
+    assert set(copy.facts) == {at_study, in_kitchen}
+    assert set(copy2.facts) == {at_kitchen, in_kitchen}
+
+    assert state.variables_of_type("r") == {Variable.parse("kitchen: r"), Variable.parse("study: r")}
+    assert copy.variables_of_type("r") == {Variable.parse("kitchen: r"), Variable.parse("study: r")}
+    assert copy2.variables_of_type("r") == {Variable.parse("kitchen: r")}
+    assert copy2.variables_of_type("o") == {Variable.parse("stove: o")}
+    assert copy == State(KnowledgeBase.default().logic, [at_study, in_kitchen])
+
+
 def test_all_instantiations():
     state = State(KnowledgeBase.default().logic, [
         Proposition.parse("at(P, kitchen: r)"),
@@ -159,6 +189,62 @@ def test_all_instantiations():
     assert len(actions) == 0
 
 
+def test_all_applicable_actions_stays_in_sync():
+    kb = KnowledgeBase.default()
+    state = State(kb.logic, [
+        Proposition.parse("at(P, kitchen: r)"),
+        Proposition.parse("in(key: o, kitchen: r)"),
+        Proposition.parse("in(egg: o, kitchen: r)"),
+        Proposition.parse("in(book: o, study: r)"),
+        Proposition.parse("in(map: o, I)"),
+    ])
+
+    take = Rule.parse("take :: $at(P, r) & in(o, r) -> in(o, I)")
+    drop = take.inverse(name="drop")
+
+    actions = list(state.all_applicable_actions([take, drop], kb.types.constants_mapping))
+    assert actions == [
+        Action.parse("take :: $at(P, kitchen: r) & in(egg: o, kitchen: r) -> in(egg: o, I)"),
+        Action.parse("take :: $at(P, kitchen: r) & in(key: o, kitchen: r) -> in(key: o, I)"),
+        Action.parse("drop :: $at(P, kitchen: r) & in(map: o, I) -> in(map: o, kitchen: r)"),
+    ]
+
+    for _ in range(5):
+        state = state.copy()
+        assert state.apply(actions[-1])
+        actions = list(state.all_applicable_actions([take, drop], kb.types.constants_mapping))
+
+        # The indices used for matching must agree with a freshly built state.
+        fresh = State(kb.logic, state.facts)
+        assert actions == list(fresh.all_applicable_actions([take, drop], kb.types.constants_mapping))
+
+
+def test_update_applicable_actions():
+    kb = KnowledgeBase.default()
+    state = State(kb.logic, [
+        Proposition.parse("at(P, kitchen: r)"),
+        Proposition.parse("in(key: o, kitchen: r)"),
+        Proposition.parse("in(egg: o, kitchen: r)"),
+        Proposition.parse("in(book: o, study: r)"),
+        Proposition.parse("in(map: o, I)"),
+    ])
+
+    take = Rule.parse("take :: $at(P, r) & in(o, r) -> in(o, I)")
+    drop = take.inverse(name="drop")
+    go = Rule.parse("go :: at(P, r) & $in(o, r') -> at(P, r')")
+    rules = [take, drop, go]
+
+    actions = list(state.all_applicable_actions(rules, kb.types.constants_mapping))
+    for i in [0, 2, 1, 0, 3, 0, 1]:
+        action = actions[i % len(actions)]
+        assert state.apply(action)
+        actions = state.update_applicable_actions(actions, rules, action.added, action.removed,
+                                                  kb.types.constants_mapping)
+
+        # Same actions, in the same order, as recomputing them from scratch.
+        assert actions == list(state.all_applicable_actions(rules, kb.types.constants_mapping))
+
+
 def test_is_sequence_applicable():
     state = State(KnowledgeBase.default().logic, [
         Proposition.parse("at(P, r_1: r)"),
@@ -283,6 +369,148 @@ def test_mementos_memoization():
     assert Signature("name", types[::-1]) is not sig2  # Variable are reversed.
 
 
+def test_atom_table():
+    logic = KnowledgeBase.default().logic
+    at_kitchen = Proposition.parse("at(P, kitchen: r)")
+    at_study = Proposition.parse("at(P, study: r)")
+
+    atoms = AtomTable()
+    id1 = atoms.proposition_id(at_kitchen)
+    id2 = atoms.proposition_id(at_study)
+    assert id1 != id2
+    assert atoms.proposition_id(Proposition.parse("at(P, kitchen: r)")) == id1
+    assert atoms.proposition(id1) == at_kitchen
+    assert atoms.proposition_ids([at_study, at_kitchen]) == [id2, id1]
+    assert atoms.variable(atoms.variable_id(Variable.parse("study: r"))) == Variable.parse("study: r")
+
+    # States relying on the same atom table compare their fact ids.
+    go = Action.parse("go :: at(P, kitchen: r) -> at(P, study: r)")
+    state = State(logic, [at_kitchen], atoms=atoms)
+    assert state.is_applicable(go)
+    assert state.apply_on_copy(go) == State(logic, [at_study], atoms=atoms)
+    assert state.is_sequence_applicable([go, go.inverse()])
+    assert not state.is_sequence_applicable([go, go])
+
+    # Each state numbers its facts in its own table, shared with its copies.
+    other = State(logic, [at_study])
+    assert other._atoms is not atoms
+    assert other.copy()._atoms is other._atoms
+    assert other._atoms.nb_propositions == 1
+    assert other == state.apply_on_copy(go)
+
+
+def test_action_caching():
+    action = Action.parse("cook :: $at(P, kitchen: r) & $in(egg: f, kitchen: r) & raw(egg: f) -> cooked(egg: f)")
+    assert action.added == {Proposition.parse("cooked(egg: f)")}
+    assert action.removed == {Proposition.parse("raw(egg: f)")}
+    assert action.added is action.added
+    assert hash(action) == hash(Action.parse(str(action)))
+
+    with pytest.raises(AttributeError):
+        action.unknown_attribute = None
+
+
+def test_action_pickling():
+    action = Action.parse("cook :: $at(P, kitchen: r) & $in(egg: f, kitchen: r) & raw(egg: f) -> cooked(egg: f)")
+    action.command_template = "cook {f}"
+    size = len(pickle.dumps(action))
+
+    # The caches, in particular the atom table, are left out.
+    atoms = AtomTable()
+    atoms.proposition_ids(Proposition("at", [Variable("o{}".format(i), "o"), Variable("r", "r")]) for i in range(1000))
+    action._get_atom_ids(atoms)
+    action._get_atom_masks(atoms)
+    assert len(pickle.dumps(action)) == size
+
+    copy = pickle.loads(pickle.dumps(action))
+    assert copy == action and hash(copy) == hash(action)
+    assert copy.command_template == action.command_template
+    assert copy.added == action.added
+    assert copy._get_atom_ids(atoms) == action._get_atom_ids(atoms)
+
+
+def test_is_sequence_applicable_prefix_cache():
+    logic = KnowledgeBase.default().logic
+    at_kitchen = Proposition.parse("at(P, kitchen: r)")
+    go = Action.parse("go :: at(P, kitchen: r) -> at(P, study: r)")
+    back = go.inverse()
+
+    state = State(logic, [at_kitchen])
+    assert state.is_sequence_applicable([go, back, go])
+    assert state.is_sequence_applicable([go, back])  # Cached prefix.
+    assert not state.is_sequence_applicable([go, back, go, go])
+    assert not state.is_sequence_applicable([back])
+    assert state.is_sequence_applicable([])
+
+    # Copies hold the same facts, modifying either one must not reuse stale results.
+    copy = state.copy()
+    assert copy.is_sequence_applicable([go, back])
+    copy.apply(go)
+    assert not copy.is_sequence_applicable([go])
+    assert copy.is_sequence_applicable([back, go])
+    assert state.is_sequence_applicable([go])
+    assert not state.is_sequence_applicable([back])
+
+    state.remove_fact(at_kitchen)
+    assert not state.is_sequence_applicable([go])
+
+
+def test_bitset_state():
+    logic = KnowledgeBase.default().logic
+    at_kitchen = Proposition.parse("at(P, kitchen: r)")
+    at_study = Proposition.parse("at(P, study: r)")
+    go = Action.parse("go :: at(P, kitchen: r) -> at(P, study: r)")
+
+    atoms = AtomTable()
+    state = BitsetState(logic, [at_kitchen], atoms=atoms)
+    assert state.bits == 1 << atoms.proposition_id(at_kitchen)
+    assert state.is_fact(at_kitchen)
+    assert not state.is_fact(at_study)
+    assert state.is_applicable(go)
+    assert state.is_sequence_applicable([go, go.inverse()])
+    assert not state.is_sequence_applicable([go, go])
+
+    copy = state.copy()
+    assert isinstance(copy, BitsetState) and copy.atoms is atoms
+    assert copy.apply(go)
+    assert copy.are_facts([at_study])
+    assert not state.are_facts([at_study])
+    assert copy != state
+    assert copy == BitsetState(logic, [at_study], atoms=atoms)
+
+    # Hashable, for duplicate detection.
+    seen = {state, copy, BitsetState.from_state(State(logic, [at_kitchen]), atoms)}
+    assert len(seen) == 2
+
+    # States numbered by different tables still compare by facts.
+    assert state == BitsetState.from_state(state, AtomTable())
+    assert state == State(logic, [at_kitchen])
+
+
+def test_bitset_state_hash():
+    logic = KnowledgeBase.default().logic
+    f1, f2, f3 = map(Proposition.parse, ["at(P, kitchen: r)", "in(apple: f, I)", "open(box: c)"])
+
+    # Equal states hash equal, whatever order their facts were added in.
+    state = BitsetState(logic, [f3, f1, f2])
+    state.remove_fact(f3)
+    same = BitsetState(logic, [f2, f1], atoms=state.atoms)
+    assert state == same and hash(state) == hash(same)
+    assert len({state, same}) == 1
+
+    # Even when numbered by different atom tables.
+    other = BitsetState(logic, [f1, f2])
+    assert other.atoms is not same.atoms
+    assert other.bits != same.bits
+    assert other == same and hash(other) == hash(same)
+    assert len({state, same, other, other.copy()}) == 1
+
+    # Adding or removing a fact twice doesn't change anything.
+    state.add_fact(f1)
+    state.remove_fact(f3)
+    assert hash(state) == hash(same)
+
+
 def test_reverse_rule_and_action():
     logic = GameLogic.parse("""
         type container {
@@ -330,3 +558,31 @@ def test_reverse_rule_and_action():
     open_action2.format_command(mapping) == "open chest"
 
     assert open_action2.inverse() == r_open_action
+
+
+def test_atom_table_threads():
+    # Games are loaded and reset in background threads (see `AsyncBatchEnv.prefetch`) while other games of the same
+    # logic are played, all of them numbering their propositions in the same atom table.
+    atoms = AtomTable()
+    props = [Proposition("at", [Variable("o{}".format(i), "o"), Variable("r{}".format(i % 7), "r")])
+             for i in range(20000)]
+    results = []
+
+    def _intern(offset):
+        results.append([atoms.proposition_id(props[(i + offset) % len(props)]) for i in range(len(props))])
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible.
+    try:
+        threads = [threading.Thread(target=_intern, args=(i * 5000,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    ids = [atoms.proposition_id(prop) for prop in props]
+    assert sorted(ids) == list(range(len(props)))
+    assert all(atoms.proposition(id) is prop for id, prop in zip(ids, props))
+    assert atoms.nb_variables == len(props) + 7
@@ -2,12 +2,14 @@
 // Interpreter engine.
 
 #include "git.h"
+#include "agent.h"
 #include <assert.h>
 #include <math.h>
 #include <stdlib.h>
 #include <stdio.h>
 #include <string.h>
 #include <time.h>
+#include <unistd.h>
 
 // -------------------------------------------------------------
 // Global variables
@@ -18,6 +20,9 @@ git_sint32* gStackPointer;
 Opcode* gOpcodeTable;
 #endif
 
+// Whether the game seeded the random number generator itself.
+static int gRandomSeeded = 0;
+
 // -------------------------------------------------------------
 // Useful macros for manipulating the stack
 
@@ -67,6 +72,14 @@ float git_powf(float x, float y);
 // -------------------------------------------------------------
 // Functions
 
+// Called by the agent in a forked interpreter. Unless the game chose its
+// own seed, reseed so that forks don't replay the same random numbers.
+static void reseedRandom (void)
+{
+    if (!gRandomSeeded)
+        srand (time(NULL) ^ getpid());
+}
+
 void startProgram (size_t cacheSize, enum IOMode ioMode)
 {
     Block pc; // Program counter (pointer into dynamically generated code)
@@ -113,6 +126,7 @@ void startProgram (size_t cacheSize, enum IOMode ioMode)
 
     // Initialise the random number generator.
     srand (time(NULL));
+    agent_after_fork = reseedRandom;
 
     // Set up the stack.
 
@@ -1188,6 +1202,7 @@ do_tailcall:
 
     do_setrandom:
         srand (L1 ? L1 : time(NULL));
+        gRandomSeeded = (L1 != 0);
         NEXT;
 
     do_glk:
@@ -7,6 +7,8 @@
 /* posix */
 #include <errno.h>
 #include <fcntl.h>
+#include <signal.h>
+#include <unistd.h>
 #include <sys/stat.h>
 
 /* sockets */
@@ -20,18 +22,54 @@
 
 const glui32 INIT_BUF_SIZE = 8192;
 
+/* Prefix of the meta commands sent by the client, e.g. "\x10+++FORK <sock_name>\x10". */
+const char META_PREFIX[] = "\x10+++";
+
 char* cur_buf = 0;
 glui32 str_len = 0;
 glui32 cur_buf_len = 0;
 int sock_fh = -1;
 
-void agent_init(char* sock_name)
+char* agent_program = NULL; /* Path of the interpreter, to reload it. */
+bool agent_idle = false; /* Whether we are waiting for a game to play. */
+char* agent_game = NULL; /* Game to play, once received. */
+void (*agent_after_fork)(void) = NULL; /* Set by the interpreter, if needed. */
+
+static int agent_connect(const char* sock_name)
 {
-    if(sock_name == NULL) {
+    int fh = socket(AF_LOCAL, SOCK_STREAM, 0);
+    if(fh == -1) {
+        gli_strict_warning("agent_init: Could not open socket");
+        return -1;
+    }
+
+    struct sockaddr_un sock_addr;
+    sock_addr.sun_family = AF_UNIX;
+    snprintf(sock_addr.sun_path, sizeof(sock_addr.sun_path), "%s", sock_name);
+
+    int conn_status = connect(fh, (struct sockaddr*)&sock_addr, sizeof(sock_addr));
+    if(conn_status < 0) {
+        gli_strict_warning("agent_init: Could not connect socket");
+        close(fh);
+        return -1;
+    }
+
+    return fh;
+}
+
+void agent_init(char* program, char* sock_name, int sock_fd)
+{
+    if(sock_fh != -1) {
+        return; /* Already connected, e.g. while waiting for a game. */
+    }
+
+    if(sock_name == NULL && sock_fd == -1) {
         gli_strict_warning("agent_init: Cannot initialize process without socket name");
         glk_exit();
     }
 
+    agent_program = program;
+
     /* Memory buffer */
     if(cur_buf) {
         free(cur_buf);
@@ -42,19 +80,8 @@ void agent_init(char* sock_name)
     memset(cur_buf, 0, cur_buf_len);
 
     /* socket */
-    sock_fh = socket(AF_LOCAL, SOCK_STREAM, 0);
+    sock_fh = sock_fd != -1 ? sock_fd : agent_connect(sock_name);
     if(sock_fh == -1) {
-        gli_strict_warning("agent_init: Could not open socket");
-        glk_exit();
-    }
-
-    struct sockaddr_un sock_addr;
-    sock_addr.sun_family = AF_UNIX;
-    snprintf(sock_addr.sun_path, sizeof(sock_addr.sun_path), "%s", sock_name);
-
-    int conn_status = connect(sock_fh, (struct sockaddr*)&sock_addr, sizeof(sock_addr));
-    if(conn_status < 0) {
-        gli_strict_warning("agent_init: Could not connect socket");
         glk_exit();
     }
 }
@@ -87,71 +114,216 @@ void agent_put_string(char* buf, glui32 len)
     str_len = new_str_len;
 }
 
-glui32 agent_get_output(char* buf, glui32 len)
+/*
+ * Send a message, prefixed with its length.
+ */
+static int agent_send(const char* msg, glui32 len)
 {
-    char* dest_buf = NULL; /* forward declare for goto; see para 6.8.6.1 */
-    glui32 dest_buf_len = 0;
-     /*
-     * write to out as one large packet
-     */
-    ssize_t sent = -1;
-
-    glui32 net_len = htonl(str_len);
-    sent = send(sock_fh, &net_len, 4, 0);
+    glui32 net_len = htonl(len);
+    ssize_t sent = send(sock_fh, &net_len, 4, 0);
     if(sent < 0) {
         int err = errno;
         gli_strict_warning("agent.c: send size");
         gli_strict_warning(strerror(err));
-        goto cleanup;
+        return -1;
     }
 
-    sent = send(sock_fh, cur_buf, str_len, 0);
-
+    sent = send(sock_fh, msg, len, 0);
     if(sent < 0) {
         int err = errno;
         gli_strict_warning("agent.c: send message");
         gli_strict_warning(strerror(err));
-        goto cleanup;
+        return -1;
     }
 
-    /*
-     * receive size, then message
-     */
-    bool restart = false;
-    glui32 net_dest_buf_len;
+    return 0;
+}
 
-    do { //handle EINTR
-        restart = 0;
-        ssize_t in_len = recv(sock_fh, &net_dest_buf_len, sizeof(glui32), MSG_WAITALL);
+/*
+ * recv() wrapper that handles EINTR and exits once the client is gone.
+ */
+static int agent_recv_all(void* buf, glui32 len)
+{
+    while(true) {
+        ssize_t in_len = recv(sock_fh, buf, len, MSG_WAITALL);
+        if(in_len == -1 && errno == EINTR) {
+            continue;
+        }
+        if((in_len == 0 && len > 0) || (in_len == -1 && errno == ECONNRESET)) {
+            exit(0); /* The client closed the socket, nobody is left to play. */
+        }
         if(in_len == -1) {
             int err = errno;
-            if(err == EINTR) {
-                restart = true;
-                continue;
-            }
-            gli_strict_warning("agent.c: receive size");
+            gli_strict_warning("agent.c: receive");
             gli_strict_warning(strerror(err));
-            goto cleanup;
+            return -1;
         }
-    } while(restart);
+        return 0;
+    }
+}
 
-    dest_buf_len = ntohl(net_dest_buf_len);
-    dest_buf = calloc(dest_buf_len+1, 1);
+/*
+ * Receive a message, prefixed with its length. The returned buffer
+ * is null-terminated and must be freed by the caller.
+ */
+static char* agent_recv(glui32* len)
+{
+    glui32 net_len;
+    if(agent_recv_all(&net_len, sizeof(glui32)) != 0) {
+        return NULL;
+    }
 
-    do { //handle EINTR
-        restart = false;
-        ssize_t in_len = recv(sock_fh, dest_buf, dest_buf_len, MSG_WAITALL);
-        if(in_len == -1) {
-            int err = errno;
-            if(err == EINTR) {
-                restart = true;
-                continue;
-            }
-            gli_strict_warning("agent.c: receive message");
-            gli_strict_warning(strerror(err));
-            goto cleanup;
+    *len = ntohl(net_len);
+    char* msg = calloc(*len + 1, 1);
+    if(msg == NULL) {
+        gli_strict_warning("agent.c: message too long");
+        return NULL;
+    }
+
+    if(agent_recv_all(msg, *len) != 0) {
+        free(msg);
+        return NULL;
+    }
+
+    return msg;
+}
+
+/*
+ * Fork the interpreter. The new process connects to the socket named
+ * `sock_name` and continues the game from there, from the same state.
+ * Both processes reply with the pid of the new one (or -1 on failure).
+ */
+static void agent_fork(const char* sock_name)
+{
+    char reply[32];
+
+    signal(SIGCHLD, SIG_IGN); /* Forked processes are never waited on. */
+    fflush(NULL); /* Don't duplicate pending output. */
+
+    pid_t pid = fork();
+    if(pid == 0) {
+        close(sock_fh); /* Leave the parent's connection alone. */
+        sock_fh = agent_connect(sock_name);
+        if(sock_fh == -1) {
+            _exit(1);
         }
-    } while(restart);
+        pid = getpid();
+        if(agent_after_fork != NULL) {
+            agent_after_fork();
+        }
+    }
+    else if(pid == -1) {
+        gli_strict_warning("agent.c: fork");
+        gli_strict_warning(strerror(errno));
+    }
+
+    snprintf(reply, sizeof(reply), "%d", (int) pid);
+    agent_send(reply, strlen(reply));
+}
+
+/*
+ * Restart the interpreter with another game, in the same process and
+ * using the same connection. The client gets the new game's intro as
+ * the reply. Files opened by the current game are closed on exec.
+ */
+static void agent_reload(const char* game_file)
+{
+    char fd_str[16];
+    snprintf(fd_str, sizeof(fd_str), "%d", sock_fh);
+
+    char* argv[] = {agent_program, (char*) game_file, "-G", fd_str, "-q", NULL};
+    fflush(NULL);
+    execvp(agent_program, argv);
+
+    /* Only returns on failure. */
+    gli_strict_warning("agent.c: exec");
+    gli_strict_warning(strerror(errno));
+    exit(1);
+}
+
+/*
+ * Handle a meta command sent by the client instead of the player's input.
+ * Returns false if `msg` isn't one.
+ */
+static bool agent_meta_command(char* msg, glui32 len)
+{
+    glui32 prefix_len = strlen(META_PREFIX);
+    if(len < prefix_len + 1 || strncmp(msg, META_PREFIX, prefix_len) != 0 || msg[len-1] != 0x10) {
+        return false;
+    }
+
+    msg[len-1] = 0; /* Strip the trailing DLE. */
+    char* command = msg + prefix_len;
+    if(strncmp(command, "FORK ", 5) == 0) {
+        agent_fork(command + 5);
+    }
+    else if(strncmp(command, "LOAD ", 5) == 0) {
+        if(agent_idle) {
+            agent_game = strdup(command + 5);
+        }
+        else {
+            agent_reload(command + 5);
+        }
+    }
+    else {
+        gli_strict_warning("agent.c: unknown meta command");
+        agent_send("", 0);
+    }
+
+    return true;
+}
+
+char* agent_wait_for_game(void)
+{
+    agent_idle = true;
+    while(agent_game == NULL) {
+        glui32 msg_len;
+        char* msg = agent_recv(&msg_len);
+        if(msg == NULL) {
+            exit(1);
+        }
+
+        if(!agent_meta_command(msg, msg_len)) {
+            agent_send("", 0); /* No game to send the player's input to. */
+        }
+
+        free(msg);
+    }
+
+    agent_idle = false;
+    return agent_game;
+}
+
+glui32 agent_get_output(char* buf, glui32 len)
+{
+    char* dest_buf = NULL;
+    glui32 dest_buf_len = 0;
+
+    /*
+     * write to out as one large packet
+     */
+    int sent = agent_send(cur_buf, str_len);
+    memset(cur_buf, 0, str_len);
+    str_len = 0;
+    if(sent != 0) {
+        return 0;
+    }
+
+    /*
+     * receive size, then message, until it is not a meta command
+     */
+    while(true) {
+        dest_buf = agent_recv(&dest_buf_len);
+        if(dest_buf == NULL) {
+            return 0;
+        }
+
+        if(!agent_meta_command(dest_buf, dest_buf_len)) {
+            break;
+        }
+
+        free(dest_buf);
+    }
 
     if(dest_buf_len > len) {
         dest_buf_len = strlen(dest_buf)+1;
@@ -160,20 +332,12 @@ glui32 agent_get_output(char* buf, glui32 len)
         char errmsg[100];
         snprintf(errmsg, 100, "agent_get_output: string too large for buffer (%d versus %d)", dest_buf_len, len);
         gli_strict_warning(errmsg);
-        goto cleanup;
-    }
-
-    memmove(buf, dest_buf, dest_buf_len);
-
-    /* "deallocate" buffer */
-    cleanup:
-    if(dest_buf != NULL) {
         free(dest_buf);
-        dest_buf = NULL;
+        return 0;
     }
-    memset(cur_buf, 0, str_len);
-    str_len = 0;
 
+    memmove(buf, dest_buf, dest_buf_len);
+    free(dest_buf);
     return dest_buf_len;
 }
 
@@ -3,10 +3,19 @@
 #pragma once
 
 /**
- * Initializes the agent.
+ * Initializes the agent. Does nothing if it is already initialized.
+ * @param program The path of the interpreter, to reload it with another game
  * @param sock_name The name of the unix socket file to connect to
+ * @param sock_fd An already connected socket to use instead, or -1
  */
-void agent_init(char* sock_name);
+void agent_init(char* program, char* sock_name, int sock_fd);
+
+/**
+ * Waits for the client to send the game to play
+ * (i.e. "\x10+++LOAD <game_file>\x10").
+ * @return The path of the game file
+ */
+char* agent_wait_for_game(void);
 
 /**
  * Adds an output-encoded string (UTF-8 or latin1) as input to the agent
@@ -17,12 +26,22 @@ void agent_put_string(char* buf, glui32 len);
 
 /**
  * Returns agent output for the input buffer for a continuous process.
+ * Meta commands sent by the client (e.g. "\x10+++FORK <sock_name>\x10" or
+ * "\x10+++LOAD <game_file>\x10") are handled here, while waiting for the
+ * player's input.
  * @param output_buf Output buffer to write into
  * @param max_len Size of output buffer
  * @return The length of output actually written
  */
 glui32 agent_get_output(char* output_buf, glui32 max_len);
 
+/**
+ * Called in the new process after a fork (see agent_get_output), before it
+ * replies to the client. Lets the interpreter reset per-process state, e.g.
+ * reseed its random number generator. NULL by default.
+ */
+extern void (*agent_after_fork)(void);
+
 /**
  * Should be called on glk_exit() to avoid client programs hanging.
  */
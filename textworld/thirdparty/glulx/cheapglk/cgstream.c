@@ -1,6 +1,7 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <fcntl.h>
 #include "glk.h"
 #include "cheapglk.h"
 #include "gi_blorb.h"
@@ -301,6 +302,8 @@ strid_t glk_stream_open_file(fileref_t *fref, glui32 fmode,
         gli_strict_warning("stream_open_file: unable to open file.");
         return NULL;
     }
+    /* Don't leak the file into a reloaded interpreter (see agent.c). */
+    fcntl(fileno(fl), F_SETFD, FD_CLOEXEC);
     
     if (fmode == filemode_WriteAppend) {
         fseek(fl, 0, 2); /* ...to the end. */
@@ -503,6 +506,8 @@ strid_t gli_stream_open_pathname(char *pathname, int writemode,
     if (!fl) {
         return NULL;
     }
+    /* Don't leak the file into a reloaded interpreter (see agent.c). */
+    fcntl(fileno(fl), F_SETFD, FD_CLOEXEC);
 
     str = gli_new_stream(strtype_File, 
         !writemode, writemode, rock);
@@ -22,6 +22,7 @@ int main(int argc, char *argv[])
     int ix, jx, val;
     int display_version = TRUE;
     char* glk_mq_name = NULL;
+    int glk_sock_fd = -1;
 
     int errflag = FALSE;
     glkunix_startup_t startdata;
@@ -168,6 +169,11 @@ int main(int argc, char *argv[])
                     ix++;
                     glk_mq_name = argv[ix];
                     break;
+                case 'G':
+                    ix++;
+                    if (ix<argc)
+                        glk_sock_fd = atoi(argv[ix]);
+                    break;
                 case 'q':
                     display_version = FALSE;
                     break;
@@ -190,7 +196,7 @@ int main(int argc, char *argv[])
 #else  /* GIDEBUG_LIBRARY_SUPPORT */
         char *debugoption = "";
 #endif /* GIDEBUG_LIBRARY_SUPPORT */
-        printf("usage: %s -w WIDTH -h HEIGHT -u[i|o] -q%s -g GLK_NAME -a AGENT_NAME\n", argv[0], debugoption);
+        printf("usage: %s -w WIDTH -h HEIGHT -u[i|o] -q%s -g GLK_NAME -G GLK_SOCKET_FD -a AGENT_NAME\n", argv[0], debugoption);
         if (glkunix_arguments[0].argtype != glkunix_arg_End) {
             glkunix_argumentlist_t *argform;
             printf("game options:\n");
@@ -212,6 +218,14 @@ int main(int argc, char *argv[])
         return 1;
     }
     
+    /* Without a game file, connect right away and wait for the client
+        to send one. */
+    if (startdata.argc == 1 && (glk_mq_name || glk_sock_fd != -1)) {
+        agent_init(argv[0], glk_mq_name, glk_sock_fd);
+        startdata.argv[startdata.argc] = agent_wait_for_game();
+        startdata.argc++;
+    }
+
     /* Initialize things. */
     gli_initialize_misc();
     
@@ -234,7 +248,7 @@ int main(int argc, char *argv[])
     if (gli_debugger)
         gidebug_announce_cycle(gidebug_cycle_Start);
 
-    agent_init(glk_mq_name);
+    agent_init(argv[0], glk_mq_name, glk_sock_fd);
     glk_main();
     glk_exit();
     